@@ -0,0 +1,131 @@
+"""
+Асинхронное чтение каталога для ASGI (включается ASYNC_READS=True).
+GET list и retrieve без дополнительных параметров обслуживаются async ORM,
+все остальное (запись, фильтры, курсоры, browsable API) уходит в синхронный DRF ViewSet.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.utils.mediatypes import media_type_matches
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .cache import replica_stale_window, response_cache
+from .renderers import MessagePackRenderer, ORJSONRenderer
+from .serializers import AlbumReadSerializer, ArtistReadSerializer, TrackReadSerializer
+from .views import AlbumViewSet, ArtistViewSet, TrackViewSet
+
+
+class AsyncReadView(View):
+    read_from_replica = True
+    viewset_class = None
+    serializer_class = None
+    basename = None
+    sync_view = None
+    page_query_param = "page"
+    page_size = settings.REST_FRAMEWORK["PAGE_SIZE"]
+    renderer = ORJSONRenderer()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Как у DRF: запись делегируется в csrf_exempt ViewSet.
+        view.csrf_exempt = True
+        return view
+
+    async def get(self, request, pk=None):
+        if not self.is_plain_read(request) or settings.CATALOG_SNAPSHOT:
+            # Снимок каталога в памяти отдает синхронный ViewSet без запросов к базе.
+            return await self.delegate(request, pk)
+        key = response_cache.make_key(request, self.renderer.media_type)
+        response = await sync_to_async(response_cache.get)(key)
+        if response is not None:
+            return response
+        generation = await sync_to_async(response_cache.generation)()
+        queryset = self.serializer_class.setup_eager_loading(self.viewset_class.queryset.all())
+        if pk is None:
+            data = await self.list(request, queryset)
+        else:
+            data = await self.retrieve(queryset, pk)
+        if data is None:
+            return await self.delegate(request, pk)
+        response = HttpResponse(self.renderer.render(data), content_type=self.renderer.media_type)
+        viewset = self.viewset_class(basename=self.basename, action="list" if pk is None else "retrieve")
+        tags = viewset.get_cache_tags(data)
+        await sync_to_async(response_cache.set)(key, generation, response, tags, replica_stale_window())
+        return response
+
+    async def post(self, request, pk=None):
+        return await self.delegate(request, pk)
+
+    put = patch = delete = post
+
+    async def list(self, request, queryset):
+        try:
+            page = int(request.GET.get(self.page_query_param, 1))
+        except ValueError:
+            return None
+        count = await queryset.acount()
+        offset = (page - 1) * self.page_size
+        limit = offset + self.page_size
+        if page < 1 or (page > 1 and offset >= count):
+            return None
+        instances = [instance async for instance in queryset[offset:limit]]
+        return {
+            "count": count,
+            "next": self.get_page_link(request, page + 1) if limit < count else None,
+            "previous": self.get_page_link(request, page - 1) if page > 1 else None,
+            "results": self.serializer_class(instances, many=True).data,
+        }
+
+    async def retrieve(self, queryset, pk):
+        try:
+            instance = await queryset.aget(pk=pk)
+        except queryset.model.DoesNotExist:
+            return None
+        return self.serializer_class(instance).data
+
+    def is_plain_read(self, request) -> bool:
+        """Только ?page= и json ответ, иначе нужен полный стек DRF (в том числе 406 на неподдерживаемый Accept)."""
+        if set(request.GET) - {self.page_query_param}:
+            return False
+        accept = request.headers.get("Accept", "")
+        if "text/html" in accept or MessagePackRenderer.media_type in accept:
+            return False
+        for token in (accept or "*/*").split(","):
+            media_type, *params = [part.strip() for part in token.split(";")]
+            # Параметры кроме q (indent) обрабатывает JSONRenderer DRF.
+            if media_type_matches(self.renderer.media_type, media_type) and all(p.startswith("q=") for p in params):
+                return True
+        return False
+
+    def get_page_link(self, request, page: int) -> str:
+        url = request.build_absolute_uri()
+        if page == 1:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, page)
+
+    async def delegate(self, request, pk=None):
+        kwargs = {} if pk is None else {"pk": pk}
+        return await sync_to_async(self.sync_view)(request, **kwargs)
+
+
+class AsyncArtistView(AsyncReadView):
+    viewset_class = ArtistViewSet
+    serializer_class = ArtistReadSerializer
+    basename = "artists"
+
+
+class AsyncAlbumView(AsyncReadView):
+    viewset_class = AlbumViewSet
+    serializer_class = AlbumReadSerializer
+    basename = "albums"
+
+
+class AsyncTrackView(AsyncReadView):
+    viewset_class = TrackViewSet
+    serializer_class = TrackReadSerializer
+    basename = "tracks"
+
+
+ASYNC_READ_VIEWS = {view_class.basename: view_class for view_class in (AsyncArtistView, AsyncAlbumView, AsyncTrackView)}
@@ -0,0 +1,377 @@
+"""
+Нагрузочный прогон API: конкурентные клиенты по кругу обходят все маршруты api/urls.py.
+Отчет json: p50/p95/p99, пропускная способность, SQL запросов на запрос и пиковый RSS по действиям.
+Клиенты работают в процессе (django.test.Client) или ходят на запущенный сервер по --url.
+codec_report сравнивает форматы ответа: время кодирования, декодирования и размер по маршрутам.
+"""
+import io
+import json
+import math
+import random
+import resource
+import time
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.error import HTTPError
+from uuid import uuid4
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, override_settings
+from django.urls import reverse
+from prometheus_client.parser import text_string_to_metric_families
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from catalog.models import Album, AlbumTrack, Artist, Track
+from config.metrics import QueryCounter
+from config.middleware import BrowserMiddleware
+
+from .renderers import MessagePackParser, MessagePackRenderer, ORJSONParser, ORJSONRenderer
+
+PERCENTILES = (50, 95, 99)
+SAMPLE_SIZE = 50
+LIST_PAGES = 5
+CODECS = {
+    "json": (JSONRenderer(), JSONParser()),
+    "orjson": (ORJSONRenderer(), ORJSONParser()),
+    "msgpack": (MessagePackRenderer(), MessagePackParser()),
+}
+
+
+class LocalClient:
+    """Запросы через WSGI обработчик в процессе бенчмарка, SQL считает execute_wrapper."""
+
+    def __init__(self):
+        self.client = Client(raise_request_exception=False)
+
+    def request(self, method: str, path: str, data=None) -> Tuple[int, Optional[int], bytes]:
+        body = "" if data is None else json.dumps(data)
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.client.generic(method, path, body, content_type="application/json")
+            content = b"".join(response.streaming_content) if response.streaming else response.content
+            response.close()
+        return response.status_code, counter.count, content
+
+    def close(self) -> None:
+        connections.close_all()
+
+
+class HttpClient:
+    """Запросы к запущенному серверу, SQL берутся из его /metrics."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+
+    def request(self, method: str, path: str, data=None) -> Tuple[int, Optional[int], bytes]:
+        body = None if data is None else json.dumps(data).encode()
+        headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        request = urllib.request.Request(self.base_url + path, data=body, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=300) as response:
+                return response.status, None, response.read()
+        except HTTPError as error:
+            return error.code, None, error.read()
+
+    def close(self) -> None:
+        connections.close_all()
+
+
+def scrape_metrics(base_url: str) -> dict:
+    """SQL по действиям {действие: (сумма запросов, число ответов)} и пиковый RSS из метрик сервера."""
+    with urllib.request.urlopen(base_url.rstrip("/") + "/metrics", timeout=30) as response:
+        text = response.read().decode()
+    totals = defaultdict(lambda: [0.0, 0.0])
+    peak_rss = None
+    for family in text_string_to_metric_families(text):
+        if family.name == "catalog_process_peak_rss_bytes":
+            peak_rss = max(sample.value for sample in family.samples)
+        if family.name != "catalog_db_queries":
+            continue
+        for sample in family.samples:
+            if sample.name.endswith("_sum"):
+                totals[sample.labels["view"]][0] += sample.value
+            elif sample.name.endswith("_count"):
+                totals[sample.labels["view"]][1] += sample.value
+    return {"queries": {view: tuple(total) for view, total in totals.items()}, "peak_rss": peak_rss}
+
+
+def sample_ids(model, size: int, seed: int) -> List[int]:
+    """Случайные существующие id по всему диапазону, одинаковые при одном seed."""
+    ids = model.objects.order_by("id").values_list("id", flat=True)
+    first, last = ids.first(), ids.last()
+    if first is None:
+        return []
+    rng = random.Random(seed)
+    targets = {rng.randint(first, last) for _ in range(size)}
+    return list(model.objects.filter(id__in=targets).order_by("id").values_list("id", flat=True)) or [first]
+
+
+def percentile(values: List[float], rank: int) -> float:
+    ordered = sorted(values)
+    return ordered[max(math.ceil(rank / 100 * len(ordered)) - 1, 0)]
+
+
+@dataclass
+class Recorder:
+    """Результаты одного клиента: {действие: [(секунды, успех, SQL запросов)]}."""
+
+    samples: Dict[str, list] = field(default_factory=lambda: defaultdict(list))
+
+    def call(self, client, label: str, method: str, path: str, data=None) -> Tuple[int, bytes]:
+        start = time.perf_counter()
+        status, queries, content = client.request(method, path, data)
+        self.samples[label].append((time.perf_counter() - start, status < 400, queries))
+        return status, content
+
+
+class Benchmark:
+    def __init__(self, make_client, concurrency: int, rounds: int, warmup: int = 1, exclude=(), seed: int = 0):
+        self.make_client = make_client
+        self.concurrency = concurrency
+        self.rounds = rounds
+        self.warmup = warmup
+        self.exclude = set(exclude)
+        self.seed = seed
+        self.run_id = uuid4().hex[:8]
+
+    def run(self) -> dict:
+        self.ids = {model.__name__: sample_ids(model, SAMPLE_SIZE, self.seed) for model in (Artist, Album, Track)}
+        page_size = settings.REST_FRAMEWORK["PAGE_SIZE"]
+        self.pages = {
+            model.__name__: min(max(-(-model.objects.count() // page_size), 1), LIST_PAGES)
+            for model in (Artist, Album, Track)
+        }
+        start = time.perf_counter()
+        with ThreadPoolExecutor(self.concurrency) as pool:
+            recorders = list(pool.map(self.worker, range(self.concurrency)))
+        seconds = time.perf_counter() - start
+        return self.report(recorders, seconds)
+
+    def worker(self, number: int) -> Recorder:
+        client = self.make_client()
+        warmup, recorder = Recorder(), Recorder()
+        try:
+            for index in range(self.warmup):
+                self.round(client, warmup, number, -index - 1)
+            for index in range(self.rounds):
+                self.round(client, recorder, number, index)
+        finally:
+            client.close()
+        return recorder
+
+    def round(self, client, recorder: Recorder, number: int, index: int) -> None:
+        call = self.caller(client, recorder)
+        pick = random.Random(f"{self.seed}-{number}-{index}")
+        for basename in ("artists", "albums", "tracks"):
+            model = {"artists": "Artist", "albums": "Album", "tracks": "Track"}[basename]
+            page = pick.randint(1, self.pages[model])
+            call(f"{basename}-list", "GET", reverse(f"{basename}-list") + f"?page={page}")
+            if self.ids[model]:
+                call(f"{basename}-retrieve", "GET", reverse(f"{basename}-detail", args=[pick.choice(self.ids[model])]))
+        call("search-list", "GET", reverse("search-list") + f"?q=Seed+{pick.randint(0, 9999):04d}")
+        if number == 0 and index == 0:
+            call("artists-export", "GET", reverse("artists-export"))
+        self.write_round(client, call, f"bench {self.run_id} {number}.{index}")
+
+    def write_round(self, client, call, prefix: str) -> None:
+        """Создание, изменение и удаление своих объектов: набор данных после прогона не меняется.
+
+        id созданных объектов берутся из ответов: с --url база сервера недоступна бенчмарку.
+        Все объекты круга принадлежат его исполнителю и удаляются вместе с ним, в том числе
+        при пропущенном через --exclude или неудачном artists-destroy (запросом вне отчета).
+        Пропущенное или неудачное создание прерывает цепочку зависящих от него запросов.
+        """
+        artist = call("artists-create", "POST", reverse("artists-list"), {"name": f"{prefix} artist"})
+        if artist is None:
+            return
+        artist_url = reverse("artists-detail", args=[artist["id"]])
+        artist = call("artists-update", "PUT", artist_url, {"name": f"{prefix} artist*"}) or artist
+        artist = call("artists-partial-update", "PATCH", artist_url, {"name": f"{prefix} artist"}) or artist
+        album = call(
+            "albums-create",
+            "POST",
+            reverse("albums-list"),
+            {"name": f"{prefix} album", "artist": artist["id"], "year": 2000},
+        )
+        if album is not None:
+            self.album_round(call, prefix, album)
+        # Пакет добавляет альбом исполнителю круга.
+        bulk = {
+            "name": artist["name"],
+            "albums": [
+                {"name": f"{prefix} bulk album", "year": 2000, "tracks": [f"{prefix} bulk {n}" for n in range(10)]}
+            ],
+        }
+        call("artists-bulk", "POST", reverse("artists-bulk"), {"artists": [bulk]})
+        if call("artists-destroy", "DELETE", artist_url) is None:
+            client.request("DELETE", artist_url)
+
+    def album_round(self, call, prefix: str, album: dict) -> None:
+        """Трэки круга входят только в его альбом: не удаленные здесь удаляются вместе с альбомом."""
+        album_url = reverse("albums-detail", args=[album["id"]])
+        fields = {"name": album["name"], "artist": album["artist"]}
+        call("albums-update", "PUT", album_url, fields | {"year": 2001})
+        call("albums-partial-update", "PATCH", album_url, {"year": 2002})
+        links = [
+            call(
+                "tracks-create",
+                "POST",
+                reverse("tracks-list"),
+                {"name": f"{prefix} track {order}", "album": album["id"], "order": order},
+            )
+            for order in (1, 2)
+        ]
+        call("albums-remove-track", "DELETE", reverse("albums-remove-track", args=[album["id"]]), {"order": 1})
+        call("albums-reorder", "POST", reverse("albums-reorder", args=[album["id"]]), {"compact": True})
+        if links[1] is not None:
+            call("tracks-destroy", "DELETE", reverse("tracks-detail", args=[links[1]["track_id"]]))
+        call("albums-destroy", "DELETE", album_url)
+
+    def caller(self, client, recorder: Recorder):
+        def call(label: str, method: str, path: str, data=None) -> Optional[dict]:
+            """Тело успешного ответа (пустой dict без json), None при ошибке или пропуске через --exclude."""
+            if label in self.exclude:
+                return None
+            status, content = recorder.call(client, label, method, path, data)
+            if status >= 400:
+                return None
+            try:
+                return json.loads(content)
+            except ValueError:
+                return {}
+
+        return call
+
+    def report(self, recorders: List[Recorder], seconds: float) -> dict:
+        merged = defaultdict(list)
+        for recorder in recorders:
+            for label, samples in recorder.samples.items():
+                merged[label] += samples
+        endpoints = {}
+        for label, samples in sorted(merged.items()):
+            latencies = [sample[0] * 1000 for sample in samples]
+            queries = [sample[2] for sample in samples if sample[2] is not None]
+            endpoints[label] = {
+                "requests": len(samples),
+                "errors": sum(not sample[1] for sample in samples),
+                **{f"p{rank}_ms": round(percentile(latencies, rank), 3) for rank in PERCENTILES},
+                "throughput_rps": round(len(samples) / seconds, 2),
+                "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+            }
+        total = sum(endpoint["requests"] for endpoint in endpoints.values())
+        return {
+            "run_id": self.run_id,
+            "concurrency": self.concurrency,
+            "rounds": self.rounds,
+            "dataset": {model.__name__: model.objects.count() for model in (Artist, Album, Track, AlbumTrack)},
+            "seconds": round(seconds, 3),
+            "throughput_rps": round(total / seconds, 2),
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "endpoints": endpoints,
+        }
+
+
+def apply_server_metrics(report: dict, before: dict, after: dict) -> dict:
+    """Для --url: SQL на запрос по разнице метрик сервера до и после прогона, RSS сервера вместо своего."""
+    for label, endpoint in report["endpoints"].items():
+        total, count = after["queries"].get(label, (0, 0))
+        base_total, base_count = before["queries"].get(label, (0, 0))
+        if count > base_count:
+            endpoint["queries_per_request"] = round((total - base_total) / (count - base_count), 2)
+    report["peak_rss_mb"] = after["peak_rss"] and round(after["peak_rss"] / 1024 / 1024, 1)
+    return report
+
+
+def compare(baseline: dict, current: dict, max_regression: float) -> List[str]:
+    """Регрессии текущего прогона относительно базового, max_regression в процентах."""
+    limit = 1 + max_regression / 100
+    problems = []
+    if current["throughput_rps"] * limit < baseline["throughput_rps"]:
+        problems.append(f"throughput: {baseline['throughput_rps']} -> {current['throughput_rps']} rps")
+    for label, stats in current["endpoints"].items():
+        base = baseline["endpoints"].get(label)
+        if base is None:
+            continue
+        for rank in PERCENTILES[1:]:
+            key = f"p{rank}_ms"
+            if stats[key] > base[key] * limit:
+                problems.append(f"{label} {key}: {base[key]} -> {stats[key]}")
+        if (stats["queries_per_request"] or 0) > (base["queries_per_request"] or 0):
+            problems.append(f"{label} queries: {base['queries_per_request']} -> {stats['queries_per_request']}")
+        if stats["errors"] > base["errors"]:
+            problems.append(f"{label} errors: {base['errors']} -> {stats['errors']}")
+    return problems
+
+
+def codec_payloads() -> Dict[str, object]:
+    """Данные ответов первых страниц списков и исполнителя с наибольшим числом альбомов."""
+    client = Client()
+    paths = {f"{basename}-list": reverse(f"{basename}-list") for basename in ("artists", "albums", "tracks")}
+    artist_id = Artist.objects.order_by("-albums_count", "id").values_list("id", flat=True).first()
+    if artist_id is not None:
+        paths["artists-retrieve"] = reverse("artists-detail", args=[artist_id])
+    return {label: client.get(path, HTTP_ACCEPT="application/json").json() for label, path in paths.items()}
+
+
+def codec_report(rounds: int) -> dict:
+    """Медиана кодирования и декодирования (мс) и размер ответа (байт) каждым форматом по маршрутам."""
+    report = {}
+    for label, data in codec_payloads().items():
+        report[label] = {}
+        for name, (renderer, parser) in CODECS.items():
+            encode, decode = [], []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                content = renderer.render(data)
+                encode.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                parser.parse(io.BytesIO(content), parser.media_type, {})
+                decode.append(time.perf_counter() - start)
+            report[label][name] = {
+                "encode_ms": round(percentile(encode, 50) * 1000, 3),
+                "decode_ms": round(percentile(decode, 50) * 1000, 3),
+                "bytes": len(content),
+            }
+    return report
+
+
+def middleware_report(rounds: int) -> dict:
+    """Медиана (мкс) BrowserMiddleware на GET списка исполнителей: короткий стек API и полный стек браузера.
+
+    View пустая и, как SessionAuthentication DRF, проверяет пользователя из сессии.
+    С cookie сессии полный стек читает сессию из базы.
+    """
+    path = reverse("artists-list")
+    factory = RequestFactory()
+
+    def view(request):
+        if middleware.process_view(request, view, (), {}) is None:
+            user = getattr(request, "user", None)
+            user and user.is_authenticated
+        return HttpResponse()
+
+    middleware = BrowserMiddleware(view)
+    report = {}
+    for label, cookies in (("no_cookie", {}), ("session_cookie", {settings.SESSION_COOKIE_NAME: "0" * 32})):
+        report[label] = {}
+        for stack, prefixes in (("full", ()), ("lean", settings.API_PATH_PREFIXES)):
+            timings = []
+            with override_settings(API_PATH_PREFIXES=prefixes):
+                for _ in range(rounds):
+                    request = factory.get(path)
+                    request.COOKIES.update(cookies)
+                    start = time.perf_counter()
+                    middleware(request)
+                    timings.append(time.perf_counter() - start)
+            report[label][f"{stack}_us"] = round(percentile(timings, 50) * 1e6, 1)
+        report[label]["saved_us"] = round(report[label]["full_us"] - report[label]["lean_us"], 1)
+    return report
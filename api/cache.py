@@ -0,0 +1,173 @@
+"""
+Кэш отрендеренных ответов каталога.
+Запись кэша хранит версии своих тегов (artists:1, albums:*),
+изменение объекта удаляет версию тега и все записи с ним становятся недействительными.
+"""
+import hashlib
+import time
+from typing import Iterable, Optional
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+
+from config.db_router import reads_from_replica
+
+from .snapshot import publish_changes
+
+
+def object_tag(basename: str, pk) -> str:
+    return f"{basename}:{pk}"
+
+
+def collection_tag(basename: str) -> str:
+    return f"{basename}:*"
+
+
+class ResponseCache:
+    """Read-through кэш ответов с инвалидацией по тегам."""
+
+    key_prefix = "response"
+    tag_prefix = "response-tag"
+    generation_key = "response-generation"
+    invalidated_at_key = "response-invalidated-at"
+
+    @property
+    def backend(self):
+        return caches[settings.RESPONSE_CACHE_ALIAS]
+
+    def make_key(self, request, media_type: Optional[str] = None) -> str:
+        query = "&".join(sorted(request.GET.urlencode().split("&")))
+        raw = f"{request.path}?{query}|{media_type or request.accepted_media_type}"
+        return f"{self.key_prefix}:{hashlib.md5(raw.encode()).hexdigest()}"
+
+    def tag_key(self, tag: str) -> str:
+        return f"{self.tag_prefix}:{tag}"
+
+    def generation(self) -> int:
+        """Счетчик записей: меняется при каждой инвалидации."""
+        self.backend.add(self.generation_key, 0, timeout=None)
+        return self.backend.get(self.generation_key, 0)
+
+    def get(self, key: str) -> Optional[HttpResponse]:
+        entry = self.backend.get(key)
+        if entry is None:
+            return None
+        if self.backend.get_many(entry["tags"]) != entry["tags"]:
+            return None
+        response = HttpResponse(entry["content"], status=entry["status"], headers=entry["headers"])
+        response["X-Cache"] = "HIT"
+        return response
+
+    def set(
+        self, key: str, generation: int, response: HttpResponse, tags: Iterable[str], stale_window: float = 0
+    ) -> None:
+        """stale_window — секунд после инвалидации, когда ответ не кэшируется (прочитан с отстающей реплики)."""
+        if stale_window and time.time() - self.backend.get(self.invalidated_at_key, 0) < stale_window:
+            return
+        tag_keys = [self.tag_key(tag) for tag in tags]
+        versions = self.backend.get_many(tag_keys)
+        missing = {tag_key: uuid4().hex for tag_key in tag_keys if tag_key not in versions}
+        if missing:
+            self.backend.set_many(missing, timeout=None)
+        if self.generation() != generation:
+            # Пока строился ответ, каталог изменился: ответ мог устареть.
+            return
+        headers = {name: value for name, value in response.items() if name != "Content-Length"}
+        entry = {
+            "content": response.content,
+            "status": response.status_code,
+            "headers": headers,
+            "tags": versions | missing,
+        }
+        self.backend.set(key, entry)
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        self.backend.add(self.generation_key, 0, timeout=None)
+        self.backend.incr(self.generation_key)
+        self.backend.set(self.invalidated_at_key, time.time(), timeout=None)
+        self.backend.delete_many([self.tag_key(tag) for tag in tags])
+
+
+response_cache = ResponseCache()
+
+
+def invalidate(tags: Iterable[str]) -> None:
+    """Сбрасывает теги после коммита транзакции, чтобы не закэшировать старые данные."""
+    tags = set(tags)
+    transaction.on_commit(lambda: response_cache.invalidate(tags))
+    if settings.CATALOG_SNAPSHOT:
+        transaction.on_commit(lambda: publish_changes(tags))
+
+
+class BoundedInvalidation:
+    """Теги объектов большого изменения: после max_tags вместо тегов после коммита сбрасывается весь кэш ответов."""
+
+    def __init__(self, tags: Iterable[str], max_tags: int):
+        self.tags = set(tags)
+        self.max_tags = max_tags
+        self.overflow = False
+
+    def add(self, basename: str, pks: Iterable) -> None:
+        for pk in pks:
+            if self.overflow:
+                return
+            self.tags.add(object_tag(basename, pk))
+            if len(self.tags) > self.max_tags:
+                self.overflow = True
+                self.tags = set()
+
+    def invalidate(self, extra: Iterable[str] = ()) -> None:
+        """extra — теги списков, они сбрасываются и без переполнения."""
+        if self.overflow:
+            # Снимки каталога воркеров загрузятся заново: версия хранится в том же кэше.
+            transaction.on_commit(response_cache.backend.clear)
+        else:
+            invalidate(self.tags | set(extra))
+
+
+def replica_stale_window() -> float:
+    """Ответ с реплики может не содержать последних записей: не кэшируется, пока реплика догоняет primary."""
+    return settings.REPLICA_PIN_SECONDS if reads_from_replica() else 0
+
+
+class CachedResponseMixin:
+    """Кэширует GET ответы list и retrieve до изменения входящих в них объектов."""
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.method != "GET" or request.accepted_renderer.format == "api":
+            return handler(request, *args, **kwargs)
+        key = response_cache.make_key(request)
+        response = response_cache.get(key)
+        if response is not None:
+            return response
+        self.response_cache_entry = (key, response_cache.generation())
+        return handler(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        entry = getattr(self, "response_cache_entry", None)
+        if entry is not None and response.status_code == 200:
+            response.render()
+            response_cache.set(*entry, response, self.get_cache_tags(response.data), replica_stale_window())
+        return response
+
+    def get_cache_tags(self, data) -> set:
+        if self.action == "retrieve":
+            return set(self.get_object_cache_tags(data))
+        tags = {collection_tag(self.basename)}
+        for item in data["results"]:
+            tags.update(self.get_object_cache_tags(item))
+        return tags
+
+    def get_object_cache_tags(self, item) -> Iterable[str]:
+        """Теги объекта ответа: он сам и вложенные объекты, от которых зависит представление."""
+        yield object_tag(self.basename, item["id"])
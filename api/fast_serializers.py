@@ -0,0 +1,103 @@
+"""
+Быстрые сериализаторы чтения для list.
+Представление собирается из строк .values() и кортежей values_list без экземпляров моделей
+и привязки полей DRF; результат совпадает с AlbumReadSerializer, ArtistReadSerializer и TrackReadSerializer.
+"""
+from collections import defaultdict
+from operator import itemgetter
+from typing import Dict, Iterable, List
+
+from django.db.models import QuerySet
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from catalog.models import Album, AlbumTrack
+
+
+def album_tracks(album_ids: Iterable[int]) -> Dict[int, List[str]]:
+    """Как StringRelatedField(many=True) по album_tracks: "номер название" в порядке id."""
+    tracks = defaultdict(list)
+    rows = AlbumTrack.objects.filter(album_id__in=album_ids).values_list("album_id", "order", "track__name")
+    for album_id, order, name in rows:
+        tracks[album_id].append(f"{order} {name}")
+    return tracks
+
+
+def track_albums(track_ids: Iterable[int]) -> Dict[int, List[dict]]:
+    """Как TrackAlbumOrderSerializer(many=True): номер и название альбома в порядке id."""
+    albums = defaultdict(list)
+    rows = AlbumTrack.objects.filter(track_id__in=track_ids).values_list("track_id", "order", "album__name")
+    for track_id, order, name in rows:
+        albums[track_id].append({"order": order, "album": name})
+    return albums
+
+
+class FastReadSerializer:
+    """Повторяет интерфейс сериализатора DRF, нужный list: Serializer(page, many=True).data.
+
+    columns — поля .values() в порядке вывода, keys — их имена в ответе.
+    """
+
+    columns = ()
+    keys = ()
+
+    def __init__(self, instance=None, many: bool = False, **kwargs):
+        self.instance = instance
+        self.many = many
+        self.get_row = itemgetter(*self.columns)
+
+    @classmethod
+    def setup_eager_loading(cls, queryset: QuerySet) -> QuerySet:
+        return queryset.values(*cls.columns)
+
+    @property
+    def data(self):
+        rows = self.instance if self.many else [self.instance]
+        items = self.to_representation(rows)
+        if self.many:
+            return ReturnList(items, serializer=self)
+        return ReturnDict(items[0], serializer=self)
+
+    def to_representation(self, rows: Iterable[dict]) -> List[dict]:
+        keys, get_row = self.keys, self.get_row
+        return [dict(zip(keys, get_row(row))) for row in rows]
+
+
+class FastAlbumSerializer(FastReadSerializer):
+    columns = ("id", "name", "artist_id", "year", "tracks_count")
+    keys = ("id", "name", "artist", "year", "tracks_count")
+
+    def to_representation(self, rows: Iterable[dict]) -> List[dict]:
+        items = super().to_representation(rows)
+        tracks = album_tracks([item["id"] for item in items]) if items else {}
+        for item in items:
+            item["album_tracks"] = tracks.get(item["id"], [])
+        return items
+
+
+class FastArtistSerializer(FastReadSerializer):
+    columns = ("id", "name", "albums_count", "tracks_count")
+    keys = ("id", "name", "albums_count", "tracks_count")
+
+    def to_representation(self, rows: Iterable[dict]) -> List[dict]:
+        items = super().to_representation(rows)
+        if not items:
+            return items
+        album_rows = Album.objects.filter(artist_id__in=[item["id"] for item in items])
+        albums = defaultdict(list)
+        for album in FastAlbumSerializer(album_rows.values(*FastAlbumSerializer.columns), many=True).data:
+            albums[album["artist"]].append(album)
+        for item in items:
+            item["albums"] = albums.get(item["id"], [])
+        return items
+
+
+class FastTrackSerializer(FastReadSerializer):
+    columns = ("id", "name")
+    keys = ("id", "name")
+
+    def to_representation(self, rows: Iterable[dict]) -> List[dict]:
+        items = super().to_representation(rows)
+        albums = track_albums([item["id"] for item in items]) if items else {}
+        for item in items:
+            item["track_albums"] = albums.get(item["id"], [])
+        return items
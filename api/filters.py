@@ -0,0 +1,49 @@
+"""
+Фильтрация и сортировка списков каталога только по индексированным колонкам (0006_list_indexes).
+Параметры фильтра проверяются сериализатором view.filter_serializer_class,
+сортировка — только целиком одним из порядков view.orderings (или обратным ему),
+у каждого есть индекс, остальные сочетания ключей отклоняются с 400.
+"""
+from typing import Sequence, Tuple
+
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+
+ORDERING_PARAM = "ordering"
+
+
+class QueryParamsFilter(BaseFilterBackend):
+    """Фильтр по проверенным параметрам запроса."""
+
+    def filter_queryset(self, request, queryset, view):
+        serializer_class = getattr(view, "filter_serializer_class", None)
+        if serializer_class is None:
+            return queryset
+        serializer = serializer_class(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return serializer.filter_queryset(queryset)
+
+
+class AllowlistOrderingFilter(BaseFilterBackend):
+    """?ordering=-year,-id — один из порядков view.orderings целиком, в прямом или обратном направлении."""
+
+    ordering_param = ORDERING_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        orderings = getattr(view, "orderings", None)
+        value = request.query_params.get(self.ordering_param)
+        if not orderings or not value:
+            return queryset
+        return queryset.order_by(*self.get_ordering(value, orderings))
+
+    def get_ordering(self, value: str, orderings: Sequence[Tuple[str, ...]]) -> Tuple[str, ...]:
+        ordering = tuple(key.strip() for key in value.split(",") if key.strip())
+        if ordering in orderings or reverse(ordering) in orderings:
+            return ordering
+        available = "; ".join(",".join(allowed) for allowed in orderings)
+        message = f"Недопустимая сортировка: {value}. Доступны: {available} и обратные им (-ключ)"
+        raise serializers.ValidationError({self.ordering_param: [message]})
+
+
+def reverse(ordering: Tuple[str, ...]) -> Tuple[str, ...]:
+    return tuple(key[1:] if key.startswith("-") else f"-{key}" for key in ordering)
@@ -0,0 +1,53 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmark import Benchmark, HttpClient, LocalClient, apply_server_metrics, compare, scrape_metrics
+
+
+class Command(BaseCommand):
+    help = "Нагрузочный прогон всех маршрутов API с отчетом о задержках и сравнением с базовым прогоном"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", help="Адрес запущенного сервера, по умолчанию запросы в процессе")
+        parser.add_argument("--concurrency", type=int, default=4, help="Число параллельных клиентов")
+        parser.add_argument("--rounds", type=int, default=20, help="Кругов по всем маршрутам на клиента")
+        parser.add_argument("--warmup", type=int, default=1, help="Кругов прогрева без записи результатов")
+        parser.add_argument("--exclude", action="append", default=[], metavar="ACTION", help="Например artists-export")
+        parser.add_argument("--seed", type=int, default=0, help="Seed выбора объектов и страниц")
+        parser.add_argument("--output", default="benchmark.json", help="Файл json отчета")
+        parser.add_argument("--compare", metavar="BASELINE", help="Отчет базового прогона для сравнения")
+        parser.add_argument("--max-regression", type=float, default=10.0, help="Допустимый рост p95/p99, %%")
+
+    def handle(self, *args, **options):
+        url = options["url"]
+        benchmark = Benchmark(
+            make_client=(lambda: HttpClient(url)) if url else LocalClient,
+            concurrency=options["concurrency"],
+            rounds=options["rounds"],
+            warmup=options["warmup"],
+            exclude=options["exclude"],
+            seed=options["seed"],
+        )
+        before = scrape_metrics(url) if url else None
+        report = benchmark.run()
+        if url:
+            report = apply_server_metrics(report, before, scrape_metrics(url))
+        Path(options["output"]).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        for label, stats in report["endpoints"].items():
+            self.stdout.write(
+                f"{label:24} p50 {stats['p50_ms']:8.2f} ms  p95 {stats['p95_ms']:8.2f} ms  "
+                f"p99 {stats['p99_ms']:8.2f} ms  {stats['throughput_rps']:8.1f} rps  sql {stats['queries_per_request']}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{report['throughput_rps']} rps, пиковый RSS {report['peak_rss_mb']} MB: {options['output']}"
+            )
+        )
+        if options["compare"]:
+            baseline = json.loads(Path(options["compare"]).read_text(encoding="utf-8"))
+            problems = compare(baseline, report, options["max_regression"])
+            if problems:
+                raise CommandError("Регрессии относительно базового прогона:\n" + "\n".join(problems))
+            self.stdout.write(self.style.SUCCESS("Регрессий нет"))
@@ -0,0 +1,25 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from api.benchmark import codec_report
+
+
+class Command(BaseCommand):
+    help = "Время кодирования, декодирования и размер ответов API в форматах json, orjson и msgpack"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rounds", type=int, default=50, help="Повторов на маршрут и формат")
+        parser.add_argument("--output", default="codecs.json", help="Файл json отчета")
+
+    def handle(self, *args, **options):
+        report = codec_report(options["rounds"])
+        Path(options["output"]).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        for label, codecs in report.items():
+            for name, stats in codecs.items():
+                self.stdout.write(
+                    f"{label:18} {name:8} encode {stats['encode_ms']:8.3f} ms  "
+                    f"decode {stats['decode_ms']:8.3f} ms  {stats['bytes']:10} B"
+                )
+        self.stdout.write(self.style.SUCCESS(f"Отчет: {options['output']}"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from api.benchmark import middleware_report
+
+
+class Command(BaseCommand):
+    help = "Время middleware браузера на запрос к API: полный стек и короткий стек /api/"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rounds", type=int, default=2000, help="Запросов на вариант")
+
+    def handle(self, *args, **options):
+        for label, stats in middleware_report(options["rounds"]).items():
+            self.stdout.write(
+                f"{label:16} full {stats['full_us']:8.1f} us  lean {stats['lean_us']:8.1f} us  "
+                f"saved {stats['saved_us']:8.1f} us"
+            )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from config.docs import generate_schema
+from config.schema import SCHEMA_PATH
+
+
+class Command(BaseCommand):
+    help = "Собирает схему OpenAPI в config/openapi.json"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="Только проверить, что файл схемы актуален")
+
+    def handle(self, *args, **options):
+        content = generate_schema()
+        if options["check"]:
+            if not SCHEMA_PATH.exists() or SCHEMA_PATH.read_bytes() != content:
+                raise CommandError(f"{SCHEMA_PATH.name} устарел: выполните manage.py generate_schema")
+            self.stdout.write(self.style.SUCCESS(f"{SCHEMA_PATH.name} актуален"))
+            return
+        SCHEMA_PATH.write_bytes(content)
+        self.stdout.write(self.style.SUCCESS(f"Схема: {SCHEMA_PATH}"))
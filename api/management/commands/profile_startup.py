@@ -0,0 +1,27 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from config.startup import profile_startup, startup_report
+
+
+class Command(BaseCommand):
+    help = "Время импорта при старте воркера (python -X importtime) по модулям, пакетам и приложениям"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=20, help="Сколько самых долгих модулей и пакетов показать")
+        parser.add_argument("--output", default="startup.json", help="Файл json отчета")
+
+    def handle(self, *args, **options):
+        report = startup_report(*profile_startup(), top=options["top"])
+        Path(options["output"]).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        self.stdout.write(f"Старт: {report['startup_ms']} ms, импорт: {report['imports_ms']} ms")
+        for section in ("apps", "packages"):
+            self.stdout.write(f"\n{section}:")
+            for item in report[section]:
+                self.stdout.write(f"  {item['name']:40} {item['ms']:10.1f} ms")
+        self.stdout.write("\nmodules:")
+        for item in report["modules"]:
+            self.stdout.write(f"  {item['module']:60} {item['self_ms']:10.1f} ms {item['cumulative_ms']:10.1f} ms")
+        self.stdout.write(self.style.SUCCESS(f"Отчет: {options['output']}"))
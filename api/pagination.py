@@ -0,0 +1,121 @@
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+APPROXIMATE_COUNT = "approx"
+
+
+def estimate_count(queryset: QuerySet) -> int:
+    """Оценка числа строк по плану PostgreSQL, на остальных СУБД точный COUNT."""
+    if not isinstance(queryset, QuerySet):
+        return len(queryset)
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class ApproximatePage(Page):
+    """Страница, которая знает о следующей без подсчета всех строк."""
+
+    has_more = False
+
+    def has_next(self) -> bool:
+        return self.has_more
+
+
+class ApproximateCountPaginator(Paginator):
+    """Paginator без COUNT(*): общее число берется из оценки планировщика."""
+
+    @cached_property
+    def count(self) -> int:
+        return estimate_count(self.object_list)
+
+    def validate_number(self, number) -> int:
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+        return number
+
+    def page(self, number) -> ApproximatePage:
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page + 1
+        object_list = list(self.object_list[bottom:top])
+        if number > 1 and not object_list:
+            raise EmptyPage("That page contains no results")
+        page = ApproximatePage(object_list[: self.per_page], number, self)
+        page.has_more = len(object_list) > self.per_page
+        return page
+
+
+class CatalogCursorPagination(CursorPagination):
+    """Keyset пагинация по id или по уникальному индексированному name."""
+
+    ordering = "id"
+    ordering_query_param = "ordering"
+    ordering_fields = ("id", "name")
+
+    def get_ordering(self, request, queryset, view):
+        ordering = request.query_params.get(self.ordering_query_param, "")
+        if not ordering:
+            return (self.ordering,)
+        if ordering.lstrip("-") not in self.ordering_fields:
+            message = f"Keyset пагинация сортирует только по одному из полей: {', '.join(self.ordering_fields)}"
+            raise ValidationError({self.ordering_query_param: [message]})
+        return (ordering,)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if request.query_params.get(CatalogPagination.count_query_param) == APPROXIMATE_COUNT:
+            self.count = estimate_count(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.count is not None:
+            response.data = {"count": self.count, **response.data}
+        return response
+
+
+class CatalogPagination(PageNumberPagination):
+    """Постраничная пагинация с keyset режимом и приблизительным count по запросу.
+
+    ?cursor= (в том числе пустой) включает keyset режим,
+    ?count=approx заменяет COUNT(*) оценкой планировщика.
+    """
+
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    cursor_pagination_class = CatalogCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.cursor_query_param in request.query_params:
+            self.cursor_paginator = self.cursor_pagination_class()
+            page = self.cursor_paginator.paginate_queryset(queryset, request, view)
+            self.display_page_controls = self.cursor_paginator.display_page_controls
+            return page
+        if request.query_params.get(self.count_query_param) == APPROXIMATE_COUNT:
+            self.django_paginator_class = ApproximateCountPaginator
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
@@ -0,0 +1,66 @@
+"""
+Быстрые форматы ответов и запросов: JSON через orjson и MessagePack.
+Формат выбирается по Accept и Content-Type (application/json, application/msgpack).
+JSON совпадает по байтам с JSONRenderer DRF: компактный, UTF-8 без экранирования.
+Типы, которых нет в orjson и msgpack (lazy строки, Decimal), кодируются как в encoders.JSONEncoder DRF.
+"""
+import msgpack
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+encode_default = JSONEncoder().default
+json_renderer = JSONRenderer()
+LINE_SEPARATOR = "\u2028".encode()
+PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+
+class ORJSONRenderer(BaseRenderer):
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if json_renderer.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        content = orjson.dumps(data, default=encode_default, option=option)
+        # Как JSONRenderer: разделители строк недопустимы в строках JavaScript.
+        return content.replace(LINE_SEPARATOR, b"\\u2028").replace(PARAGRAPH_SEPARATOR, b"\\u2029")
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=encode_default, use_bin_type=True, datetime=False)
+
+
+class ORJSONParser(BaseParser):
+    media_type = "application/json"
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as error:
+            raise ParseError(f"JSON parse error - {error}")
+
+
+class MessagePackParser(BaseParser):
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, strict_map_key=False)
+        except (TypeError, ValueError) as error:
+            raise ParseError(f"MessagePack parse error - {error}")
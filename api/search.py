@@ -0,0 +1,54 @@
+"""
+Поиск по названиям исполнителей, альбомов и трэков одним UNION запросом.
+PostgreSQL: нечеткое совпадение pg_trgm и полнотекстовый поиск по GIN индексам (0003_search_indexes).
+Остальные СУБД: поиск подстроки без учета опечаток.
+"""
+from functools import reduce
+from operator import or_
+
+from django.db import connection
+from django.db.models import Case, CharField, F, FloatField, Q, QuerySet, Value, When
+from django.db.models.functions import Greatest
+
+from catalog.models import Album, Artist, Track
+
+SEARCH_MODELS = [("artist", Artist), ("album", Album), ("track", Track)]
+RESULT_FIELDS = ("kind", "id", "name", "rank")
+
+
+def postgres_search(queryset: QuerySet, text: str) -> QuerySet:
+    from django.contrib.postgres.lookups import TrigramSimilar
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+
+    vector = SearchVector("name", config="simple")
+    query = SearchQuery(text, config="simple")
+    return (
+        queryset.alias(vector=vector)
+        .filter(Q(TrigramSimilar(F("name"), text)) | Q(vector=query))
+        .annotate(rank=Greatest(TrigramSimilarity("name", text), SearchRank(vector, query)))
+    )
+
+
+def fallback_search(queryset: QuerySet, text: str) -> QuerySet:
+    terms = text.split() or [text]
+    rank = Case(
+        When(name__iexact=text, then=Value(1.0)),
+        When(name__istartswith=text, then=Value(0.75)),
+        When(name__icontains=text, then=Value(0.5)),
+        default=Value(0.25),
+        output_field=FloatField(),
+    )
+    return queryset.filter(reduce(or_, (Q(name__icontains=term) for term in terms))).annotate(rank=rank)
+
+
+def search_catalog(text: str) -> QuerySet:
+    """Совпадения по всем моделям, отсортированные по релевантности."""
+    search = postgres_search if connection.vendor == "postgresql" else fallback_search
+    querysets = [
+        search(model.objects.annotate(kind=Value(kind, output_field=CharField())), text)
+        .order_by()
+        .values(*RESULT_FIELDS)
+        for kind, model in SEARCH_MODELS
+    ]
+    first, *rest = querysets
+    return first.union(*rest, all=True).order_by("-rank", "kind", "id")
@@ -0,0 +1,133 @@
+"""
+Выбор полей ответа чтения: ?fields=id,name,albums.name и ?expand=albums.album_tracks.
+fields оставляет перечисленные поля (вложенные через точку), expand делает вложенные ресурсы
+необязательными: встраиваются только перечисленные. id возвращается всегда — по нему строятся теги кэша.
+Выбор урезает и дерево сериализатора, и запросы: only() по выбранным колонкам, prefetch только встроенных ресурсов.
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from django.db.models import QuerySet
+from rest_framework import serializers
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+ALWAYS_INCLUDED = ("id",)
+
+Tree = Dict[str, "Tree"]
+
+
+def parse_paths(value: str) -> Tree:
+    """Пути через запятую в дерево: a,b.c,b.d -> {"a": {}, "b": {"c": {}, "d": {}}}."""
+    tree = {}
+    for path in value.split(","):
+        node = tree
+        for name in filter(None, (part.strip() for part in path.split("."))):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def flatten(tree: Tree, prefix: str = "") -> List[str]:
+    paths = []
+    for name, subtree in tree.items():
+        paths.append(f"{prefix}{name}")
+        paths.extend(flatten(subtree, f"{prefix}{name}."))
+    return paths
+
+
+@dataclass(frozen=True)
+class FieldSelection:
+    """Выбор полей одного уровня дерева сериализатора, None — без ограничений."""
+
+    fields: Optional[Tree] = None
+    expand: Optional[Tree] = None
+
+    @classmethod
+    def from_query_params(cls, params) -> Optional["FieldSelection"]:
+        if FIELDS_PARAM not in params and EXPAND_PARAM not in params:
+            return None
+        fields = parse_paths(params[FIELDS_PARAM]) if FIELDS_PARAM in params else None
+        expand = parse_paths(params[EXPAND_PARAM]) if EXPAND_PARAM in params else None
+        return cls(fields=fields, expand=expand)
+
+    def includes(self, name: str, expandable: bool = False) -> bool:
+        if name in ALWAYS_INCLUDED:
+            return True
+        if not expandable:
+            return self.fields is None or name in self.fields
+        if self.fields is None and self.expand is None:
+            return True
+        return name in (self.fields or ()) or name in (self.expand or ())
+
+    def nested(self, name: str) -> "FieldSelection":
+        fields = (self.fields or {}).get(name) or None
+        expand = None if self.expand is None else self.expand.get(name, {})
+        return FieldSelection(fields=fields, expand=expand)
+
+
+class FieldSelectionMixin:
+    """Сериализатор чтения, из которого выбор полей убирает лишнее до сериализации.
+
+    expandable_fields — вложенные ресурсы, которые можно не встраивать.
+    """
+
+    expandable_fields = ()
+
+    def __init__(self, *args, selection: Optional[FieldSelection] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if selection is not None:
+            self.select(selection)
+
+    def select(self, selection: FieldSelection) -> None:
+        for name in list(self.fields):
+            expandable = name in self.expandable_fields
+            if not selection.includes(name, expandable):
+                self.fields.pop(name)
+                continue
+            child = self.nested_serializer(self.fields[name])
+            if expandable and child is not None:
+                child.select(selection.nested(name))
+
+    @staticmethod
+    def nested_serializer(field):
+        child = getattr(field, "child", field)
+        return child if isinstance(child, FieldSelectionMixin) else None
+
+    @classmethod
+    def validate_selection(cls, selection: FieldSelection, prefix: str = "") -> None:
+        """ValidationError с путями неизвестных полей, до построения queryset."""
+        errors = {}
+        for param, tree, allowed in (
+            (FIELDS_PARAM, selection.fields, cls.Meta.fields),
+            (EXPAND_PARAM, selection.expand, cls.expandable_fields),
+        ):
+            unknown = [f"{prefix}{name}" for name in (tree or {}) if name not in allowed]
+            for name, subtree in (tree or {}).items():
+                if name in allowed and subtree and cls.nested_serializer(cls._declared_fields.get(name)) is None:
+                    unknown.extend(flatten(subtree, f"{prefix}{name}."))
+            if unknown:
+                errors[param] = [f"Неизвестные поля: {', '.join(unknown)}"]
+        if errors:
+            raise serializers.ValidationError(errors)
+        for name in cls.expandable_fields:
+            child = cls.nested_serializer(cls._declared_fields.get(name))
+            if child is not None and selection.includes(name, expandable=True):
+                type(child).validate_selection(selection.nested(name), f"{prefix}{name}.")
+
+    @classmethod
+    def only_selected(
+        cls, queryset: QuerySet, selection: Optional[FieldSelection], required: Iterable[str] = ()
+    ) -> QuerySet:
+        """Только колонки выбранных полей и required (внешние ключи для prefetch)."""
+        if selection is None:
+            return queryset
+        names = [name for name in cls.Meta.fields if name not in cls.expandable_fields and selection.includes(name)]
+        return queryset.only(*names, *required)
+
+    @staticmethod
+    def expands(selection: Optional[FieldSelection], name: str) -> bool:
+        return selection is None or selection.includes(name, expandable=True)
+
+    @staticmethod
+    def nested_selection(selection: Optional[FieldSelection], name: str) -> Optional[FieldSelection]:
+        return None if selection is None else selection.nested(name)
@@ -1,9 +1,26 @@
+from typing import Iterable, Optional
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch, QuerySet
 from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from rest_framework.validators import UniqueValidator
 
+from catalog.integrity import FOREIGN_KEY, violated_constraint
 from catalog.models import Album, AlbumTrack, Artist, Track
 
+from .cache import collection_tag, invalidate, object_tag
+from .selection import FieldSelection, FieldSelectionMixin
+
+
+def validate_album_year(value: int) -> int:
+    year = timezone.now().year
+    if not (year - 300 < value <= year):
+        raise serializers.ValidationError(f"{value} is not a correcrt year!")
+    return value
+
 
 class AlbumTrackSerializer(serializers.ModelSerializer):
     """Просмотр треков в альбоме."""
@@ -15,14 +32,28 @@ class AlbumTrackSerializer(serializers.ModelSerializer):
         fields = ("id", "order", "track")
 
 
-class AlbumReadSerializer(serializers.ModelSerializer):
+class AlbumReadSerializer(FieldSelectionMixin, serializers.ModelSerializer):
     """Просмотр альбома."""
 
+    expandable_fields = ("album_tracks",)
+
     album_tracks = serializers.StringRelatedField(many=True)
 
     class Meta:
         model = Album
-        fields = ("id", "name", "artist", "year", "album_tracks")
+        fields = ("id", "name", "artist", "year", "tracks_count", "album_tracks")
+
+    @classmethod
+    def setup_eager_loading(
+        cls, queryset: QuerySet, selection: Optional[FieldSelection] = None, required: Iterable[str] = ()
+    ) -> QuerySet:
+        """Треки альбомов одним запросом вместе с названиями."""
+        queryset = cls.only_selected(queryset, selection, required)
+        if not cls.expands(selection, "album_tracks"):
+            return queryset
+        return queryset.prefetch_related(
+            Prefetch("album_tracks", queryset=AlbumTrack.objects.select_related("track")),
+        )
 
 
 class AlbumWriteSerializer(serializers.ModelSerializer):
@@ -38,23 +69,33 @@ class AlbumWriteSerializer(serializers.ModelSerializer):
         fields = ("name", "artist", "year")
 
     def validate_year(self, value: int) -> int:
-        year = timezone.now().year
-        if not (year - 300 < value <= year):
-            raise serializers.ValidationError(f"{value} is not a correcrt year!")
-        return value
+        return validate_album_year(value)
 
     def to_representation(self, instance):
         return AlbumReadSerializer(instance, context=self.context).data
 
 
-class ArtistReadSerializer(serializers.ModelSerializer):
+class ArtistReadSerializer(FieldSelectionMixin, serializers.ModelSerializer):
     """Просмотр исполнителя."""
 
+    expandable_fields = ("albums",)
+
     albums = AlbumReadSerializer(read_only=True, many=True)
 
     class Meta:
         model = Artist
-        fields = ("id", "name", "albums")
+        fields = ("id", "name", "albums_count", "tracks_count", "albums")
+
+    @classmethod
+    def setup_eager_loading(cls, queryset: QuerySet, selection: Optional[FieldSelection] = None) -> QuerySet:
+        """Альбомы исполнителей и их треки фиксированным числом запросов."""
+        queryset = cls.only_selected(queryset, selection)
+        if not cls.expands(selection, "albums"):
+            return queryset
+        albums = AlbumReadSerializer.setup_eager_loading(
+            Album.objects.all(), cls.nested_selection(selection, "albums"), required=("artist",)
+        )
+        return queryset.prefetch_related(Prefetch("albums", queryset=albums))
 
 
 class ArtistWriteSerializer(serializers.ModelSerializer):
@@ -83,48 +124,85 @@ class TrackAlbumOrderSerializer(serializers.ModelSerializer):
         fields = ("order", "album")
 
 
-class TrackReadSerializer(serializers.ModelSerializer):
+class TrackReadSerializer(FieldSelectionMixin, serializers.ModelSerializer):
     """Просмотр трэка."""
 
+    expandable_fields = ("track_albums",)
+
     track_albums = TrackAlbumOrderSerializer(read_only=True, many=True)
 
     class Meta:
         model = Track
         fields = ("id", "name", "track_albums")
 
+    @classmethod
+    def setup_eager_loading(cls, queryset: QuerySet, selection: Optional[FieldSelection] = None) -> QuerySet:
+        """Альбомы трэков одним запросом вместе с названиями."""
+        queryset = cls.only_selected(queryset, selection)
+        if not cls.expands(selection, "track_albums"):
+            return queryset
+        return queryset.prefetch_related(
+            Prefetch("track_albums", queryset=AlbumTrack.objects.select_related("album")),
+        )
+
+
+class UncheckedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """id связанного объекта без запроса: существование проверяет внешний ключ при записи."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        model = self.get_queryset().model
+        try:
+            pk = model._meta.pk.to_python(data)
+        except (TypeError, DjangoValidationError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        return model(pk=pk)
+
 
 class TrackAlbumOrderWriteSerializer(serializers.ModelSerializer):
-    """Запись трека, нумерации и альбома."""
+    """Запись трека, нумерации и альбома.
+
+    Проверок перед записью нет: трэк создается или находится одним upsert по названию,
+    связь с альбомом вставляется следом, нарушенное ограничение переводится в ошибку валидации.
+    """
+
+    constraint_errors = {
+        "unique_order_album": "Номер уже занят в этом альбоме",
+        "unique_track_album": "Трек уже есть в альбоме",
+        "unique_track_order": "Номер уже существует в другом альбоме",
+    }
 
     name = serializers.CharField(max_length=100, source="track")
-    album = serializers.PrimaryKeyRelatedField(queryset=Album.objects.all())
+    album = UncheckedPrimaryKeyRelatedField(queryset=Album.objects.all())
     order = serializers.IntegerField(min_value=1, max_value=999)
 
     class Meta:
         model = AlbumTrack
         fields = ("name", "order", "album")
 
-    def validate(self, data):
-        name = data["track"]
-        album = data["album"]
-        order = data["order"]
-        if AlbumTrack.objects.filter(order=order, album=album).exists():
-            raise serializers.ValidationError("Номер уже занят в этом альбоме")
-        if not Track.objects.filter(name=name).exists():
-            return data
-        track = Track.objects.get(name=name)
-        if AlbumTrack.objects.filter(track=track, album=album).exists():
-            raise serializers.ValidationError("Трек уже есть в альбоме")
-        if AlbumTrack.objects.filter(track=track, order=order).exists():
-            raise serializers.ValidationError("Номер уже существует в другом альбоме")
-        return data
-
     def create(self, validated_data):
-        name = validated_data.pop("track")
-        album = validated_data.pop("album")
-        order = validated_data.pop("order")
-        track, status = Track.objects.get_or_create(name=name)
-        return AlbumTrack.objects.create(track=track, album=album, order=order)
+        name = validated_data["track"]
+        album = validated_data["album"]
+        order = validated_data["order"]
+        try:
+            with transaction.atomic():
+                track = Track(id=Track.objects.upsert_id(name), name=name)
+                album_track = AlbumTrack.objects.create(track=track, album=album, order=order)
+        except IntegrityError as error:
+            raise self.integrity_error(error, album) from error
+        # Новый трэк вставлен без post_save: список трэков сбрасывается здесь.
+        invalidate({collection_tag("tracks"), object_tag("tracks", track.pk)})
+        return album_track
+
+    def integrity_error(self, error: IntegrityError, album: Album) -> serializers.ValidationError:
+        constraint = violated_constraint(error, AlbumTrack)
+        if constraint == FOREIGN_KEY:
+            message = self.fields["album"].error_messages["does_not_exist"].format(pk_value=album.pk)
+            return serializers.ValidationError({"album": [message]})
+        if constraint not in self.constraint_errors:
+            raise error
+        return serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [self.constraint_errors[constraint]]})
 
     def to_representation(self, instance):
         return TrackAlbumOrderReadSerializer(instance, context=self.context).data
@@ -143,4 +221,165 @@ class TrackAlbumOrderReadSerializer(serializers.ModelSerializer):
 
 
 class AlbumTrackDeleteSerializer(serializers.Serializer):
+    """Номер или список номеров трэков для удаления из альбома."""
+
+    order = serializers.IntegerField(min_value=1, required=False)
+    orders = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=999,
+        required=False,
+    )
+
+    def validate(self, data):
+        if ("order" in data) == ("orders" in data):
+            raise serializers.ValidationError("Нужно указать order или orders")
+        return data
+
+
+class TrackMoveSerializer(serializers.Serializer):
     order = serializers.IntegerField(min_value=1)
+    to = serializers.IntegerField(min_value=1)
+
+
+class AlbumReorderSerializer(serializers.Serializer):
+    """Новый порядок трэков альбома: полный список id трэков, перенос одного номера или уплотнение."""
+
+    tracks = serializers.ListField(child=serializers.IntegerField(), min_length=1, max_length=999, required=False)
+    move = TrackMoveSerializer(required=False)
+    compact = serializers.BooleanField(required=False)
+
+    def validate(self, data):
+        operations = [name for name in ("tracks", "move", "compact") if data.get(name)]
+        if len(operations) != 1:
+            raise serializers.ValidationError("Нужно указать одно из tracks, move или compact")
+        return data
+
+
+class BulkAlbumSerializer(serializers.Serializer):
+    """Альбом пакетной загрузки, номер трека — позиция в списке."""
+
+    name = serializers.CharField(max_length=100)
+    year = serializers.IntegerField()
+    tracks = serializers.ListField(child=serializers.CharField(max_length=100), max_length=999)
+
+    def validate_year(self, value: int) -> int:
+        return validate_album_year(value)
+
+    def validate_tracks(self, value: list) -> list:
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError("Трек уже есть в альбоме")
+        return value
+
+
+class BulkArtistSerializer(serializers.Serializer):
+    """Исполнитель пакетной загрузки."""
+
+    name = serializers.CharField(max_length=100)
+    albums = BulkAlbumSerializer(many=True)
+
+
+class CatalogBulkSerializer(serializers.Serializer):
+    """Пакетная загрузка каталога: проверка всего пакета несколькими запросами."""
+
+    artists = BulkArtistSerializer(many=True, allow_empty=False)
+
+    def validate(self, data):
+        artists = data["artists"]
+        album_names = [album["name"] for artist in artists for album in artist["albums"]]
+        track_names = {name for artist in artists for album in artist["albums"] for name in album["tracks"]}
+        existing_albums = set(Album.objects.filter(name__in=album_names).values_list("name", flat=True))
+        taken_orders = set(
+            Track.objects.filter(name__in=track_names, track_albums__isnull=False).values_list(
+                "name", "track_albums__order"
+            )
+        )
+
+        errors = []
+        seen_artists, seen_albums = set(), set()
+        for artist in artists:
+            artist_errors = {}
+            if artist["name"] in seen_artists:
+                artist_errors["name"] = ["Исполнитель повторяется в пакете"]
+            seen_artists.add(artist["name"])
+            album_errors = []
+            for album in artist["albums"]:
+                album_error = {}
+                if album["name"] in existing_albums or album["name"] in seen_albums:
+                    album_error["name"] = [UniqueValidator.message]
+                seen_albums.add(album["name"])
+                track_errors = {}
+                for order, name in enumerate(album["tracks"], start=1):
+                    if (name, order) in taken_orders:
+                        track_errors[order - 1] = ["Номер уже существует в другом альбоме"]
+                    taken_orders.add((name, order))
+                if track_errors:
+                    album_error["tracks"] = track_errors
+                album_errors.append(album_error)
+            if any(album_errors):
+                artist_errors["albums"] = album_errors
+            errors.append(artist_errors)
+        if any(errors):
+            raise serializers.ValidationError({"artists": errors})
+        return data
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(min_length=1, max_length=100)
+
+
+class CatalogFilterSerializer(serializers.Serializer):
+    """Параметры фильтра списка: имя параметра -> lookup в lookups, незаданные не применяются."""
+
+    lookups = {}
+
+    def get_filters(self) -> dict:
+        return {self.lookups[name]: value for name, value in self.validated_data.items()}
+
+    def filter_queryset(self, queryset: QuerySet) -> QuerySet:
+        return queryset.filter(**self.get_filters())
+
+
+class AlbumFilterSerializer(CatalogFilterSerializer):
+    """Альбомы исполнителя, за годы, по началу названия."""
+
+    lookups = {
+        "artist": "artist",
+        "year_from": "year__gte",
+        "year_to": "year__lte",
+        "name_prefix": "name__startswith",
+    }
+
+    artist = serializers.IntegerField(min_value=1, required=False)
+    year_from = serializers.IntegerField(min_value=0, required=False)
+    year_to = serializers.IntegerField(min_value=0, required=False)
+    name_prefix = serializers.CharField(min_length=1, max_length=100, required=False)
+
+    def validate(self, data):
+        if data.get("year_from", 0) > data.get("year_to", data.get("year_from", 0)):
+            raise serializers.ValidationError({"year_to": ["Должен быть не меньше year_from"]})
+        return data
+
+
+class TrackFilterSerializer(CatalogFilterSerializer):
+    """Трэки альбома или исполнителя: подзапрос по связям, без дублей от JOIN."""
+
+    lookups = {"album": "album", "artist": "album__artist"}
+
+    album = serializers.IntegerField(min_value=1, required=False)
+    artist = serializers.IntegerField(min_value=1, required=False)
+
+    def filter_queryset(self, queryset: QuerySet) -> QuerySet:
+        filters = self.get_filters()
+        if not filters:
+            return queryset
+        return queryset.filter(pk__in=AlbumTrack.objects.filter(**filters).values("track_id"))
+
+
+class SearchResultSerializer(serializers.Serializer):
+    """Результат поиска по каталогу."""
+
+    type = serializers.CharField(source="kind")
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    rank = serializers.FloatField()
@@ -1,18 +1,283 @@
-from django.shortcuts import get_object_or_404
+from typing import Optional
+
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Case, Exists, F, OuterRef, Prefetch, Value, When
+from django.http import StreamingHttpResponse
 from rest_framework import status
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
-from catalog.models import Album, AlbumTrack, Track
+from catalog import counters
+from catalog.models import Album, AlbumTrack, Artist, Track
+from catalog.signals import catalog_changed
+
+from .cache import BoundedInvalidation, collection_tag, invalidate, object_tag
+from .renderers import ORJSONRenderer
+from .serializers import AlbumReadSerializer, ArtistReadSerializer
+
+BULK_BATCH_SIZE = 1000
+DELETE_BATCH_SIZE = 1000
+# Больше тегов удаленных объектов дешевле сбросить кэш ответов целиком.
+MAX_DELETE_TAGS = 10000
+EXPORT_CHUNK_SIZE = 500
+# Временный сдвиг номеров при перестановке: больше любого номера трэка, меньше предела smallint.
+ORDER_SWAP_OFFSET = 16000
+
+
+def raw_delete(queryset) -> int:
+    """Один DELETE ... WHERE по queryset без Collector и post_delete, возвращает число удаленных строк.
+
+    QuerySet._raw_delete — закрытый API Django 4.2, поэтому вызывается только здесь. Обычный delete()
+    загружает объекты и шлет сигналы по одному: AlbumTrack обновляет счетчики двумя UPDATE на связь.
+    Вызывающий сам обновляет счетчики (catalog.counters) и кэш ответов вместе со снимком (invalidate).
+    При обновлении Django сверить с test_raw_delete_contract.
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+def remove_track_from_album(album_id: int, data: dict) -> Response:
+    """Удаляет номера из альбома одной транзакцией, трэки без альбомов удаляются вместе с ними.
+
+    Строка альбома блокируется, поэтому параллельные изменения одного альбома выполняются по очереди.
+    """
+    orders = set(data["orders"]) if "orders" in data else {data["order"]}
+    with transaction.atomic():
+        albums = Album.objects.select_for_update().values_list("artist_id", flat=True)
+        artist_id = get_object_or_404(albums, pk=album_id)
+        links = AlbumTrack.objects.filter(album_id=album_id, order__in=orders)
+        found = list(links.values_list("id", "track_id", "order"))
+        missing = orders - {order for _, _, order in found}
+        if missing:
+            if "order" in data:
+                return Response("Нет такого номера трэка", status=status.HTTP_404_NOT_FOUND)
+            return Response({"orders": sorted(missing)}, status=status.HTTP_404_NOT_FOUND)
+        track_ids = [track_id for _, track_id, _ in found]
+        raw_delete(AlbumTrack.objects.filter(id__in=[link_id for link_id, _, _ in found]))
+        orphans = Track.objects.filter(id__in=track_ids).filter(
+            ~Exists(AlbumTrack.objects.filter(track=OuterRef("pk")))
+        )
+        deleted_tracks = raw_delete(orphans)
+        # Удаление в обход post_delete (raw_delete): счетчики и кэш обновляются здесь.
+        counters.add(Album, album_id, tracks_count=-len(found))
+        counters.add(Artist, artist_id, tracks_count=-len(found))
+        tags = {object_tag("albums", album_id), object_tag("artists", artist_id)}
+        tags |= {object_tag("tracks", track_id) for track_id in track_ids}
+        invalidate(tags | {collection_tag("tracks")})
+    if "order" in data:
+        message = "Трэк удален" if deleted_tracks else "Трэк удален из альбома"
+        return Response(message, status=status.HTTP_204_NO_CONTENT)
+    return Response({"album_tracks": len(found), "tracks": deleted_tracks}, status=status.HTTP_204_NO_CONTENT)
+
+
+def delete_albums(albums, tags: BoundedInvalidation) -> dict:
+    """Удаляет альбомы queryset со связями пачками по DELETE_BATCH_SIZE и трэки, оставшиеся без альбомов.
+
+    Удаление через raw_delete в обход Collector и post_delete: объекты не загружаются, память не зависит
+    от числа связей. Счетчики исполнителя обновляет вызывающий, теги удаленных объектов собираются в tags.
+    """
+    # Связь, добавленная параллельно после последней пачки, нарушила бы внешний ключ при удалении альбомов:
+    # добавление связи обновляет счетчик альбома и ждет блокировки, начатая раньше попадает в пачки.
+    album_ids = list(albums.select_for_update().values_list("id", flat=True))
+    links = AlbumTrack.objects.filter(album__in=albums.values("id")).order_by("id").values_list("id", "track_id")
+    deleted = {"albums": 0, "album_tracks": 0, "tracks": 0}
+    while True:
+        rows = list(links[:DELETE_BATCH_SIZE])
+        if not rows:
+            break
+        track_ids = {track_id for _, track_id in rows}
+        deleted["album_tracks"] += raw_delete(AlbumTrack.objects.filter(id__in=[link_id for link_id, _ in rows]))
+        # Трэк, который встретится в следующих пачках, еще связан с альбомом и удалится вместе с ней.
+        orphans = Track.objects.filter(id__in=track_ids).filter(
+            ~Exists(AlbumTrack.objects.filter(track=OuterRef("pk")))
+        )
+        deleted["tracks"] += raw_delete(orphans)
+        tags.add("tracks", track_ids)
+    tags.add("albums", album_ids)
+    deleted["albums"] = raw_delete(albums)
+    return deleted
+
+
+def delete_artist(artist_id) -> Response:
+    """Удаляет исполнителя с альбомами одной транзакцией, отвечает числом удаленных объектов."""
+    with transaction.atomic():
+        artist_id = get_object_or_404(Artist.objects.select_for_update().values_list("id", flat=True), pk=artist_id)
+        tags = BoundedInvalidation({object_tag("artists", artist_id)}, MAX_DELETE_TAGS)
+        deleted = delete_albums(Album.objects.filter(artist_id=artist_id), tags)
+        deleted["artists"] = raw_delete(Artist.objects.filter(pk=artist_id))
+        tags.invalidate(deleted_collections(deleted))
+    return Response(deleted)
+
+
+def delete_album(album_id) -> Response:
+    """Удаляет альбом со связями одной транзакцией, отвечает числом удаленных объектов."""
+    with transaction.atomic():
+        albums = Album.objects.select_for_update().values_list("id", "artist_id")
+        album_id, artist_id = get_object_or_404(albums, pk=album_id)
+        tags = BoundedInvalidation({object_tag("artists", artist_id)}, MAX_DELETE_TAGS)
+        deleted = delete_albums(Album.objects.filter(pk=album_id), tags)
+        # Удаление в обход post_delete (raw_delete): счетчики исполнителя обновляются здесь.
+        counters.add(Artist, artist_id, albums_count=-deleted["albums"], tracks_count=-deleted["album_tracks"])
+        tags.invalidate(deleted_collections(deleted))
+    return Response(deleted)
+
+
+def deleted_collections(deleted: dict) -> set:
+    # Удаленные связи меняют списки трэков с фильтрами ?album= и ?artist=.
+    basenames = {"album_tracks": "tracks"}
+    return {collection_tag(basenames.get(basename, basename)) for basename, count in deleted.items() if count}
+
+
+def new_positions(links: list, data: dict) -> Optional[list]:
+    """id связей в новом порядке по текущему порядку links, None если tracks не совпадает с трэками альбома."""
+    if data.get("tracks"):
+        by_track = {track_id: link_id for link_id, track_id, _ in links}
+        if len(data["tracks"]) != len(by_track) or set(data["tracks"]) != by_track.keys():
+            return None
+        return [by_track[track_id] for track_id in data["tracks"]]
+    link_ids = [link_id for link_id, _, _ in links]
+    if data.get("move"):
+        orders = [order for _, _, order in links]
+        link_id = link_ids.pop(orders.index(data["move"]["order"]))
+        link_ids.insert(data["move"]["to"] - 1, link_id)
+    return link_ids
+
+
+def reorder_album(album_id: int, data: dict) -> Response:
+    """Нумерует трэки альбома 1..n в новом порядке одним UPDATE.
+
+    Ограничения номеров на PostgreSQL проверяются в конце оператора,
+    на остальных СУБД номера сначала сдвигаются за пределы допустимых.
+    """
+    with transaction.atomic():
+        albums = Album.objects.select_for_update().values_list("artist_id", flat=True)
+        artist_id = get_object_or_404(albums, pk=album_id)
+        links = list(
+            AlbumTrack.objects.filter(album_id=album_id).order_by("order").values_list("id", "track_id", "order")
+        )
+        if data.get("move") and data["move"]["order"] not in {order for _, _, order in links}:
+            return Response("Нет такого номера трэка", status=status.HTTP_404_NOT_FOUND)
+        positions = new_positions(links, data)
+        if positions is None:
+            return Response({"tracks": ["Нужен полный список трэков альбома"]}, status=status.HTTP_400_BAD_REQUEST)
+        current = {link_id: (track_id, order) for link_id, track_id, order in links}
+        changed = {link_id: order for order, link_id in enumerate(positions, start=1) if current[link_id][1] != order}
+        if changed:
+            taken = AlbumTrack.objects.filter(
+                track_id__in=[current[link_id][0] for link_id in changed],
+                order__in=changed.values(),
+            ).exclude(album_id=album_id)
+            if taken.exists():
+                return Response(
+                    {"tracks": ["Номер уже существует в другом альбоме"]}, status=status.HTTP_400_BAD_REQUEST
+                )
+            update_orders(changed)
+            tags = {object_tag("albums", album_id), object_tag("artists", artist_id)}
+            tags |= {object_tag("tracks", current[link_id][0]) for link_id in changed}
+            invalidate(tags)
+    album = AlbumReadSerializer.setup_eager_loading(Album.objects.all()).get(pk=album_id)
+    return Response(AlbumReadSerializer(album).data)
+
+
+def update_orders(orders: dict) -> None:
+    """Новые номера связей {id: номер} одним UPDATE, без поддержки отложенных ограничений — двумя."""
+    links = AlbumTrack.objects.filter(id__in=orders)
+    if connections[links.db].features.supports_deferrable_unique_constraints:
+        links.update(order=Case(*(When(id=link_id, then=Value(order)) for link_id, order in orders.items())))
+        return
+    offset = ORDER_SWAP_OFFSET
+    links.update(order=Case(*(When(id=link_id, then=Value(order + offset)) for link_id, order in orders.items())))
+    links.update(order=F("order") - offset)
+
+
+def bulk_create_by_name(model, names) -> dict:
+    """Создает объекты с уникальным name, возвращает {name: id}."""
+    objects = model.objects.bulk_create([model(name=name) for name in names], batch_size=BULK_BATCH_SIZE)
+    if all(obj.pk is not None for obj in objects):
+        return {obj.name: obj.pk for obj in objects}
+    return dict(model.objects.filter(name__in=names).values_list("name", "id"))
+
+
+def bulk_create_catalog(data: dict) -> Response:
+    artists = data["artists"]
+    artist_names = [artist["name"] for artist in artists]
+    track_names = {name for artist in artists for album in artist["albums"] for name in album["tracks"]}
+    try:
+        with transaction.atomic():
+            artist_ids = dict(Artist.objects.filter(name__in=artist_names).values_list("name", "id"))
+            new_artists = bulk_create_by_name(Artist, [name for name in artist_names if name not in artist_ids])
+            track_ids = dict(Track.objects.filter(name__in=track_names).values_list("name", "id"))
+            new_tracks = bulk_create_by_name(Track, track_names - track_ids.keys())
+            artist_ids |= new_artists
+            track_ids |= new_tracks
+
+            albums = Album.objects.bulk_create(
+                [
+                    Album(name=album["name"], year=album["year"], artist_id=artist_ids[artist["name"]])
+                    for artist in artists
+                    for album in artist["albums"]
+                ],
+                batch_size=BULK_BATCH_SIZE,
+            )
+            if any(album.pk is None for album in albums):
+                album_ids = dict(
+                    Album.objects.filter(name__in=[album.name for album in albums]).values_list("name", "id")
+                )
+            else:
+                album_ids = {album.name: album.pk for album in albums}
+            album_tracks = AlbumTrack.objects.bulk_create(
+                [
+                    AlbumTrack(album_id=album_ids[album["name"]], track_id=track_ids[name], order=order)
+                    for artist in artists
+                    for album in artist["albums"]
+                    for order, name in enumerate(album["tracks"], start=1)
+                ],
+                batch_size=BULK_BATCH_SIZE,
+            )
+            catalog_changed.send(
+                sender=Artist,
+                artists=artist_ids.values(),
+                albums=album_ids.values(),
+                tracks=track_ids.values(),
+            )
+    except IntegrityError:
+        # Параллельный запрос занял названия или номера после проверки сериализатора.
+        return Response(catalog_conflicts(artists), status=status.HTTP_400_BAD_REQUEST)
+    created = {
+        "artists": len(new_artists),
+        "albums": len(albums),
+        "tracks": len(new_tracks),
+        "album_tracks": len(album_tracks),
+    }
+    return Response(created, status=status.HTTP_201_CREATED)
+
+
+def catalog_conflicts(artists: list) -> dict:
+    """Названия альбомов и номера трэков пакета, уже занятые в каталоге."""
+    albums = [album for artist in artists for album in artist["albums"]]
+    orders = {(name, order) for album in albums for order, name in enumerate(album["tracks"], start=1)}
+    existing_albums = set(
+        Album.objects.filter(name__in=[album["name"] for album in albums]).values_list("name", flat=True)
+    )
+    taken_orders = AlbumTrack.objects.filter(track__name__in={name for name, _ in orders}).values_list(
+        "track__name", "order"
+    )
+    errors = {}
+    if existing_albums:
+        errors["albums"] = [f"Альбомы уже существуют: {', '.join(sorted(existing_albums))}"]
+    taken_tracks = {name for name, _ in orders & set(taken_orders)}
+    if taken_tracks:
+        errors["tracks"] = [f"Номера трэков уже заняты: {', '.join(sorted(taken_tracks))}"]
+    return errors or {"artists": ["Каталог изменен параллельным запросом, повторите запрос"]}
 
 
-def remove_track_from_album(album: Album, data: dict) -> Response:
-    order = data["order"]
-    if not AlbumTrack.objects.filter(album=album, order=order).exists():
-        return Response("Нет такого номера трэка", status=status.HTTP_404_NOT_FOUND)
-    album_track_order = get_object_or_404(AlbumTrack, album=album, order=order)
-    if AlbumTrack.objects.filter(track=album_track_order.track).count() == 1:
-        track = get_object_or_404(Track, id=album_track_order.track.id)
-        track.delete()
-        return Response("Трэк удален", status=status.HTTP_204_NO_CONTENT)
-    album_track_order.delete()
-    return Response("Трэк удален из альбома", status=status.HTTP_204_NO_CONTENT)
+def export_catalog() -> StreamingHttpResponse:
+    """NDJSON выгрузка: исполнитель на строку, память не зависит от размера каталога."""
+    album_tracks = AlbumTrack.objects.select_related("track").order_by("order")
+    albums = Album.objects.prefetch_related(Prefetch("album_tracks", queryset=album_tracks))
+    artists = Artist.objects.prefetch_related(Prefetch("albums", queryset=albums))
+    renderer = ORJSONRenderer()
+    lines = (
+        renderer.render(ArtistReadSerializer(artist).data) + b"\n"
+        for artist in artists.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    return StreamingHttpResponse(lines, content_type="application/x-ndjson")
@@ -0,0 +1,78 @@
+"""
+Инвалидация кэша ответов по изменениям каталога.
+Записи исполнителей помечены тегами своих альбомов, поэтому изменение альбома
+или его треков сбрасывает только этот альбом, его исполнителя и его треки.
+Любое изменение сбрасывает и списки (collection_tag): фильтры и сортировка по измененному полю
+могут переместить объект на страницу, у которой нет его тега.
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from catalog.models import Album, AlbumTrack, Artist, Track
+from catalog.signals import catalog_changed
+
+from .cache import collection_tag, invalidate, object_tag, response_cache
+
+
+def object_tags(basename: str, pks) -> set:
+    return {object_tag(basename, pk) for pk in pks}
+
+
+@receiver(post_save, sender=Artist)
+@receiver(post_delete, sender=Artist)
+def artist_changed(sender, instance, **kwargs):
+    invalidate({object_tag("artists", instance.pk), collection_tag("artists")})
+
+
+@receiver(post_save, sender=Album)
+@receiver(post_delete, sender=Album)
+def album_changed(sender, instance, created=False, signal=None, **kwargs):
+    # Список трэков фильтруется по исполнителю альбома (?artist=).
+    tags = {object_tag("albums", instance.pk), object_tag("artists", instance.artist_id)}
+    tags |= {collection_tag("albums"), collection_tag("tracks")}
+    if not created and signal is not post_delete:
+        track_ids = AlbumTrack.objects.filter(album=instance).values_list("track_id", flat=True)
+        tags |= object_tags("tracks", track_ids)
+    invalidate(tags)
+
+
+@receiver(post_save, sender=Track)
+@receiver(post_delete, sender=Track)
+def track_changed(sender, instance, created=False, signal=None, **kwargs):
+    tags = {object_tag("tracks", instance.pk), collection_tag("tracks")}
+    if not created and signal is not post_delete:
+        album_ids = AlbumTrack.objects.filter(track=instance).values_list("album_id", flat=True)
+        tags |= object_tags("albums", album_ids)
+    invalidate(tags)
+
+
+@receiver(post_save, sender=AlbumTrack)
+@receiver(post_delete, sender=AlbumTrack)
+def album_track_changed(sender, instance, **kwargs):
+    # Список трэков фильтруется по альбому и исполнителю (?album=, ?artist=).
+    tags = {object_tag("albums", instance.album_id), object_tag("tracks", instance.track_id)}
+    invalidate(tags | {collection_tag("tracks")})
+
+
+@receiver(m2m_changed, sender=Track.albums.through)
+def track_albums_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    related_ids = set(pk_set or ())
+    if action == "pre_clear":
+        lookup, related_field = ("album", "track_id") if reverse else ("track", "album_id")
+        links = AlbumTrack.objects.filter(**{lookup: instance})
+        related_ids = set(links.values_list(related_field, flat=True))
+    album_ids, track_ids = ({instance.pk}, related_ids) if reverse else (related_ids, {instance.pk})
+    invalidate(object_tags("albums", album_ids) | object_tags("tracks", track_ids) | {collection_tag("tracks")})
+
+
+@receiver(catalog_changed)
+def catalog_bulk_changed(sender, artists=(), albums=(), tracks=(), full=False, **kwargs):
+    if full:
+        transaction.on_commit(response_cache.backend.clear)
+        return
+    tags = object_tags("artists", artists) | object_tags("albums", albums) | object_tags("tracks", tracks)
+    tags |= {collection_tag("artists"), collection_tag("albums"), collection_tag("tracks")}
+    invalidate(tags)
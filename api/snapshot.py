@@ -0,0 +1,392 @@
+"""
+Снимок каталога в памяти процесса для чтения без базы (CATALOG_SNAPSHOT=True).
+Записи — объекты со __slots__, индексы по id и упорядоченные списки id для страниц,
+у альбома и трэка — отсортированные id связей (порядок AlbumTrack по id, как у сериализаторов).
+Счетчики считаются по связям снимка.
+
+Изменения каталога публикуются после коммита журналом тегов (artists:1, albums:5) с номером версии
+в общем кэше (api.cache.invalidate). Воркер с отставшей версией перечитывает с primary только
+затронутые объекты, при разрыве журнала или сбросе кэша загружает снимок целиком.
+Опубликованная версия (CatalogData) не меняется: обновление собирается на копии, измененные записи
+копируются, и ссылка на версию заменяется целиком. Чтение берет текущую версию без блокировок.
+"""
+import random
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from catalog.models import Album, AlbumTrack, Artist, Track
+from config.db_router import PRIMARY
+
+VERSION_KEY = "catalog-snapshot-version"
+CHANGE_KEY = "catalog-snapshot-change:{}"
+CHANGE_LOG_TIMEOUT = 3600
+# Дальше журнала дешевле загрузить снимок заново.
+MAX_CHANGES = 1000
+
+
+class ArtistRecord:
+    __slots__ = ("id", "name", "album_ids")
+
+    def __init__(self, id: int, name: str):
+        self.id = id
+        self.name = name
+        self.album_ids = []
+
+
+class AlbumRecord:
+    __slots__ = ("id", "name", "artist_id", "year", "link_ids")
+
+    def __init__(self, id: int, name: str, artist_id: int, year: int):
+        self.id = id
+        self.name = name
+        self.artist_id = artist_id
+        self.year = year
+        self.link_ids = []
+
+
+class TrackRecord:
+    __slots__ = ("id", "name", "link_ids")
+
+    def __init__(self, id: int, name: str):
+        self.id = id
+        self.name = name
+        self.link_ids = []
+
+
+class LinkRecord:
+    __slots__ = ("id", "order", "album_id", "track_id")
+
+    def __init__(self, id: int, order: int, album_id: int, track_id: int):
+        self.id = id
+        self.order = order
+        self.album_id = album_id
+        self.track_id = track_id
+
+
+def copy_record(record):
+    copy = object.__new__(type(record))
+    for name in record.__slots__:
+        value = getattr(record, name)
+        setattr(copy, name, list(value) if isinstance(value, list) else value)
+    return copy
+
+
+def remove_sorted(ids: List[int], pk: int) -> None:
+    index = bisect_left(ids, pk)
+    if index < len(ids) and ids[index] == pk:
+        del ids[index]
+
+
+def version_backend():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def current_version() -> int:
+    """Версия каталога, после сброса кэша начинается со случайного числа: снимки воркеров устаревают."""
+    backend = version_backend()
+    version = backend.get(VERSION_KEY)
+    if version is None:
+        backend.add(VERSION_KEY, random.randrange(1, 2**62), timeout=None)
+        version = backend.get(VERSION_KEY)
+    return version
+
+
+def publish_changes(tags: Iterable[str]) -> None:
+    """Новая версия и ее теги в журнале, вызывается после коммита изменений."""
+    backend = version_backend()
+    current_version()
+    try:
+        version = backend.incr(VERSION_KEY)
+    except ValueError:
+        # Кэш сброшен между add и incr: снимки загрузятся заново.
+        return
+    backend.set(CHANGE_KEY.format(version), sorted(tags), timeout=CHANGE_LOG_TIMEOUT)
+
+
+class CatalogSnapshot:
+    """Текущая версия снимка процесса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data: Optional[CatalogData] = None
+
+    @contextmanager
+    def read(self):
+        yield self.sync()
+
+    def sync(self) -> "CatalogData":
+        """Версия снимка для чтения, отставшая версия обновляется одним потоком, остальные читают прежнюю."""
+        data = self.data
+        version = current_version()
+        if data is not None and data.version == version:
+            return data
+        if not self.lock.acquire(blocking=data is None):
+            return data
+        try:
+            data = self.data
+            if data is None or data.version != version:
+                data = self.data = self.updated(data, version)
+            return data
+        finally:
+            self.lock.release()
+
+    def updated(self, data: Optional["CatalogData"], version: int) -> "CatalogData":
+        tags = data.read_changes(version) if data is not None else None
+        if tags is None:
+            return self.load(version)
+        data = data.copy()
+        data.refresh(tags)
+        data.version = version
+        data.owned.clear()
+        return data
+
+    def load(self, version: int) -> "CatalogData":
+        data = CatalogData()
+        data.load()
+        data.version = version
+        return data
+
+
+class CatalogData:
+    """Записи и индексы одной версии снимка."""
+
+    def __init__(self):
+        self.version = None
+        self.artists: Dict[int, ArtistRecord] = {}
+        self.albums: Dict[int, AlbumRecord] = {}
+        self.tracks: Dict[int, TrackRecord] = {}
+        self.links: Dict[int, LinkRecord] = {}
+        self.ordered = {"artists": [], "albums": [], "tracks": []}
+        # Копия делит записи с прежней версией, менять можно только скопированные (owned).
+        self.shared = False
+        self.owned = set()
+
+    def copy(self) -> "CatalogData":
+        data = CatalogData()
+        data.version = self.version
+        data.artists, data.albums = dict(self.artists), dict(self.albums)
+        data.tracks, data.links = dict(self.tracks), dict(self.links)
+        data.ordered = {basename: list(ids) for basename, ids in self.ordered.items()}
+        data.shared = True
+        return data
+
+    def own(self, records: dict, pk: int):
+        """Запись для изменения: общая с прежней версией заменяется копией."""
+        record = records.get(pk)
+        if self.shared and record is not None and id(record) not in self.owned:
+            record = records[pk] = copy_record(record)
+            self.owned.add(id(record))
+        return record
+
+    def read_changes(self, version: int) -> Optional[set]:
+        if self.version is None or not 0 < version - self.version <= MAX_CHANGES:
+            return None
+        keys = [CHANGE_KEY.format(number) for number in range(self.version + 1, version + 1)]
+        changes = version_backend().get_many(keys)
+        if len(changes) != len(keys):
+            return None
+        return set().union(*changes.values())
+
+    def load(self) -> None:
+        for row in Artist.objects.using(PRIMARY).values_list("id", "name"):
+            self.put_artist(*row)
+        for row in Track.objects.using(PRIMARY).values_list("id", "name"):
+            self.put_track(*row)
+        for row in Album.objects.using(PRIMARY).values_list("id", "name", "artist_id", "year"):
+            self.put_album(*row)
+        for row in AlbumTrack.objects.using(PRIMARY).values_list("id", "order", "album_id", "track_id"):
+            self.put_link(*row)
+
+    # Изменения по тегам.
+
+    def refresh(self, tags: Iterable[str]) -> None:
+        ids = defaultdict(set)
+        for tag in tags:
+            basename, _, pk = tag.partition(":")
+            if pk != "*":
+                ids[basename].add(int(pk))
+        self.refresh_artists(ids["artists"])
+        self.refresh_albums(ids["albums"])
+        self.refresh_tracks(ids["tracks"])
+
+    def refresh_artists(self, pks: set) -> None:
+        if not pks:
+            return
+        rows = list(Artist.objects.using(PRIMARY).filter(pk__in=pks).values_list("id", "name"))
+        for row in rows:
+            self.put_artist(*row)
+        for pk in pks - {row[0] for row in rows}:
+            self.remove_artist(pk)
+
+    def refresh_albums(self, pks: set) -> None:
+        """Альбомы и все их связи."""
+        if not pks:
+            return
+        rows = list(Album.objects.using(PRIMARY).filter(pk__in=pks).values_list("id", "name", "artist_id", "year"))
+        self.refresh_artists({row[2] for row in rows} - self.artists.keys())
+        for row in rows:
+            self.put_album(*row)
+        for pk in pks - {row[0] for row in rows}:
+            self.remove_album(pk)
+        self.replace_links("album_id", pks, self.albums)
+
+    def refresh_tracks(self, pks: set) -> None:
+        """Трэки и все их связи."""
+        if not pks:
+            return
+        rows = list(Track.objects.using(PRIMARY).filter(pk__in=pks).values_list("id", "name"))
+        for row in rows:
+            self.put_track(*row)
+        for pk in pks - {row[0] for row in rows}:
+            self.remove_track(pk)
+        self.replace_links("track_id", pks, self.tracks)
+
+    def replace_links(self, field: str, pks: set, owners: dict) -> None:
+        for pk in pks:
+            owner = owners.get(pk)
+            for link_id in list(owner.link_ids if owner is not None else ()):
+                self.remove_link(link_id)
+        columns = ("id", "order", "album_id", "track_id")
+        rows = list(AlbumTrack.objects.using(PRIMARY).filter(**{f"{field}__in": pks}).values_list(*columns))
+        # Связи с объектами, которых нет в снимке: объекты загружаются вместе со всеми своими связями.
+        self.refresh_albums({row[2] for row in rows} - self.albums.keys())
+        self.refresh_tracks({row[3] for row in rows} - self.tracks.keys())
+        for row in rows:
+            self.put_link(*row)
+
+    # Записи и индексы.
+
+    def put_artist(self, pk: int, name: str) -> None:
+        if pk not in self.artists:
+            self.artists[pk] = ArtistRecord(pk, name)
+            insort(self.ordered["artists"], pk)
+        else:
+            self.own(self.artists, pk).name = name
+
+    def put_track(self, pk: int, name: str) -> None:
+        if pk not in self.tracks:
+            self.tracks[pk] = TrackRecord(pk, name)
+            insort(self.ordered["tracks"], pk)
+        else:
+            self.own(self.tracks, pk).name = name
+
+    def put_album(self, pk: int, name: str, artist_id: int, year: int) -> None:
+        record = self.own(self.albums, pk)
+        if record is None:
+            record = self.albums[pk] = AlbumRecord(pk, name, artist_id, year)
+            insort(self.ordered["albums"], pk)
+        elif record.artist_id != artist_id:
+            artist = self.own(self.artists, record.artist_id)
+            if artist is not None:
+                remove_sorted(artist.album_ids, pk)
+        else:
+            record.name, record.year = name, year
+            return
+        record.name, record.artist_id, record.year = name, artist_id, year
+        artist = self.own(self.artists, artist_id)
+        if artist is not None:
+            insort(artist.album_ids, pk)
+
+    def put_link(self, pk: int, order: int, album_id: int, track_id: int) -> None:
+        if pk in self.links:
+            self.remove_link(pk)
+        album, track = self.own(self.albums, album_id), self.own(self.tracks, track_id)
+        if album is None or track is None:
+            return
+        self.links[pk] = LinkRecord(pk, order, album_id, track_id)
+        insort(album.link_ids, pk)
+        insort(track.link_ids, pk)
+
+    def remove_artist(self, pk: int) -> None:
+        record = self.artists.pop(pk, None)
+        if record is None:
+            return
+        remove_sorted(self.ordered["artists"], pk)
+        for album_id in list(record.album_ids):
+            self.remove_album(album_id)
+
+    def remove_album(self, pk: int) -> None:
+        record = self.albums.pop(pk, None)
+        if record is None:
+            return
+        remove_sorted(self.ordered["albums"], pk)
+        artist = self.own(self.artists, record.artist_id)
+        if artist is not None:
+            remove_sorted(artist.album_ids, pk)
+        for link_id in list(record.link_ids):
+            self.remove_link(link_id)
+
+    def remove_track(self, pk: int) -> None:
+        record = self.tracks.pop(pk, None)
+        if record is None:
+            return
+        remove_sorted(self.ordered["tracks"], pk)
+        for link_id in list(record.link_ids):
+            self.remove_link(link_id)
+
+    def remove_link(self, pk: int) -> None:
+        link = self.links.pop(pk, None)
+        if link is None:
+            return
+        for owner in (self.own(self.albums, link.album_id), self.own(self.tracks, link.track_id)):
+            if owner is not None:
+                remove_sorted(owner.link_ids, pk)
+
+    # Представления как у AlbumReadSerializer, ArtistReadSerializer и TrackReadSerializer.
+
+    def album_data(self, record: AlbumRecord) -> dict:
+        links = [self.links[link_id] for link_id in record.link_ids]
+        return {
+            "id": record.id,
+            "name": record.name,
+            "artist": record.artist_id,
+            "year": record.year,
+            "tracks_count": len(links),
+            "album_tracks": [f"{link.order} {self.tracks[link.track_id].name}" for link in links],
+        }
+
+    def artist_data(self, record: ArtistRecord) -> dict:
+        albums = [self.album_data(self.albums[album_id]) for album_id in record.album_ids]
+        return {
+            "id": record.id,
+            "name": record.name,
+            "albums_count": len(albums),
+            "tracks_count": sum(album["tracks_count"] for album in albums),
+            "albums": albums,
+        }
+
+    def track_data(self, record: TrackRecord) -> dict:
+        links = [self.links[link_id] for link_id in record.link_ids]
+        return {
+            "id": record.id,
+            "name": record.name,
+            "track_albums": [{"order": link.order, "album": self.albums[link.album_id].name} for link in links],
+        }
+
+    def render(self, basename: str, pks: Iterable[int]) -> List[dict]:
+        records, to_data = self.resources()[basename]
+        return [to_data(records[pk]) for pk in pks]
+
+    def get(self, basename: str, pk) -> Optional[dict]:
+        records, to_data = self.resources()[basename]
+        try:
+            record = records.get(int(pk))
+        except (TypeError, ValueError):
+            return None
+        return None if record is None else to_data(record)
+
+    def resources(self) -> dict:
+        return {
+            "artists": (self.artists, self.artist_data),
+            "albums": (self.albums, self.album_data),
+            "tracks": (self.tracks, self.track_data),
+        }
+
+
+catalog_snapshot = CatalogSnapshot()
@@ -1,12 +1,35 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import AlbumViewSet, ArtistViewSet, TrackViewSet
+from .async_views import ASYNC_READ_VIEWS
+from .views import AlbumViewSet, ArtistViewSet, SearchViewSet, TrackViewSet
 
 router = DefaultRouter()
 router.register("artists", ArtistViewSet, basename="artists")
 router.register("albums", AlbumViewSet, basename="albums")
 router.register("tracks", TrackViewSet, basename="tracks")
+router.register("search", SearchViewSet, basename="search")
+
+
+def async_read_urls(router: DefaultRouter) -> list:
+    """list и detail маршруты через async view, синхронный ViewSet остается для записи."""
+    sync_views = {pattern.name: pattern.callback for pattern in router.urls}
+    urls = []
+    for basename, view_class in ASYNC_READ_VIEWS.items():
+        list_view = view_class.as_view(sync_view=sync_views[f"{basename}-list"])
+        detail_view = view_class.as_view(sync_view=sync_views[f"{basename}-detail"])
+        urls += [
+            path(f"{basename}/", list_view, name=f"{basename}-list"),
+            path(f"{basename}/<int:pk>/", detail_view, name=f"{basename}-detail"),
+        ]
+    return urls
+
+
+v1_urls = router.urls
+if settings.ASYNC_READS:
+    v1_urls = async_read_urls(router) + v1_urls
+
 urlpatterns = [
-    path("v1/", include(router.urls)),
+    path("v1/", include(v1_urls)),
 ]
@@ -1,53 +1,188 @@
-from django.shortcuts import get_object_or_404
+from typing import Optional
+
+from django.conf import settings
+from django.http import Http404
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 
 from catalog.models import Album, Artist, Track
 
+from .cache import CachedResponseMixin, object_tag
+from .fast_serializers import FastAlbumSerializer, FastArtistSerializer, FastTrackSerializer
+from .filters import AllowlistOrderingFilter, QueryParamsFilter
+from .search import search_catalog
+from .selection import FieldSelection, FieldSelectionMixin
 from .serializers import (
+    AlbumFilterSerializer,
     AlbumReadSerializer,
+    AlbumReorderSerializer,
     AlbumTrackDeleteSerializer,
     AlbumWriteSerializer,
     ArtistReadSerializer,
     ArtistWriteSerializer,
+    CatalogBulkSerializer,
+    SearchQuerySerializer,
+    SearchResultSerializer,
     TrackAlbumOrderWriteSerializer,
+    TrackFilterSerializer,
     TrackReadSerializer,
 )
-from .services import remove_track_from_album
+from .services import (
+    bulk_create_catalog,
+    delete_album,
+    delete_artist,
+    export_catalog,
+    remove_track_from_album,
+    reorder_album,
+)
+from .snapshot import catalog_snapshot
 
 WRITE_METHODS = ["PUT", "POST", "PATCH"]
 
 
-class ArtistViewSet(viewsets.ModelViewSet):
+class EagerLoadingMixin:
+    """Строит queryset по дереву сериализатора чтения без N+1 запросов."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        setup_eager_loading = getattr(self.get_serializer_class(), "setup_eager_loading", None)
+        if setup_eager_loading is None:
+            return queryset
+        selection = self.get_field_selection()
+        if selection is None:
+            return setup_eager_loading(queryset)
+        return setup_eager_loading(queryset, selection)
+
+    def get_serializer(self, *args, **kwargs):
+        selection = self.get_field_selection()
+        if selection is not None:
+            kwargs["selection"] = selection
+        return super().get_serializer(*args, **kwargs)
+
+    def get_field_selection(self) -> Optional[FieldSelection]:
+        """?fields= и ?expand= для GET, проверенные по сериализатору чтения."""
+        if not hasattr(self, "field_selection"):
+            selection = None
+            if self.request is not None and self.request.method == "GET":
+                serializer_class = self.get_serializer_class()
+                if issubclass(serializer_class, FieldSelectionMixin):
+                    selection = FieldSelection.from_query_params(self.request.query_params)
+                if selection is not None:
+                    serializer_class.validate_selection(selection)
+            self.field_selection = selection
+        return self.field_selection
+
+    def use_fast_serializer(self) -> bool:
+        """GET list отдается быстрым сериализатором из .values(), схема API строится по обычному.
+
+        С выбором полей (?fields=, ?expand=) list идет через обычный сериализатор с урезанным деревом.
+        """
+        if self.action != "list" or getattr(self, "swagger_fake_view", False):
+            return False
+        return FieldSelection.from_query_params(self.request.query_params) is None
+
+
+class SnapshotReadMixin:
+    """GET list и retrieve без параметров из снимка каталога в памяти (CATALOG_SNAPSHOT=True)."""
+
+    snapshot_query_params = {"page"}
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_snapshot(request):
+            return super().list(request, *args, **kwargs)
+        with catalog_snapshot.read() as snapshot:
+            page = self.paginate_queryset(snapshot.ordered[self.basename])
+            data = snapshot.render(self.basename, page)
+        return self.get_paginated_response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.use_snapshot(request):
+            return super().retrieve(request, *args, **kwargs)
+        with catalog_snapshot.read() as snapshot:
+            data = snapshot.get(self.basename, kwargs[self.lookup_field])
+        if data is None:
+            raise Http404
+        return Response(data)
+
+    def use_snapshot(self, request) -> bool:
+        return settings.CATALOG_SNAPSHOT and set(request.query_params) <= self.snapshot_query_params
+
+
+class ArtistViewSet(CachedResponseMixin, SnapshotReadMixin, EagerLoadingMixin, viewsets.ModelViewSet):
+    read_from_replica = True
     queryset = Artist.objects.all()
+    filter_backends = (AllowlistOrderingFilter,)
+    orderings = (("id",), ("name",))
 
     def get_serializer_class(self):
         if self.request.method in WRITE_METHODS:
             return ArtistWriteSerializer
+        if self.use_fast_serializer():
+            return FastArtistSerializer
         return ArtistReadSerializer
 
+    def get_object_cache_tags(self, item):
+        yield from super().get_object_cache_tags(item)
+        for album in item.get("albums", ()):
+            yield object_tag("albums", album["id"])
 
-class AlbumViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        serializer = CatalogBulkSerializer(data=request.data)
+        if serializer.is_valid():
+            return bulk_create_catalog(serializer.validated_data)
+        else:
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def destroy(self, request, pk=None):
+        return delete_artist(pk)
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        return export_catalog()
+
+
+class AlbumViewSet(CachedResponseMixin, SnapshotReadMixin, EagerLoadingMixin, viewsets.ModelViewSet):
+    read_from_replica = True
     queryset = Album.objects.all()
+    filter_backends = (QueryParamsFilter, AllowlistOrderingFilter)
+    filter_serializer_class = AlbumFilterSerializer
+    orderings = (("id",), ("name",), ("year", "id"))
 
     def get_serializer_class(self):
         if self.request.method in WRITE_METHODS:
             return AlbumWriteSerializer
+        if self.use_fast_serializer():
+            return FastAlbumSerializer
         return AlbumReadSerializer
 
+    def destroy(self, request, pk=None):
+        return delete_album(pk)
+
     @action(detail=True, methods=["delete"])
     def remove_track(self, request, pk):
-        album = get_object_or_404(Album, pk=pk)
         serializer = AlbumTrackDeleteSerializer(data=request.data)
         if serializer.is_valid():
             data = serializer.validated_data
-            return remove_track_from_album(album, data)
+            return remove_track_from_album(pk, data)
+        else:
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=True, methods=["post"])
+    def reorder(self, request, pk):
+        serializer = AlbumReorderSerializer(data=request.data)
+        if serializer.is_valid():
+            return reorder_album(pk, serializer.validated_data)
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 class TrackViewSet(
+    CachedResponseMixin,
+    SnapshotReadMixin,
+    EagerLoadingMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -56,9 +191,30 @@ class TrackViewSet(
 ):
     """Трэки возможно только добавлять и удалять, без редактирования:)."""
 
+    read_from_replica = True
     queryset = Track.objects.all()
+    filter_backends = (QueryParamsFilter, AllowlistOrderingFilter)
+    filter_serializer_class = TrackFilterSerializer
+    orderings = (("id",), ("name",))
 
     def get_serializer_class(self):
         if self.request.method in WRITE_METHODS:
             return TrackAlbumOrderWriteSerializer
+        if self.use_fast_serializer():
+            return FastTrackSerializer
         return TrackReadSerializer
+
+
+class SearchViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Поиск по названиям исполнителей, альбомов и трэков."""
+
+    read_from_replica = True
+    serializer_class = SearchResultSerializer
+    pagination_class = PageNumberPagination
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return Artist.objects.none()
+        serializer = SearchQuerySerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return search_catalog(serializer.validated_data["q"])
@@ -0,0 +1,112 @@
+"""
+Счетчики Album.tracks_count, Artist.albums_count и Artist.tracks_count.
+Создание и удаление AlbumTrack и Album (в том числе каскадное) меняют их F() обновлением,
+массовые изменения (catalog_changed, m2m) пересчитывают затронутые строки одним UPDATE.
+Artist.tracks_count — число связей альбом-трэк во всех альбомах исполнителя.
+"""
+from typing import Iterable, Optional
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Album, AlbumTrack, Artist, Track
+from .signals import catalog_changed
+
+
+def count_of(queryset, field: str):
+    """Количество строк queryset с field = OuterRef("pk") как выражение для UPDATE."""
+    counts = queryset.filter(**{field: OuterRef("pk")}).order_by().values(field).annotate(count=Count("*"))
+    return Coalesce(Subquery(counts.values("count")), 0)
+
+
+ALBUM_TRACKS = count_of(AlbumTrack.objects.all(), "album")
+ARTIST_ALBUMS = count_of(Album.objects.all(), "artist")
+ARTIST_TRACKS = count_of(AlbumTrack.objects.all(), "album__artist")
+
+
+def recount(album_ids: Optional[Iterable[int]] = None, artist_ids: Optional[Iterable[int]] = None) -> int:
+    """Пересчитывает счетчики (все при None), возвращает число исправленных строк."""
+    albums = Album.objects.all() if album_ids is None else Album.objects.filter(pk__in=list(album_ids))
+    artists = Artist.objects.all() if artist_ids is None else Artist.objects.filter(pk__in=list(artist_ids))
+    fixed = albums.exclude(tracks_count=ALBUM_TRACKS).update(tracks_count=ALBUM_TRACKS)
+    artists = artists.exclude(albums_count=ARTIST_ALBUMS, tracks_count=ARTIST_TRACKS)
+    fixed += artists.update(albums_count=ARTIST_ALBUMS, tracks_count=ARTIST_TRACKS)
+    return fixed
+
+
+def add(model, pk, **deltas) -> None:
+    model.objects.filter(pk=pk).update(**{field: F(field) + delta for field, delta in deltas.items()})
+
+
+def deleted_with(origin, model, pk) -> bool:
+    """Объект удаляется той же операцией, что и связь: его счетчик обновлять незачем."""
+    return isinstance(origin, model) and origin.pk == pk
+
+
+@receiver(post_save, sender=AlbumTrack)
+def album_track_created(sender, instance, created, **kwargs):
+    if not created:
+        return
+    add(Album, instance.album_id, tracks_count=1)
+    Artist.objects.filter(albums=instance.album_id).update(tracks_count=F("tracks_count") + 1)
+
+
+@receiver(post_delete, sender=AlbumTrack)
+def album_track_deleted(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Artist):
+        return
+    if deleted_with(origin, Album, instance.album_id):
+        add(Artist, origin.artist_id, tracks_count=-1)
+        return
+    add(Album, instance.album_id, tracks_count=-1)
+    Artist.objects.filter(albums=instance.album_id).update(tracks_count=F("tracks_count") - 1)
+
+
+@receiver(post_save, sender=Album)
+def album_saved(sender, instance, created, **kwargs):
+    if created:
+        add(Artist, instance.artist_id, albums_count=1)
+        return
+    loaded_artist_id = getattr(instance, "loaded_artist_id", None)
+    if loaded_artist_id is None or loaded_artist_id == instance.artist_id:
+        return
+    tracks_count = Album.objects.values_list("tracks_count", flat=True).get(pk=instance.pk)
+    add(Artist, loaded_artist_id, albums_count=-1, tracks_count=-tracks_count)
+    add(Artist, instance.artist_id, albums_count=1, tracks_count=tracks_count)
+    instance.loaded_artist_id = instance.artist_id
+
+
+@receiver(post_delete, sender=Album)
+def album_deleted(sender, instance, origin=None, **kwargs):
+    if deleted_with(origin, Artist, instance.artist_id):
+        return
+    add(Artist, instance.artist_id, albums_count=-1)
+
+
+@receiver(m2m_changed, sender=Track.albums.through)
+def track_albums_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """add/remove/clear через Track.albums идут в обход post_save/post_delete AlbumTrack."""
+    if reverse:
+        album_ids = {instance.pk}
+    elif action == "pre_clear":
+        instance.cleared_album_ids = set(AlbumTrack.objects.filter(track=instance).values_list("album_id", flat=True))
+        return
+    elif action == "post_clear":
+        album_ids = instance.__dict__.pop("cleared_album_ids", set())
+    else:
+        album_ids = set(pk_set or ())
+    if action in ("post_add", "post_remove", "post_clear"):
+        artist_ids = Album.objects.filter(pk__in=album_ids).values_list("artist_id", flat=True)
+        recount(album_ids, set(artist_ids))
+
+
+@receiver(catalog_changed)
+def catalog_bulk_changed(sender, artists=(), albums=(), full=False, **kwargs):
+    if full:
+        recount()
+        return
+    album_ids = set(albums)
+    artist_ids = set(artists) | set(Album.objects.filter(pk__in=album_ids).values_list("artist_id", flat=True))
+    recount(album_ids, artist_ids)
@@ -0,0 +1,36 @@
+"""
+Разбор IntegrityError: какое ограничение модели нарушено.
+Позволяет писать без проверочных SELECT и переводить ошибку базы в ошибку валидации.
+"""
+import re
+from typing import Optional
+
+from django.db import IntegrityError
+from django.db.models import Model, UniqueConstraint
+
+FOREIGN_KEY = "foreign_key"
+PG_FOREIGN_KEY_VIOLATION = "23503"
+SQLITE_UNIQUE = re.compile(r"UNIQUE constraint failed: (?P<columns>.+)")
+
+
+def violated_constraint(error: IntegrityError, model: Model) -> Optional[str]:
+    """Имя нарушенного UniqueConstraint модели или FOREIGN_KEY, None если не распознано."""
+    cause = error.__cause__
+    diag = getattr(cause, "diag", None)
+    if diag is not None:
+        if getattr(cause, "pgcode", None) == PG_FOREIGN_KEY_VIOLATION:
+            return FOREIGN_KEY
+        return diag.constraint_name
+    message = str(error)
+    if "FOREIGN KEY constraint failed" in message:
+        return FOREIGN_KEY
+    match = SQLITE_UNIQUE.match(message)
+    if match is None:
+        return None
+    columns = {column.split(".")[-1] for column in match["columns"].split(", ")}
+    for constraint in model._meta.constraints:
+        if not isinstance(constraint, UniqueConstraint):
+            continue
+        if {model._meta.get_field(name).column for name in constraint.fields} == columns:
+            return constraint.name
+    return None
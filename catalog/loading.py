@@ -0,0 +1,189 @@
+"""
+Потоковая загрузка каталога из json файлов вида [{...}, {...}].
+Файл читается кусками, записи пишутся пачками: COPY на PostgreSQL, bulk_create на остальных СУБД.
+Внешние ключи задаются id (artist_id) или натуральным ключом — названием (artist).
+Уже загруженные строки пропускаются. PostgreSQL не принимает отложенные уникальные ограничения
+в ON CONFLICT, у таких моделей (AlbumTrack) целью указывается неотложенное ограничение.
+"""
+import csv
+import io
+import json
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Iterator, List, Optional
+
+from django.db import connection, transaction
+from django.db.models import Model, UniqueConstraint
+
+DEFAULT_SOURCES = [
+    ["data/artists.json", "catalog", "Artist"],
+    ["data/albums.json", "catalog", "Album"],
+    ["data/tracks.json", "catalog", "Track"],
+    ["data/albums_tracks.json", "catalog", "AlbumTrack"],
+]
+READ_CHUNK_SIZE = 64 * 1024
+SEPARATORS = re.compile(r"[\s,]*")
+
+
+def iter_json_array(file: IO[str], chunk_size: int = READ_CHUNK_SIZE) -> Iterator[dict]:
+    """Отдает объекты json массива по одному, не читая файл целиком."""
+    decoder = json.JSONDecoder()
+    buffer = file.read(chunk_size).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("Ожидается json массив")
+    position = 1
+    while True:
+        position = SEPARATORS.match(buffer, position).end()
+        if buffer.startswith("]", position):
+            return
+        try:
+            obj, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                raise
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield obj
+
+
+@dataclass
+class LoadResult:
+    rows: int
+    skipped: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class Checkpoint:
+    """Число загруженных записей по каждому файлу для продолжения после сбоя."""
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self.done = {}
+        if path is not None and path.exists():
+            self.done = json.loads(path.read_text(encoding="utf-8"))
+
+    def get(self, source: str) -> int:
+        return self.done.get(source, 0)
+
+    def set(self, source: str, rows: int) -> None:
+        self.done[source] = rows
+        if self.path is not None:
+            self.path.write_text(json.dumps(self.done), encoding="utf-8")
+
+    def clear(self) -> None:
+        if self.path is not None and self.path.exists():
+            self.path.unlink()
+
+
+def conflict_constraint(model) -> Optional[UniqueConstraint]:
+    """Неотложенное уникальное ограничение модели, если у нее есть отложенные, иначе None."""
+    constraints = [
+        constraint
+        for constraint in model._meta.constraints
+        if isinstance(constraint, UniqueConstraint) and constraint.fields and constraint.condition is None
+    ]
+    if not any(constraint.deferrable for constraint in constraints):
+        return None
+    return next(constraint for constraint in constraints if not constraint.deferrable)
+
+
+class CatalogLoader:
+    """Загрузка одного файла пачками фиксированного размера."""
+
+    def __init__(self, model: Model, batch_size: int, use_copy: bool):
+        self.model = model
+        self.batch_size = batch_size
+        self.use_copy = use_copy and connection.vendor == "postgresql"
+        self.conflict = conflict_constraint(model)
+
+    def load(self, path: str, checkpoint: Checkpoint) -> LoadResult:
+        start = time.monotonic()
+        skip = checkpoint.get(path)
+        rows = 0
+        batch = []
+        with open(path, encoding="utf-8") as file:
+            for index, record in enumerate(iter_json_array(file)):
+                if index < skip:
+                    continue
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    rows += self.write(batch)
+                    checkpoint.set(path, skip + rows)
+                    batch = []
+        if batch:
+            rows += self.write(batch)
+            checkpoint.set(path, skip + rows)
+        return LoadResult(rows=rows, skipped=skip, seconds=time.monotonic() - start)
+
+    def write(self, records: List[dict]) -> int:
+        records = self.resolve_natural_keys(records)
+        with transaction.atomic():
+            if self.use_copy:
+                self.copy(records)
+            elif self.conflict is None:
+                self.model.objects.bulk_create([self.model(**record) for record in records], ignore_conflicts=True)
+            else:
+                self.model.objects.bulk_create(self.new_objects([self.model(**record) for record in records]))
+        return len(records)
+
+    def new_objects(self, objects: List[Model]) -> List[Model]:
+        """Объекты, которых еще нет в таблице по ключу self.conflict (замена ignore_conflicts)."""
+        attnames = [self.model._meta.get_field(name).attname for name in self.conflict.fields]
+
+        def key(obj):
+            return tuple(getattr(obj, attname) for attname in attnames)
+
+        lookups = {f"{attname}__in": {getattr(obj, attname) for obj in objects} for attname in attnames}
+        seen = set(self.model.objects.filter(**lookups).values_list(*attnames))
+        new = []
+        for obj in objects:
+            if key(obj) not in seen:
+                seen.add(key(obj))
+                new.append(obj)
+        return new
+
+    def resolve_natural_keys(self, records: List[dict]) -> List[dict]:
+        """Заменяет названия связанных объектов на их id одним запросом на поле."""
+        for field in self.model._meta.concrete_fields:
+            if not field.is_relation:
+                continue
+            names = {record[field.name] for record in records if isinstance(record.get(field.name), str)}
+            if not names:
+                continue
+            related = field.related_model
+            ids = dict(related.objects.filter(name__in=names).values_list("name", "id"))
+            missing = names - ids.keys()
+            if missing:
+                raise LookupError(f"{related.__name__}: не найдены {sorted(missing)[:10]}")
+            for record in records:
+                if isinstance(record.get(field.name), str):
+                    record[field.attname] = ids[record.pop(field.name)]
+        return records
+
+    def copy(self, records: List[dict]) -> None:
+        """COPY во временную таблицу и перенос с пропуском уже загруженных строк."""
+        fields = [self.model._meta.get_field(name) for name in records[0]]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for record in records:
+            writer.writerow(record[field.attname] for field in fields)
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMP TABLE import_batch ON COMMIT DROP AS SELECT {columns} FROM {table} WITH NO DATA"
+            )
+            cursor.copy_expert(f"COPY import_batch ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+            target = f"ON CONSTRAINT {connection.ops.quote_name(self.conflict.name)} " if self.conflict else ""
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) SELECT {columns} FROM import_batch ON CONFLICT {target}DO NOTHING"
+            )
@@ -0,0 +1,57 @@
+from pathlib import Path
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.loading import DEFAULT_SOURCES, CatalogLoader, Checkpoint
+from catalog.signals import catalog_changed
+
+
+class Command(BaseCommand):
+    help = "Потоковая загрузка каталога из json файлов пачками с продолжением после сбоя"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "sources",
+            nargs="*",
+            metavar="PATH:app.Model",
+            help="Файлы и модели, по умолчанию тестовые данные из data/",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000, help="Записей в одной пачке")
+        parser.add_argument("--no-copy", action="store_true", help="bulk_create вместо COPY на PostgreSQL")
+        parser.add_argument(
+            "--checkpoint",
+            default=".import_catalog.json",
+            help="Файл прогресса для продолжения загрузки",
+        )
+        parser.add_argument("--restart", action="store_true", help="Начать заново, игнорируя файл прогресса")
+
+    def handle(self, *args, **options):
+        sources = [self.parse_source(source) for source in options["sources"]] or DEFAULT_SOURCES
+        checkpoint_path = Path(options["checkpoint"])
+        if options["restart"] and checkpoint_path.exists():
+            checkpoint_path.unlink()
+        checkpoint = Checkpoint(checkpoint_path)
+        for path, app_label, model_name in sources:
+            model = apps.get_model(app_label, model_name)
+            loader = CatalogLoader(model, options["batch_size"], use_copy=not options["no_copy"])
+            try:
+                result = loader.load(path, checkpoint)
+            except (OSError, ValueError, LookupError) as error:
+                raise CommandError(f"{path}: {error}. Повторный запуск продолжит с места остановки.")
+            if result.skipped:
+                self.stdout.write(f"{path}: пропущено {result.skipped} уже загруженных записей")
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{path}: {result.rows} записей за {result.seconds:.2f} с ({result.rows_per_second:.0f} строк/с)"
+                )
+            )
+        checkpoint.clear()
+        catalog_changed.send(sender=self.__class__, full=True)
+
+    def parse_source(self, source: str) -> list:
+        path, _, label = source.rpartition(":")
+        app_label, _, model_name = label.partition(".")
+        if not path or not model_name:
+            raise CommandError(f"Ожидается PATH:app.Model, получено {source}")
+        return [path, app_label, model_name]
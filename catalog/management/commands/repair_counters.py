@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from catalog.counters import recount
+from catalog.signals import catalog_changed
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает счетчики альбомов и исполнителей по связям альбом-трэк"
+
+    def handle(self, *args, **options):
+        fixed = recount()
+        if fixed:
+            catalog_changed.send(sender=self.__class__, full=True)
+        self.stdout.write(self.style.SUCCESS(f"Исправлено строк: {fixed}"))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.seeding import TIERS, CatalogSeeder
+from catalog.signals import catalog_changed
+
+
+class Command(BaseCommand):
+    help = "Заполняет каталог детерминированным набором данных для нагрузочных тестов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tier", choices=TIERS, default="10k", help="Число связей альбом-трэк")
+        parser.add_argument("--links", type=int, help="Произвольное число связей вместо --tier")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Записей в одной пачке")
+        parser.add_argument("--no-copy", action="store_true", help="bulk_create вместо COPY на PostgreSQL")
+
+    def handle(self, *args, **options):
+        links = options["links"] or TIERS[options["tier"]]
+        if links < 1:
+            raise CommandError("Число связей должно быть положительным")
+        seeder = CatalogSeeder(links, options["batch_size"], use_copy=not options["no_copy"])
+        for model_name, result in seeder.seed().items():
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{model_name}: {result.rows} записей за {result.seconds:.2f} с "
+                    f"({result.rows_per_second:.0f} строк/с)"
+                )
+            )
+        catalog_changed.send(sender=self.__class__, full=True)
@@ -0,0 +1,47 @@
+"""
+GIN индексы для поиска по названиям (только PostgreSQL):
+pg_trgm для нечеткого поиска и tsvector для полнотекстового.
+На остальных СУБД поиск работает без индексов.
+"""
+from django.db import migrations
+
+SEARCH_MODELS = ["Artist", "Album", "Track"]
+
+
+def search_indexes(model):
+    from django.contrib.postgres.indexes import GinIndex, OpClass
+    from django.contrib.postgres.search import SearchVector
+
+    table = model._meta.db_table
+    return [
+        GinIndex(OpClass("name", name="gin_trgm_ops"), name=f"{table}_name_trgm"),
+        GinIndex(SearchVector("name", config="simple"), name=f"{table}_name_fts"),
+    ]
+
+
+def add_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for model_name in SEARCH_MODELS:
+        model = apps.get_model("catalog", model_name)
+        for index in search_indexes(model):
+            schema_editor.add_index(model, index)
+
+
+def remove_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for model_name in SEARCH_MODELS:
+        model = apps.get_model("catalog", model_name)
+        for index in search_indexes(model):
+            schema_editor.remove_index(model, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0002_data_migrations"),
+    ]
+
+    operations = [migrations.RunPython(add_search_indexes, remove_search_indexes)]
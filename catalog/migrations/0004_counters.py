@@ -0,0 +1,46 @@
+# Generated by Django 4.2.5 on 2026-10-18 15:57
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_of(queryset, field):
+    counts = queryset.filter(**{field: OuterRef("pk")}).order_by().values(field).annotate(count=Count("*"))
+    return Coalesce(Subquery(counts.values("count")), 0)
+
+
+def fill_counters(apps, schema_editor):
+    Artist = apps.get_model("catalog", "Artist")
+    Album = apps.get_model("catalog", "Album")
+    AlbumTrack = apps.get_model("catalog", "AlbumTrack")
+    Album.objects.update(tracks_count=count_of(AlbumTrack.objects.all(), "album"))
+    Artist.objects.update(
+        albums_count=count_of(Album.objects.all(), "artist"),
+        tracks_count=count_of(AlbumTrack.objects.all(), "album__artist"),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("catalog", "0003_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="album",
+            name="tracks_count",
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Количество трэков"),
+        ),
+        migrations.AddField(
+            model_name="artist",
+            name="albums_count",
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Количество альбомов"),
+        ),
+        migrations.AddField(
+            model_name="artist",
+            name="tracks_count",
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Количество трэков в альбомах"),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
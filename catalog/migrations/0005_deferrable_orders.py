@@ -0,0 +1,63 @@
+"""
+Уникальность номеров проверяется в конце оператора (DEFERRABLE INITIALLY IMMEDIATE),
+чтобы перестановка трэков альбома выполнялась одним UPDATE.
+Django не создает отложенные ограничения на СУБД без их поддержки (SQLite),
+там та же уникальность обеспечивается обычными уникальными индексами.
+"""
+from django.db import migrations, models
+
+ORDER_CONSTRAINTS = {
+    "unique_track_order": ("track_id", "order"),
+    "unique_order_album": ("order", "album_id"),
+}
+
+
+def add_unique_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.features.supports_deferrable_unique_constraints:
+        return
+    table = schema_editor.quote_name(apps.get_model("catalog", "AlbumTrack")._meta.db_table)
+    for name, columns in ORDER_CONSTRAINTS.items():
+        columns = ", ".join(schema_editor.quote_name(column) for column in columns)
+        schema_editor.execute(f"CREATE UNIQUE INDEX {schema_editor.quote_name(name)} ON {table} ({columns})")
+
+
+def remove_unique_indexes(apps, schema_editor):
+    if schema_editor.connection.features.supports_deferrable_unique_constraints:
+        return
+    for name in ORDER_CONSTRAINTS:
+        schema_editor.execute(f"DROP INDEX {schema_editor.quote_name(name)}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("catalog", "0004_counters"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="albumtrack",
+            name="unique_track_order",
+        ),
+        migrations.RemoveConstraint(
+            model_name="albumtrack",
+            name="unique_order_album",
+        ),
+        migrations.AddConstraint(
+            model_name="albumtrack",
+            constraint=models.UniqueConstraint(
+                deferrable=models.Deferrable.IMMEDIATE,
+                fields=("track", "order"),
+                name="unique_track_order",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="albumtrack",
+            constraint=models.UniqueConstraint(
+                deferrable=models.Deferrable.IMMEDIATE,
+                fields=("order", "album"),
+                name="unique_order_album",
+            ),
+        ),
+        migrations.RunPython(add_unique_indexes, remove_unique_indexes),
+    ]
@@ -0,0 +1,51 @@
+"""
+Индексы фильтров и сортировки списков (api.filters):
+альбомы исполнителя по годам, сортировка по году, трэки альбома по номеру.
+Поиск альбомов по началу названия (LIKE 'abc%') на PostgreSQL использует
+индекс с varchar_pattern_ops: уникальный индекс name с правилами сортировки базы для LIKE не подходит.
+"""
+from django.db import migrations, models
+
+
+def name_prefix_index(model):
+    from django.contrib.postgres.indexes import OpClass
+
+    table = model._meta.db_table
+    return models.Index(OpClass("name", name="varchar_pattern_ops"), name=f"{table}_name_prefix")
+
+
+def add_name_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    model = apps.get_model("catalog", "Album")
+    schema_editor.add_index(model, name_prefix_index(model))
+
+
+def remove_name_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    model = apps.get_model("catalog", "Album")
+    schema_editor.remove_index(model, name_prefix_index(model))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0005_deferrable_orders"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="album",
+            index=models.Index(fields=["artist", "year"], name="catalog_album_artist_year"),
+        ),
+        migrations.AddIndex(
+            model_name="album",
+            index=models.Index(fields=["year", "id"], name="catalog_album_year_id"),
+        ),
+        migrations.AddIndex(
+            model_name="albumtrack",
+            index=models.Index(fields=["album", "order"], name="catalog_albumtrack_album_order"),
+        ),
+        migrations.RunPython(add_name_prefix_index, remove_name_prefix_index),
+    ]
@@ -1,12 +1,43 @@
-from django.db import models
+from django.db import connections, models
 
 
-class Artist(models.Model):
+class CounterFieldsModel(models.Model):
+    """Счетчики меняются только F() обновлениями, save() загруженного объекта их не перезаписывает."""
+
+    counter_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+
+class Artist(CounterFieldsModel):
+    counter_fields = ("albums_count", "tracks_count")
+
     name = models.CharField(
         max_length=100,
         verbose_name="Название исполнителя",
         unique=True,
     )
+    albums_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество альбомов",
+    )
+    tracks_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество трэков в альбомах",
+    )
 
     class Meta:
         ordering = ["id"]
@@ -17,7 +48,9 @@ class Artist(models.Model):
         return str(self.name)
 
 
-class Album(models.Model):
+class Album(CounterFieldsModel):
+    counter_fields = ("tracks_count",)
+
     name = models.CharField(
         max_length=100,
         verbose_name="Название альбома",
@@ -32,15 +65,49 @@ class Album(models.Model):
     year = models.PositiveSmallIntegerField(
         verbose_name="Дата выпуска альбома",
     )
+    tracks_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество трэков",
+    )
 
     class Meta:
         ordering = ["id"]
+        indexes = [
+            # Фильтры и сортировка списка альбомов (api.filters).
+            models.Index(fields=["artist", "year"], name="catalog_album_artist_year"),
+            models.Index(fields=["year", "id"], name="catalog_album_year_id"),
+        ]
         verbose_name = "Альбом"
         verbose_name_plural = "Альбомы"
 
     def __str__(self) -> str:
         return f"{self.name} {self.year}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Для переноса счетчиков при смене исполнителя.
+        instance.loaded_artist_id = instance.__dict__.get("artist_id")
+        return instance
+
+
+class TrackManager(models.Manager):
+    def upsert_id(self, name: str) -> int:
+        """id трэка по названию, новый трэк создается без post_save.
+
+        Существующая строка не обновляется и не блокируется: DO NOTHING и повторное чтение id.
+        """
+        connection = connections[self.db]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {table} (name) VALUES (%s) ON CONFLICT (name) DO NOTHING RETURNING id", [name])
+            row = cursor.fetchone()
+            if row is None:
+                cursor.execute(f"SELECT id FROM {table} WHERE name = %s", [name])
+                row = cursor.fetchone()
+            return row[0]
+
 
 class Track(models.Model):
     name = models.CharField(
@@ -56,6 +123,8 @@ class Track(models.Model):
         through_fields=("track", "album"),
     )
 
+    objects = TrackManager()
+
     class Meta:
         ordering = ["id"]
         verbose_name = "Песня"
@@ -74,10 +143,15 @@ class AlbumTrack(models.Model):
 
     class Meta:
         ordering = ["id"]
+        indexes = [
+            models.Index(fields=["album", "order"], name="catalog_albumtrack_album_order"),
+        ]
         constraints = [
+            # Проверка в конце оператора: перестановка номеров одним UPDATE (PostgreSQL).
             models.UniqueConstraint(
                 fields=["track", "order"],
                 name="unique_track_order",
+                deferrable=models.Deferrable.IMMEDIATE,
             ),
             models.UniqueConstraint(
                 fields=["track", "album"],
@@ -86,6 +160,7 @@ class AlbumTrack(models.Model):
             models.UniqueConstraint(
                 fields=["order", "album"],
                 name="unique_order_album",
+                deferrable=models.Deferrable.IMMEDIATE,
             ),
         ]
 
@@ -0,0 +1,97 @@
+"""
+Детерминированные наборы данных для нагрузочных тестов.
+Размер задается числом связей альбом-трэк: 10 трэков в альбоме, 10 альбомов у исполнителя,
+каждый трэк входит в два альбома под разными номерами.
+"""
+import time
+from typing import Iterator, List
+
+from .loading import CatalogLoader, LoadResult
+from .models import Album, AlbumTrack, Artist, Track
+
+TIERS = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+TRACKS_PER_ALBUM = 10
+ALBUMS_PER_ARTIST = 10
+
+
+def batched(records: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class CatalogSeeder:
+    """Генерирует каталог на links связей альбом-трэк и пишет его пачками через CatalogLoader."""
+
+    def __init__(self, links: int, batch_size: int, use_copy: bool):
+        self.albums = max(links // TRACKS_PER_ALBUM, 1)
+        self.artists = -(-self.albums // ALBUMS_PER_ARTIST)
+        self.half = self.albums // 2
+        self.tracks = (self.albums - self.half) * TRACKS_PER_ALBUM
+        self.batch_size = batch_size
+        self.use_copy = use_copy
+
+    def seed(self) -> dict:
+        return {
+            model.__name__: self.load(model, records)
+            for model, records in (
+                (Artist, self.artist_records()),
+                (Album, self.album_records()),
+                (Track, self.track_records()),
+                (AlbumTrack, self.link_records()),
+            )
+        }
+
+    def load(self, model, records: Iterator[dict]) -> LoadResult:
+        start = time.monotonic()
+        loader = CatalogLoader(model, self.batch_size, self.use_copy)
+        rows = sum(loader.write(batch) for batch in batched(records, self.batch_size))
+        return LoadResult(rows=rows, skipped=0, seconds=time.monotonic() - start)
+
+    def artist_records(self) -> Iterator[dict]:
+        for index in range(self.artists):
+            yield {"name": artist_name(index)}
+
+    def album_records(self) -> Iterator[dict]:
+        for index in range(self.albums):
+            yield {
+                "name": album_name(index),
+                "artist": artist_name(index // ALBUMS_PER_ARTIST),
+                "year": 1960 + index % 64,
+            }
+
+    def track_records(self) -> Iterator[dict]:
+        for index in range(self.tracks):
+            yield {"name": track_name(index)}
+
+    def link_records(self) -> Iterator[dict]:
+        for index in range(self.albums):
+            for position in range(TRACKS_PER_ALBUM):
+                yield {
+                    "album": album_name(index),
+                    "track": track_name(self.track_index(index, position)),
+                    "order": position + 1,
+                }
+
+    def track_index(self, album: int, position: int) -> int:
+        """Во второй половине альбомов трэки сдвинуты на одну позицию: номер трэка в двух альбомах разный."""
+        if album < self.half:
+            return album * TRACKS_PER_ALBUM + position
+        return (album - self.half) * TRACKS_PER_ALBUM + (position + 1) % TRACKS_PER_ALBUM
+
+
+def artist_name(index: int) -> str:
+    return f"Seed artist {index:07d}"
+
+
+def album_name(index: int) -> str:
+    return f"Seed album {index:07d}"
+
+
+def track_name(index: int) -> str:
+    return f"Seed track {index:08d}"
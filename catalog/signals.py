@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Массовые изменения каталога в обход post_save/post_delete (bulk_create, raw delete).
+# Аргументы: artists, albums, tracks — id затронутых объектов,
+# full=True — изменен весь каталог (загрузка из файлов).
+catalog_changed = Signal()
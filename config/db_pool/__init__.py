@@ -0,0 +1,19 @@
+from .pool import ConnectionPool, PoolTimeout
+
+
+def pool_stats() -> dict:
+    """Статистика пулов процесса по alias базы данных."""
+    from .base import POOLS
+
+    return {alias: pool.stats() for (alias, _), pool in POOLS.items()}
+
+
+def close_pools() -> None:
+    """Закрывает соединения всех пулов процесса."""
+    from .base import POOLS
+
+    for pool in POOLS.values():
+        pool.close_all()
+
+
+__all__ = ["ConnectionPool", "PoolTimeout", "close_pools", "pool_stats"]
@@ -0,0 +1,63 @@
+"""
+PostgreSQL backend Django, который берет соединения из пула процесса.
+Подключается через DB_ENGINE=config.db_pool, параметры пула в DATABASES[alias]["POOL"].
+"""
+import threading
+
+from django.db.backends.postgresql import base
+
+from .pool import ConnectionPool
+
+POOLS = {}
+POOLS_LOCK = threading.Lock()
+
+
+def close_connection(connection) -> None:
+    connection.close()
+
+
+def check_connection(connection) -> bool:
+    if connection.closed:
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_pool(self, conn_params: dict) -> ConnectionPool:
+        key = (self.alias, self.settings_dict["NAME"])
+        with POOLS_LOCK:
+            if key not in POOLS:
+                options = self.settings_dict.get("POOL", {})
+                POOLS[key] = ConnectionPool(
+                    connect=lambda: super(DatabaseWrapper, self).get_new_connection(conn_params),
+                    close=close_connection,
+                    check=check_connection,
+                    max_size=options.get("MAX_SIZE", 10),
+                    timeout=options.get("TIMEOUT", 30.0),
+                    max_lifetime=options.get("MAX_LIFETIME", 3600.0),
+                    check_idle=options.get("CHECK_IDLE", 30.0),
+                )
+            return POOLS[key]
+
+    def get_new_connection(self, conn_params):
+        return self.get_pool(conn_params).acquire()
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            self.get_pool(self.get_connection_params()).release(self.connection, discard=not self.reset_connection())
+
+    def reset_connection(self) -> bool:
+        """Откатывает незавершенную транзакцию перед возвратом в пул, False если соединение не годится."""
+        if self.connection.closed:
+            return False
+        if self.connection.info.transaction_status == self.Database.extensions.TRANSACTION_STATUS_IDLE:
+            return True
+        try:
+            self.connection.rollback()
+        except self.Database.Error:
+            return False
+        return True
@@ -0,0 +1,165 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+
+class PoolTimeout(Exception):
+    """Нет свободного соединения за отведенное время."""
+
+
+@dataclass
+class PooledConnection:
+    connection: Any
+    created_at: float = field(default_factory=time.monotonic)
+    released_at: float = field(default_factory=time.monotonic)
+
+
+class ConnectionPool:
+    """Потокобезопасный пул соединений.
+
+    Соединение, простоявшее без дела дольше check_idle секунд, проверяется при выдаче
+    (недавно использованное выдается без лишнего запроса, сломанное отбрасывается при возврате),
+    закрывается по истечении max_lifetime, при исчерпании пула запрос ждет не дольше timeout секунд.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        close: Callable[[Any], None],
+        check: Callable[[Any], bool],
+        max_size: int = 10,
+        timeout: float = 30.0,
+        max_lifetime: float = 3600.0,
+        check_idle: float = 30.0,
+    ):
+        self.connect = connect
+        self.close = close
+        self.check = check
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.check_idle = check_idle
+        self._condition = threading.Condition()
+        self._idle = deque()
+        self._in_use = {}
+        self._size = 0
+        self._stats = {
+            "checkouts": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "timeouts": 0,
+            "opened": 0,
+            "closed": 0,
+            "health_check_failures": 0,
+        }
+
+    def acquire(self):
+        start = time.monotonic()
+        while True:
+            pooled = self._take(start)
+            if pooled is None:
+                pooled = self._open()
+            elif time.monotonic() - pooled.released_at > self.check_idle and not self._healthy(pooled):
+                continue
+            waited = time.monotonic() - start
+            with self._condition:
+                self._in_use[id(pooled.connection)] = pooled
+                self._stats["checkouts"] += 1
+                self._stats["wait_seconds_total"] += waited
+                self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+            return pooled.connection
+
+    def release(self, connection, discard: bool = False) -> None:
+        with self._condition:
+            pooled = self._in_use.pop(id(connection), None)
+        if pooled is None:
+            self.close(connection)
+            return
+        if discard or self._expired(pooled):
+            self._discard(pooled)
+            return
+        pooled.released_at = time.monotonic()
+        with self._condition:
+            self._idle.append(pooled)
+            self._condition.notify()
+
+    def close_all(self) -> None:
+        """Закрывает свободные соединения, выданные закрываются при возврате в пул."""
+        with self._condition:
+            while self._idle:
+                self._close(self._idle.pop())
+            self._size -= len(self._in_use)
+            self._in_use.clear()
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        with self._condition:
+            in_use = len(self._in_use)
+            return self._stats | {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": in_use,
+                "max_size": self.max_size,
+                "saturation": in_use / self.max_size,
+            }
+
+    def _take(self, start: float):
+        """Свободное соединение, None если можно открыть новое, иначе ожидание."""
+        deadline = start + self.timeout
+        with self._condition:
+            while True:
+                while self._idle:
+                    pooled = self._idle.pop()
+                    if not self._expired(pooled):
+                        return pooled
+                    self._close(pooled)
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(f"Нет свободного соединения за {self.timeout} с")
+                self._condition.wait(remaining)
+
+    def _open(self) -> PooledConnection:
+        try:
+            connection = self.connect()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._stats["opened"] += 1
+        return PooledConnection(connection)
+
+    def _healthy(self, pooled: PooledConnection) -> bool:
+        try:
+            if self.check(pooled.connection):
+                return True
+        except Exception:
+            pass
+        with self._condition:
+            self._stats["health_check_failures"] += 1
+        self._discard(pooled)
+        return False
+
+    def _expired(self, pooled: PooledConnection) -> bool:
+        return time.monotonic() - pooled.created_at > self.max_lifetime
+
+    def _discard(self, pooled: PooledConnection) -> None:
+        with self._condition:
+            self._close(pooled)
+            self._condition.notify()
+
+    def _close(self, pooled: PooledConnection) -> None:
+        """Вызывается под блокировкой."""
+        self._size -= 1
+        self._stats["closed"] += 1
+        try:
+            self.close(pooled.connection)
+        except Exception:
+            pass
@@ -0,0 +1,11 @@
+from django.http import JsonResponse
+
+from config.internal import internal_only
+
+from . import pool_stats
+
+
+@internal_only
+def pool_stats_view(request):
+    """Статистика пулов соединений процесса."""
+    return JsonResponse(pool_stats())
@@ -0,0 +1,97 @@
+"""
+Чтение с реплик (DATABASE_REPLICAS), запись и все остальное — с primary ("default").
+Реплики читают только безопасные запросы к представлениям с read_from_replica = True.
+После записи клиент получает cookie и REPLICA_PIN_SECONDS читает с primary:
+POST альбома и следующий GET видят новый альбом, пока реплика догоняет primary.
+Реплика выбирается один раз на запрос: count, страница и prefetch читают с одной и той же.
+"""
+import random
+from contextvars import ContextVar
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import Resolver404, resolve
+
+PRIMARY = "default"
+PIN_COOKIE = "primary_pin"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Alias реплики текущего запроса, None — чтение с primary.
+read_replica = ContextVar("read_replica", default=None)
+
+
+def reads_from_replica() -> bool:
+    """Текущий запрос читает с реплики: данные могут отставать от primary."""
+    return read_replica.get() is not None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return read_replica.get() or PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На репликах те же данные, что и на primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема реплик приходит с репликацией.
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaRoutingMiddleware:
+    """Включает чтение с реплики на время запроса и закрепляет клиента за primary после записи.
+
+    Без DATABASE_REPLICAS не подключается. Переменная ставится и сбрасывается вокруг get_response:
+    под ASGI process_view выполняется в другом контексте и reset его токена невозможен.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = read_replica.set(self.choose_replica(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            read_replica.reset(token)
+        return self.pin(request, response)
+
+    async def __acall__(self, request):
+        token = read_replica.set(self.choose_replica(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_replica.reset(token)
+        return self.pin(request, response)
+
+    def choose_replica(self, request) -> Optional[str]:
+        """Реплика для всех чтений запроса или None."""
+        if request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES:
+            return None
+        try:
+            view_func = resolve(request.path_info).func
+        except Resolver404:
+            return None
+        view_class = getattr(view_func, "cls", None) or getattr(view_func, "view_class", None)
+        if not getattr(view_class, "read_from_replica", False):
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def pin(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(PIN_COOKIE, "1", max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite="Lax")
+        return response
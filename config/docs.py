@@ -0,0 +1,52 @@
+"""
+Документация API на drf_yasg: сборка схемы (generate_schema) и страницы Swagger UI и ReDoc.
+Модуль импортируется при первом запросе к документации (config.schema.lazy_view) или командой,
+воркер без обращений к документации drf_yasg не загружает.
+"""
+from django.test import RequestFactory
+from drf_yasg import openapi
+from drf_yasg.app_settings import swagger_settings
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+from rest_framework.request import Request
+
+API_INFO = openapi.Info(
+    title="Catalog API",
+    default_version="v1",
+    description="Документация для проекта Catalog",
+    contact=openapi.Contact(email="nvk.mpei@gmail.com"),
+    license=openapi.License(name="MIT License"),
+)
+
+
+def generate_schema() -> bytes:
+    """Схема по маршрутам и сериализаторам, без host: клиенты берут его из адреса, с которого загрузили схему."""
+    generator = swagger_settings.DEFAULT_GENERATOR_CLASS(API_INFO)
+    # Представлениям каталога для выбора сериализатора нужен запрос.
+    schema = generator.get_schema(request=Request(RequestFactory().get("/swagger.json")), public=True)
+    schema.pop("host", None)
+    schema.pop("schemes", None)
+    return OpenAPICodecJson(validators=[], pretty=True).encode(schema)
+
+
+class DocsPageGenerator(OpenAPISchemaGenerator):
+    """Страницам Swagger UI и ReDoc нужны только заголовок и версия, схему они загружают по SPEC_URL."""
+
+    def get_schema(self, request=None, public=False):
+        return openapi.Swagger(
+            info=self.info, _url=self.url, _prefix="/", _version=self.version, paths=openapi.Paths({})
+        )
+
+
+schema_view = get_schema_view(
+    API_INFO,
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+    generator_class=DocsPageGenerator,
+)
+
+
+def docs_page_view(renderer: str):
+    return schema_view.with_ui(renderer, cache_timeout=0)
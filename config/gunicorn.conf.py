@@ -0,0 +1,48 @@
+"""Настройки gunicorn: приложение WSGI или ASGI (ASYNC_READS), общий каталог метрик Prometheus для всех воркеров,
+импорт приложения в master."""
+import gc
+import os
+import shutil
+
+from dotenv import load_dotenv
+from prometheus_client import multiprocess
+
+# ASYNC_READS и GUNICORN_PRELOAD из .env, как в config.settings.
+load_dotenv()
+
+bind = "0:8000"
+wsgi_app = "config.wsgi:application"
+if os.environ.get("ASYNC_READS", default="False") == "True":
+    # Асинхронное чтение (api.async_views) выполняется в цикле событий uvicorn, а не через async_to_sync.
+    wsgi_app = "config.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+# Приложение импортируется один раз в master, воркеры получают его при fork.
+preload_app = os.environ.get("GUNICORN_PRELOAD", default="True") == "True"
+
+if preload_app:
+    # Сборка мусора в master перемещает объекты и портит общие страницы, warmup замораживает их перед fork.
+    gc.disable()
+
+
+def on_starting(server):
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+
+
+def when_ready(server):
+    # Вызывается в master после импорта приложения и до fork воркеров; без preload прогревать нечего.
+    if server.cfg.preload_app:
+        from config.startup import warmup
+
+        warmup()
+
+
+def post_fork(server, worker):
+    gc.enable()
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,37 @@
+"""
+Служебные адреса только для клиентов из settings.INTERNAL_NETWORKS (Prometheus, проверки в сети кластера).
+Запрос через прокси (с X-Forwarded-For) считается внешним: адрес прокси сам может быть внутренним.
+"""
+from functools import lru_cache, wraps
+from ipaddress import ip_address, ip_network
+from typing import Callable, Tuple
+
+from django.conf import settings
+from django.http import Http404
+
+
+@lru_cache(maxsize=None)
+def internal_networks(networks: Tuple[str, ...]) -> tuple:
+    return tuple(ip_network(network.strip()) for network in networks if network.strip())
+
+
+def is_internal(request) -> bool:
+    if "X-Forwarded-For" in request.headers:
+        return False
+    try:
+        address = ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(address in network for network in internal_networks(tuple(settings.INTERNAL_NETWORKS)))
+
+
+def internal_only(view: Callable) -> Callable:
+    """Представление отвечает 404 клиентам вне INTERNAL_NETWORKS."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not is_internal(request):
+            raise Http404
+        return view(request, *args, **kwargs)
+
+    return wrapper
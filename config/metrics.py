@@ -0,0 +1,208 @@
+"""
+Метрики Prometheus: время ответа, размер ответа, число и время SQL запросов по действию view.
+Действие берется из маршрутов DefaultRouter: artists-list, albums-remove-track, tracks-create.
+При PROMETHEUS_MULTIPROC_DIR значения собираются со всех воркеров gunicorn.
+"""
+import os
+import resource
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from config.db_pool import pool_stats
+from config.internal import internal_only
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+REQUEST_LATENCY = Histogram(
+    "catalog_request_duration_seconds", "Время обработки запроса", ["view", "method", "status"], buckets=LATENCY_BUCKETS
+)
+RESPONSE_SIZE = Histogram("catalog_response_size_bytes", "Размер тела ответа", ["view"], buckets=SIZE_BUCKETS)
+DB_QUERIES = Histogram("catalog_db_queries", "SQL запросов на запрос", ["view"], buckets=QUERY_BUCKETS)
+DB_QUERY_TIME = Histogram(
+    "catalog_db_query_duration_seconds", "Время SQL запросов на запрос", ["view"], buckets=LATENCY_BUCKETS
+)
+DB_POOL = Gauge("catalog_db_pool", "Статистика пула соединений", ["alias", "stat"], multiprocess_mode="livesum")
+PEAK_RSS = Gauge("catalog_process_peak_rss_bytes", "Пиковый RSS процесса", multiprocess_mode="max")
+PROCESS_STATS_INTERVAL = 1.0
+DB_POOL_STATS = (
+    "size",
+    "idle",
+    "in_use",
+    "max_size",
+    "checkouts",
+    "wait_seconds_total",
+    "timeouts",
+    "opened",
+    "closed",
+    "health_check_failures",
+)
+
+
+def view_label(request) -> str:
+    """basename-action для ViewSet, имя маршрута для остальных view."""
+    match = request.resolver_match
+    if match is None:
+        return "unmatched"
+    view = getattr(match.func, "view_initkwargs", {}).get("sync_view", match.func)
+    actions = getattr(view, "actions", None)
+    basename = getattr(view, "initkwargs", {}).get("basename")
+    if actions and basename and request.method.lower() in actions:
+        action = actions[request.method.lower()].replace("_", "-")
+        return f"{basename}-{action}"
+    return match.url_name or match.view_name
+
+
+class QueryCounter:
+    """execute_wrapper: считает запросы и их суммарное время."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+# Счетчик текущего запроса: под ASGI ORM работает в потоке sync_to_async, контекст копируется туда.
+request_queries = ContextVar("request_queries", default=None)
+
+
+def count_query(execute, sql, params, many, context):
+    counter = request_queries.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    return counter(execute, sql, params, many, context)
+
+
+@receiver(request_started)
+def instrument_connections(**kwargs) -> None:
+    """Соединения потока, в котором выполняются view (у каждого потока свои), считают запросы в request_queries."""
+    for connection in connections.all(initialized_only=True):
+        instrument_connection(connection)
+
+
+@receiver(connection_created)
+def instrument_connection(connection, **kwargs) -> None:
+    if count_query not in connection.execute_wrappers:
+        # В начало списка: execute_wrapper() снимает последний обработчик.
+        connection.execute_wrappers.insert(0, count_query)
+
+
+class CountedStream:
+    """Тело потокового ответа: запросы при чтении тела считаются в счетчик запроса, по окончании — метрики."""
+
+    def __init__(self, content, counter: QueryCounter, done):
+        self.iterator = iter(content)
+        self.counter = counter
+        self.done = done
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        token = request_queries.set(self.counter)
+        try:
+            return next(self.iterator)
+        except StopIteration:
+            self.done()
+            raise
+        finally:
+            request_queries.reset(token)
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.process_stats_at = 0.0
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        counter = QueryCounter()
+        token = request_queries.set(counter)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_queries.reset(token)
+        self.observe(request, response, counter, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        counter = QueryCounter()
+        token = request_queries.set(counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_queries.reset(token)
+        self.observe(request, response, counter, time.perf_counter() - start)
+        return response
+
+    def observe(self, request, response, counter: QueryCounter, seconds: float) -> None:
+        view = view_label(request)
+        REQUEST_LATENCY.labels(view, request.method, response.status_code).observe(seconds)
+        if not response.streaming:
+            RESPONSE_SIZE.labels(view).observe(len(response.content))
+            self.observe_queries(view, counter)
+        elif response.is_async:
+            self.observe_queries(view, counter)
+        else:
+            # Запросы выгрузки выполняются при чтении тела, после возврата из middleware.
+            response.streaming_content = CountedStream(
+                response.streaming_content, counter, lambda: self.observe_queries(view, counter)
+            )
+        now = time.monotonic()
+        if now - self.process_stats_at >= PROCESS_STATS_INTERVAL:
+            # Каждый воркер публикует свой пул, livesum складывает их по живым процессам.
+            self.process_stats_at = now
+            collect_process_stats()
+
+    def observe_queries(self, view: str, counter: QueryCounter) -> None:
+        DB_QUERIES.labels(view).observe(counter.count)
+        DB_QUERY_TIME.labels(view).observe(counter.seconds)
+
+
+def collect_process_stats() -> None:
+    PEAK_RSS.set(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+    for alias, stats in pool_stats().items():
+        for stat in DB_POOL_STATS:
+            DB_POOL.labels(alias, stat).set(stats[stat])
+
+
+@internal_only
+def metrics_view(request):
+    """Метрики в текстовом формате Prometheus."""
+    registry = REGISTRY
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,45 @@
+"""
+Middleware браузера (settings.BROWSER_MIDDLEWARE: сессии, CSRF, пользователь, сообщения, X-Frame-Options)
+только для запросов вне settings.API_PATH_PREFIXES. Клиенты /api/ не хранят состояние
+и проходят короткий стек, админка и остальные страницы — полный.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+def is_api_request(request) -> bool:
+    return request.path_info.startswith(tuple(settings.API_PATH_PREFIXES))
+
+
+class BrowserMiddleware:
+    """Цепочка BROWSER_MIDDLEWARE вокруг остальной части стека, process_view вызываются в порядке списка."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.view_middleware = []
+        handler = get_response
+        for path in reversed(settings.BROWSER_MIDDLEWARE):
+            handler = import_string(path)(handler)
+            if hasattr(handler, "process_view"):
+                self.view_middleware.insert(0, handler.process_view)
+        self.browser_response = handler
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if is_api_request(request):
+            return self.get_response(request)
+        return self.browser_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if is_api_request(request):
+            return None
+        for process_view in self.view_middleware:
+            response = process_view(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
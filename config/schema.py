@@ -0,0 +1,77 @@
+"""
+Схема OpenAPI собирается заранее командой generate_schema в config/openapi.json,
+файл лежит в репозитории, CI проверяет его актуальность (generate_schema --check).
+Процесс читает файл один раз и отдает готовые байты: JSON, YAML и их gzip с ETag.
+Swagger UI и ReDoc (config.docs) загружают схему с того же адреса и не собирают ее по маршрутам.
+"""
+import gzip
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict
+
+import yaml
+from django.http import HttpResponse, HttpResponseNotModified
+from django.middleware.gzip import re_accepts_gzip
+from django.utils.cache import patch_vary_headers
+from django.utils.module_loading import import_string
+
+SCHEMA_PATH = Path(__file__).with_name("openapi.json")
+SCHEMA_MAX_AGE = 300
+MEDIA_TYPES = {".json": "application/json", ".yaml": "application/yaml"}
+
+
+class SchemaDocument:
+    __slots__ = ("content", "gzipped", "etag", "media_type")
+
+    def __init__(self, content: bytes, media_type: str):
+        self.content = content
+        self.gzipped = gzip.compress(content, mtime=0)
+        self.etag = f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+        self.media_type = media_type
+
+
+@lru_cache(maxsize=None)
+def prebuilt_schema() -> Dict[str, SchemaDocument]:
+    """Документы схемы по формату, без файла схема собирается один раз при первом запросе."""
+    if SCHEMA_PATH.exists():
+        content = SCHEMA_PATH.read_bytes()
+    else:
+        from config.docs import generate_schema
+
+        content = generate_schema()
+    spec = yaml.safe_dump(json.loads(content), allow_unicode=True, sort_keys=False).encode()
+    return {
+        ".json": SchemaDocument(content, MEDIA_TYPES[".json"]),
+        ".yaml": SchemaDocument(spec, MEDIA_TYPES[".yaml"]),
+    }
+
+
+def schema_file_view(request, format):
+    """Готовая схема: 304 по If-None-Match, gzip по Accept-Encoding."""
+    document = prebuilt_schema()[format]
+    if document.etag in request.headers.get("If-None-Match", ""):
+        response = HttpResponseNotModified()
+    elif re_accepts_gzip.search(request.headers.get("Accept-Encoding", "")):
+        response = HttpResponse(document.gzipped, content_type=document.media_type)
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(document.content, content_type=document.media_type)
+    response["ETag"] = document.etag
+    response["Cache-Control"] = f"public, max-age={SCHEMA_MAX_AGE}"
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+def lazy_view(factory_path: str, *args) -> Callable:
+    """Представление создается фабрикой при первом запросе: ее модуль не импортируется при старте воркера."""
+    view = None
+
+    def wrapper(request, *view_args, **view_kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(factory_path)(*args)
+        return view(request, *view_args, **view_kwargs)
+
+    return wrapper
@@ -12,16 +12,24 @@ DEBUG = True
 
 ALLOWED_HOSTS = ["*"]
 
+# В production админку и страницы документации можно отключить: воркер не импортирует их при старте.
+ADMIN_ENABLED = os.getenv("ADMIN_ENABLED", default="True") == "True"
+API_DOCS_ENABLED = os.getenv("API_DOCS_ENABLED", default="True") == "True"
+# Служебные адреса (статистика пула, метрики) отвечают только клиентам из этих сетей, остальным 404.
+INTERNAL_NETWORKS = os.getenv("INTERNAL_NETWORKS", default="127.0.0.0/8,::1/128").split(",")
+
 INSTALLED_APPS = [
-    "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
-    "drf_yasg",
     "rest_framework",
 ]
+if ADMIN_ENABLED:
+    INSTALLED_APPS.insert(0, "django.contrib.admin")
+if API_DOCS_ENABLED:
+    INSTALLED_APPS.append("drf_yasg")
 
 PROJECT_APPS = [
     "api.apps.ApiConfig",
@@ -31,16 +39,26 @@ PROJECT_APPS = [
 INSTALLED_APPS += PROJECT_APPS
 
 MIDDLEWARE = [
+    "config.metrics.MetricsMiddleware",
+    "config.db_router.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "config.middleware.BrowserMiddleware",
+]
+# Запросы к API_PATH_PREFIXES проходят без них (config.middleware).
+BROWSER_MIDDLEWARE = [
+    "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
+API_PATH_PREFIXES = ("/api/",)
 
 ROOT_URLCONF = "config.urls"
+# Отложенные ограничения AlbumTrack на SQLite заменены уникальными индексами (catalog 0005).
+# Middleware сессий, пользователя и сообщений для админки подключает BrowserMiddleware.
+SILENCED_SYSTEM_CHECKS = ["models.W038", "admin.E408", "admin.E409", "admin.E410"]
 
 TEMPLATES = [
     {
@@ -59,6 +77,10 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "config.wsgi.application"
+# GET list/retrieve каталога через async ORM, имеет смысл только под ASGI воркером.
+ASYNC_READS = os.getenv("ASYNC_READS", default="False") == "True"
+# GET list/retrieve каталога без параметров из снимка в памяти процесса (api.snapshot).
+CATALOG_SNAPSHOT = os.getenv("CATALOG_SNAPSHOT", default="False") == "True"
 
 
 DATABASES = {
@@ -69,8 +91,42 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD", default="postgres"),
         "HOST": os.getenv("DB_HOST", default="localhost"),
         "PORT": os.getenv("DB_PORT", default=5432),
+        # Используется только с DB_ENGINE=config.db_pool.
+        # Соединений на реплику: воркеры * MAX_SIZE, сумма по репликам должна быть меньше max_connections.
+        "POOL": {
+            "MAX_SIZE": int(os.getenv("DB_POOL_MAX_SIZE", default=10)),
+            "TIMEOUT": float(os.getenv("DB_POOL_TIMEOUT", default=30)),
+            "MAX_LIFETIME": float(os.getenv("DB_POOL_MAX_LIFETIME", default=3600)),
+            "CHECK_IDLE": float(os.getenv("DB_POOL_CHECK_IDLE", default=30)),
+        },
+    }
+}
+
+# Реплики чтения: DB_REPLICAS — хосты PostgreSQL через запятую (для SQLite — пути к файлам баз).
+DATABASE_REPLICAS = []
+for number, location in enumerate(filter(None, os.getenv("DB_REPLICAS", default="").split(",")), start=1):
+    location_key = "NAME" if DATABASES["default"]["ENGINE"].endswith("sqlite3") else "HOST"
+    DATABASES[f"replica{number}"] = {
+        **DATABASES["default"],
+        location_key: location.strip(),
+        "TEST": {"MIRROR": "default"},
     }
+    DATABASE_REPLICAS.append(f"replica{number}")
+DATABASE_ROUTERS = ["config.db_router.ReplicaRouter"]
+# Секунд чтения с primary после записи клиента, должно быть больше отставания реплик.
+REPLICA_PIN_SECONDS = int(os.getenv("DB_REPLICA_PIN_SECONDS", default=5))
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "catalog": {
+        "BACKEND": os.getenv("CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", default="catalog"),
+        "TIMEOUT": int(os.getenv("CACHE_TIMEOUT", default=300)),
+    },
 }
+RESPONSE_CACHE_ALIAS = "catalog"
 
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -91,10 +147,24 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "api.pagination.CatalogPagination",
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.ORJSONRenderer",
+        "api.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "api.renderers.ORJSONParser",
+        "api.renderers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "PAGE_SIZE": 100,
     "TEST_REQUEST_DEFAULT_FORMAT": "json",
 }
+# Страницы документации загружают готовую схему (config.schema).
+SWAGGER_SETTINGS = {"SPEC_URL": ("schema-json", {"format": ".json"})}
+REDOC_SETTINGS = {"SPEC_URL": ("schema-json", {"format": ".json"})}
 LANGUAGE_CODE = "ru"
 
 TIME_ZONE = "Europe/Moscow"
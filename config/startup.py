@@ -0,0 +1,120 @@
+"""
+Старт воркера: профиль импорта модулей (profile_startup) и прогрев приложения до fork.
+С preload_app gunicorn импортирует приложение один раз в master, воркеры получают
+модули, маршруты и сериализаторы копированием страниц при записи (copy-on-write).
+"""
+import gc
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, NamedTuple
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)\s*$")
+STARTUP_SCRIPT = "from config.startup import traced_startup; traced_startup()"
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def warmup() -> None:
+    """Импорт URLconf с представлениями и сериализаторами, вызывается хуком when_ready в master gunicorn."""
+    from django.db import connections
+    from django.urls import get_resolver
+
+    from config.db_pool import close_pools
+
+    get_resolver().reverse_dict
+    # Соединения master не должны достаться воркерам: close_all возвращает их в пул, пулы закрываются.
+    connections.close_all()
+    close_pools()
+    # Объекты, созданные при старте, не обходятся сборщиком мусора: страницы памяти не копируются в воркеры.
+    gc.freeze()
+
+
+def parse_importtime(text: str) -> List[ImportTime]:
+    entries = []
+    for line in text.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            entries.append(ImportTime(match[3], int(match[1]), int(match[2])))
+    return entries
+
+
+def traced_startup() -> None:
+    """Импорт config.wsgi со временем загрузки приложений в stdout.
+
+    import_module не попадает в вывод -X importtime, поэтому время приложения INSTALLED_APPS
+    (модуль, models, ready) замеряется отдельно, общие зависимости достаются первому приложению.
+    """
+    from django.apps.config import AppConfig
+
+    seconds = defaultdict(float)
+
+    def timed(method: Callable, name: Callable[..., str]) -> Callable:
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                seconds[name(*args)] += time.perf_counter() - start
+
+        return wrapper
+
+    create = AppConfig.create.__func__
+
+    def create_timed(cls, entry):
+        start = time.perf_counter()
+        app_config = create(cls, entry)
+        seconds[app_config.name] += time.perf_counter() - start
+        app_config.ready = timed(app_config.ready, lambda: app_config.name)
+        return app_config
+
+    AppConfig.create = classmethod(create_timed)
+    AppConfig.import_models = timed(AppConfig.import_models, lambda app_config: app_config.name)
+    import config.wsgi  # noqa: F401
+
+    sys.stdout.write(json.dumps(seconds))
+
+
+def profile_startup() -> tuple:
+    """Старт приложения в отдельном процессе с python -X importtime: (время, импорты, время приложений)."""
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "config.settings")}
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return time.perf_counter() - start, parse_importtime(result.stderr), json.loads(result.stdout)
+
+
+def startup_report(seconds: float, entries: List[ImportTime], apps: Dict[str, float], top: int = 20) -> dict:
+    """Время старта по приложениям INSTALLED_APPS, собственное время импорта по модулям и пакетам."""
+    packages = defaultdict(int)
+    for entry in entries:
+        packages[entry.module.partition(".")[0]] += entry.self_us
+    modules = sorted(entries, key=lambda entry: entry.self_us, reverse=True)[:top]
+    return {
+        "startup_ms": round(seconds * 1000, 1),
+        "imports_ms": round(sum(entry.self_us for entry in entries) / 1000, 1),
+        "apps": ranked({name: value * 1000 for name, value in apps.items()}, len(apps)),
+        "packages": ranked({name: value / 1000 for name, value in packages.items()}, top),
+        "modules": [
+            {"module": entry.module, "self_ms": entry.self_us / 1000, "cumulative_ms": entry.cumulative_us / 1000}
+            for entry in modules
+        ],
+    }
+
+
+def ranked(totals: Dict[str, float], top: int) -> List[dict]:
+    items = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{"name": name, "ms": round(value, 1)} for name, value in items]
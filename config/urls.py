@@ -1,40 +1,36 @@
-from django.contrib import admin
+from django.conf import settings
 from django.urls import include, path, re_path
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
+
+from config.db_pool.views import pool_stats_view
+from config.metrics import metrics_view
+from config.schema import lazy_view, schema_file_view
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
     path("api/", include("api.urls")),
-]
-
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Catalog API",
-        default_version="v1",
-        description="Документация для проекта Catalog",
-        contact=openapi.Contact(email="nvk.mpei@gmail.com"),
-        license=openapi.License(name="MIT License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
-
-urlpatterns += [
+    path("health/db-pool/", pool_stats_view, name="db-pool-stats"),
+    path("metrics", metrics_view, name="metrics"),
     re_path(
         r"^swagger(?P<format>\.json|\.yaml)$",
-        schema_view.without_ui(cache_timeout=0),
+        schema_file_view,
         name="schema-json",
     ),
-    re_path(
-        r"^swagger/$",
-        schema_view.with_ui("swagger", cache_timeout=0),
-        name="schema-swagger-ui",
-    ),
-    re_path(
-        r"^redoc/$",
-        schema_view.with_ui("redoc", cache_timeout=0),
-        name="schema-redoc",
-    ),
 ]
+
+if settings.ADMIN_ENABLED:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path("admin/", admin.site.urls))
+
+if settings.API_DOCS_ENABLED:
+    urlpatterns += [
+        re_path(
+            r"^swagger/$",
+            lazy_view("config.docs.docs_page_view", "swagger"),
+            name="schema-swagger-ui",
+        ),
+        re_path(
+            r"^redoc/$",
+            lazy_view("config.docs.docs_page_view", "redoc"),
+            name="schema-redoc",
+        ),
+    ]
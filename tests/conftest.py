@@ -1,7 +1,20 @@
 import pytest
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
 from rest_framework.test import APIClient
 
 
 @pytest.fixture(scope="session")
 def api_client():
     return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    caches[settings.RESPONSE_CACHE_ALIAS].clear()
+
+
+def pytest_runtest_setup(item):
+    if item.get_closest_marker("postgresql") and connection.vendor != "postgresql":
+        pytest.skip("Нужен PostgreSQL")
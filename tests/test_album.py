@@ -1,13 +1,14 @@
 from typing import Any, Dict
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from pytest_assert_utils import assert_model_attrs
 from pytest_common_subject import precondition_fixture
 from pytest_drf import (
     Returns200,
     Returns201,
-    Returns204,
     Returns400,
     UsesDeleteMethod,
     UsesDetailEndpoint,
@@ -21,7 +22,7 @@ from pytest_drf.util import pluralized, url_for
 from pytest_lambda import lambda_fixture, static_fixture
 from rest_framework import status
 
-from catalog.models import Album, AlbumTrack, Artist
+from catalog.models import Album, AlbumTrack, Artist, Track
 
 from .factories import AlbumFactory, AlbumWith2TracksFactory, ArtistFactory, TrackFactory
 from .utils import set_field_obj
@@ -34,6 +35,7 @@ def express_album(album: Album) -> Dict[str, Any]:
         "name": album.name,
         "artist": album.artist.id,
         "year": album.year,
+        "tracks_count": album.album_tracks.count(),
         "album_tracks": list(map(str, album.album_tracks.all())),
     }
 
@@ -144,7 +146,7 @@ class TestAlbumViewSet(ViewSetTest):
     class TestDestroy(
         UsesDeleteMethod,
         UsesDetailEndpoint,
-        Returns204,
+        Returns200,
     ):
         album = lambda_fixture(lambda: AlbumFactory.create())
         initial_album_ids = precondition_fixture(
@@ -195,6 +197,111 @@ class TestAlbumViewSetAction:
         assert response.status_code == status.HTTP_204_NO_CONTENT
         assert expected == actual
 
+    def test_it_deletes_many_orders(self, api_client):
+        """Тест удаления нескольких номеров: трэки без альбомов удаляются"""
+        album = AlbumWith2TracksFactory.create()
+        shared = TrackFactory.create()
+        AlbumTrack.objects.create(track=shared, album=album, order=50)
+        AlbumTrack.objects.create(track=shared, album=AlbumFactory.create(), order=51)
+        orders = list(album.album_tracks.values_list("order", flat=True))
+        url = url_for("albums-remove-track", album.id)
+
+        response = api_client.delete(url, {"orders": orders}, format="json")
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert response.data == {"album_tracks": 3, "tracks": 2}
+        assert not album.album_tracks.exists()
+        assert list(Track.objects.filter(name__in=album.tracks.values("name"))) == []
+        assert shared.track_albums.count() == 1
+        album.refresh_from_db()
+        assert album.tracks_count == 0
+
+    def test_it_deletes_nothing_on_missing_order(self, api_client):
+        album = AlbumWith2TracksFactory.create()
+        order = album.album_tracks.first().order
+        url = url_for("albums-remove-track", album.id)
+
+        response = api_client.delete(url, {"orders": [order, 999]}, format="json")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.data == {"orders": [999]}
+        assert album.album_tracks.count() == 2
+
+    @pytest.mark.parametrize("data", [{}, {"order": 1, "orders": [2]}, {"orders": []}])
+    def test_it_validates_orders(self, api_client, data):
+        album = AlbumWith2TracksFactory.create()
+        response = api_client.delete(url_for("albums-remove-track", album.id), data, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_constant_statements(self, api_client):
+        small, large = AlbumWith2TracksFactory.create(), AlbumFactory.create()
+        for order in range(1, 11):
+            AlbumTrack.objects.create(track=TrackFactory.create(), album=large, order=order)
+        orders = [small.album_tracks.first().order]
+        with CaptureQueriesContext(connection) as small_queries:
+            api_client.delete(url_for("albums-remove-track", small.id), {"orders": orders}, format="json")
+        with CaptureQueriesContext(connection) as large_queries:
+            api_client.delete(url_for("albums-remove-track", large.id), {"orders": list(range(1, 11))}, format="json")
+        assert len(small_queries) == len(large_queries)
+
+
+def create_album_tracks(size: int, orders=None) -> Album:
+    album = AlbumFactory.create()
+    for order in orders or range(1, size + 1):
+        AlbumTrack.objects.create(album=album, track=TrackFactory.create(), order=order)
+    return album
+
+
+def track_orders(album: Album) -> list:
+    """id трэков альбома по возрастанию номера и сами номера."""
+    links = album.album_tracks.order_by("order")
+    return [list(links.values_list("track_id", flat=True)), list(links.values_list("order", flat=True))]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAlbumReorder:
+    def reorder(self, api_client, album, data):
+        return api_client.post(url_for("albums-reorder", album.id), data, format="json")
+
+    def test_it_applies_full_ordering(self, api_client):
+        album = create_album_tracks(5)
+        tracks, _ = track_orders(album)
+        response = self.reorder(api_client, album, {"tracks": tracks[::-1]})
+        assert response.status_code == status.HTTP_200_OK
+        assert track_orders(album) == [tracks[::-1], [1, 2, 3, 4, 5]]
+        assert sorted(response.json()["album_tracks"]) == sorted(map(str, album.album_tracks.all()))
+
+    def test_it_moves_and_compacts(self, api_client):
+        album = create_album_tracks(4, orders=[2, 5, 7, 10])
+        tracks, _ = track_orders(album)
+        self.reorder(api_client, album, {"compact": True})
+        assert track_orders(album) == [tracks, [1, 2, 3, 4]]
+        self.reorder(api_client, album, {"move": {"order": 4, "to": 1}})
+        assert track_orders(album) == [[tracks[3]] + tracks[:3], [1, 2, 3, 4]]
+
+    def test_it_rejects_invalid_orderings(self, api_client):
+        album = create_album_tracks(3)
+        tracks, orders = track_orders(album)
+        assert self.reorder(api_client, album, {"tracks": tracks[:2]}).status_code == status.HTTP_400_BAD_REQUEST
+        assert self.reorder(api_client, album, {"tracks": tracks, "compact": True}).status_code == 400
+        assert self.reorder(api_client, album, {"move": {"order": 9, "to": 1}}).status_code == 404
+
+        other = AlbumFactory.create()
+        AlbumTrack.objects.create(album=other, track_id=tracks[0], order=3)
+        response = self.reorder(api_client, album, {"tracks": tracks[::-1]})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert track_orders(album) == [tracks, orders]
+
+    def test_constant_statements(self, api_client):
+        small, large = create_album_tracks(4), create_album_tracks(40)
+        small_tracks, large_tracks = track_orders(small)[0], track_orders(large)[0]
+        with CaptureQueriesContext(connection) as small_queries:
+            self.reorder(api_client, small, {"tracks": small_tracks[::-1]})
+        with CaptureQueriesContext(connection) as large_queries:
+            self.reorder(api_client, large, {"tracks": large_tracks[::-1]})
+        assert len(small_queries) == len(large_queries)
+        assert track_orders(large)[0] == large_tracks[::-1]
+
 
 @pytest.mark.django_db(transaction=True)
 @pytest.mark.parametrize(
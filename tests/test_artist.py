@@ -1,3 +1,4 @@
+import json
 from typing import Any, Dict
 
 import pytest
@@ -6,7 +7,6 @@ from pytest_common_subject import precondition_fixture
 from pytest_drf import (
     Returns200,
     Returns201,
-    Returns204,
     Returns400,
     UsesDeleteMethod,
     UsesDetailEndpoint,
@@ -21,7 +21,7 @@ from pytest_lambda import lambda_fixture, static_fixture
 
 from catalog.models import Artist
 
-from .factories import ArtistFactory
+from .factories import AlbumWith2TracksFactory, ArtistFactory
 
 
 def express_artist(artist: Artist) -> Dict[str, Any]:
@@ -29,6 +29,8 @@ def express_artist(artist: Artist) -> Dict[str, Any]:
     return {
         "id": artist.id,
         "name": artist.name,
+        "albums_count": 0,
+        "tracks_count": 0,
         "albums": [],
     }
 
@@ -133,7 +135,7 @@ class TestArtistViewSet(ViewSetTest):
     class TestDestroy(
         UsesDeleteMethod,
         UsesDetailEndpoint,
-        Returns204,
+        Returns200,
     ):
         artist = lambda_fixture(lambda: ArtistFactory.create())
         initial_artist_ids = precondition_fixture(
@@ -164,3 +166,18 @@ class TestArtistViewSet(ViewSetTest):
             actual = set(Artist.objects.values_list("id", flat=True))
             expected = initial_artist_ids
             assert expected == actual
+
+
+@pytest.mark.django_db(transaction=True)
+def test_it_exports_ndjson(api_client):
+    """Тест потоковой выгрузки каталога"""
+    album = AlbumWith2TracksFactory.create()
+    ArtistFactory.create_batch(size=2)
+    response = api_client.get(url_for("artists-export"))
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    documents = [json.loads(line) for line in lines]
+    assert response["Content-Type"] == "application/x-ndjson"
+    assert [document["id"] for document in documents] == list(Artist.objects.values_list("id", flat=True))
+    exported = next(document for document in documents if document["id"] == album.artist_id)
+    expected = [str(album_track) for album_track in album.album_tracks.order_by("order")]
+    assert exported["albums"][0]["album_tracks"] == expected
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+from pytest_drf.util import url_for
+
+from api.async_views import AsyncAlbumView, AsyncArtistView, AsyncTrackView
+from api.urls import router
+
+from .factories import AlbumWith2TracksFactory, TrackWith2AlbumFactory
+
+SYNC_VIEWS = {pattern.name: pattern.callback for pattern in router.urls}
+
+
+def call_async(view_class, url_name, method="get", data=None, headers=None, **kwargs):
+    view = view_class.as_view(sync_view=SYNC_VIEWS[url_name])
+    request = getattr(RequestFactory(), method)(
+        url_for(url_name, *kwargs.values()), data, content_type="application/json", headers=headers
+    )
+    return async_to_sync(view)(request, **kwargs)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncReadViews:
+    @pytest.mark.parametrize(
+        "view_class, basename",
+        [(AsyncArtistView, "artists"), (AsyncAlbumView, "albums"), (AsyncTrackView, "tracks")],
+    )
+    def test_list_matches_sync(self, api_client, view_class, basename):
+        AlbumWith2TracksFactory.create_batch(size=3)
+        TrackWith2AlbumFactory.create()
+        response = call_async(view_class, f"{basename}-list")
+        assert json.loads(response.content) == api_client.get(url_for(f"{basename}-list")).json()
+
+    def test_detail_matches_sync(self, api_client):
+        album = AlbumWith2TracksFactory.create()
+        response = call_async(AsyncArtistView, "artists-detail", pk=album.artist_id)
+        assert json.loads(response.content) == api_client.get(url_for("artists-detail", album.artist_id)).json()
+
+    def test_missing_detail_is_404(self):
+        response = call_async(AsyncAlbumView, "albums-detail", pk=10**9)
+        assert response.status_code == 404
+
+    def test_write_goes_to_sync_viewset(self):
+        response = call_async(AsyncArtistView, "artists-list", method="post", data={"name": "Async"})
+        assert response.status_code == 201
+
+    @pytest.mark.parametrize(
+        "accept, status",
+        [("application/xml", 406), ("text/plain, image/*", 406), ("application/json", 200), ("application/*", 200)],
+    )
+    def test_accept_negotiation(self, accept, status):
+        AlbumWith2TracksFactory.create()
+        response = call_async(AsyncAlbumView, "albums-list", headers={"Accept": accept})
+        assert response.status_code == status
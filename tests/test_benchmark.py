@@ -0,0 +1,104 @@
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from api.benchmark import compare, percentile
+from catalog.models import Album, AlbumTrack, Artist, Track
+
+
+def counts() -> tuple:
+    return tuple(model.objects.count() for model in (Artist, Album, Track, AlbumTrack))
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert [percentile(values, rank) for rank in (50, 95, 99)] == [50, 95, 99]
+    assert percentile([3.0], 99) == 3.0
+
+
+def test_compare_finds_regressions():
+    endpoint = {"p50_ms": 1, "p95_ms": 10, "p99_ms": 20, "queries_per_request": 2, "errors": 0}
+    baseline = {"throughput_rps": 100, "endpoints": {"artists-list": endpoint}}
+    same = {"throughput_rps": 95, "endpoints": {"artists-list": endpoint | {"p95_ms": 10.5}}}
+    assert compare(baseline, same, max_regression=10) == []
+    worse = {"throughput_rps": 50, "endpoints": {"artists-list": endpoint | {"p99_ms": 30, "queries_per_request": 3}}}
+    assert compare(baseline, worse, max_regression=10) == [
+        "throughput: 100 -> 50 rps",
+        "artists-list p99_ms: 20 -> 30",
+        "artists-list queries: 2 -> 3",
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBenchmark:
+    def test_seed_catalog(self):
+        initial = counts()
+        call_command("seed_catalog", links=100, stdout=io.StringIO())
+        assert counts() == (initial[0] + 1, initial[1] + 10, initial[2] + 50, initial[3] + 100)
+        assert Track.objects.get(name="Seed track 00000003").albums.count() == 2
+        call_command("seed_catalog", links=100, stdout=io.StringIO())
+        assert counts()[3] == initial[3] + 100
+
+    def test_it_drives_every_endpoint(self, tmp_path):
+        call_command("seed_catalog", links=200, stdout=io.StringIO())
+        initial = counts()
+        output = tmp_path / "report.json"
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(json.dumps({"throughput_rps": 10**9, "endpoints": {}}))
+        with pytest.raises(CommandError, match="throughput"):
+            call_command(
+                "benchmark",
+                concurrency=1,
+                rounds=2,
+                warmup=0,
+                output=str(output),
+                compare=str(baseline),
+                stdout=io.StringIO(),
+            )
+        report = json.loads(output.read_text())
+        assert counts() == initial
+        assert set(report["endpoints"]) == {
+            f"{basename}-{action}"
+            for basename, actions in {
+                "artists": ["list", "retrieve", "create", "update", "partial-update", "destroy", "bulk", "export"],
+                "albums": [
+                    "list",
+                    "retrieve",
+                    "create",
+                    "update",
+                    "partial-update",
+                    "destroy",
+                    "remove-track",
+                    "reorder",
+                ],
+                "tracks": ["list", "retrieve", "create", "destroy"],
+                "search": ["list"],
+            }.items()
+            for action in actions
+        }
+        assert all(stats["errors"] == 0 for stats in report["endpoints"].values())
+        assert report["endpoints"]["artists-retrieve"]["queries_per_request"] >= 1
+        assert report["peak_rss_mb"] > 0
+
+    def test_http_client_cleans_up_through_api(self, live_server, tmp_path):
+        """Против --url объекты круга находятся по ответам и удаляются запросами к серверу"""
+        call_command("seed_catalog", links=100, stdout=io.StringIO())
+        initial = counts()
+        output = tmp_path / "report.json"
+        excluded = ["artists-destroy", "albums-destroy", "tracks-destroy", "artists-export"]
+        call_command(
+            "benchmark",
+            url=live_server.url,
+            concurrency=1,
+            rounds=2,
+            warmup=0,
+            exclude=excluded,
+            output=str(output),
+            stdout=io.StringIO(),
+        )
+        report = json.loads(output.read_text())
+        assert counts() == initial
+        assert not set(excluded) & set(report["endpoints"])
+        assert all(stats["errors"] == 0 for stats in report["endpoints"].values())
@@ -0,0 +1,85 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from pytest_drf.util import url_for
+from rest_framework import status
+
+from api.serializers import CatalogBulkSerializer
+from catalog.models import Album, AlbumTrack, Artist, Track
+
+from .factories import AlbumFactory, AlbumTrackFactory, ArtistFactory
+
+
+def make_payload(artists: int, albums: int, tracks: int, prefix: str = "") -> dict:
+    return {
+        "artists": [
+            {
+                "name": f"{prefix}Artist {a}",
+                "albums": [
+                    {
+                        "name": f"{prefix}Album {a}-{b}",
+                        "year": 2000,
+                        "tracks": [f"{prefix}Track {a}-{b}-{t}" for t in range(tracks)],
+                    }
+                    for b in range(albums)
+                ],
+            }
+            for a in range(artists)
+        ]
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBulkCreate:
+    url = url_for("artists-bulk")
+
+    def test_it_creates_catalog(self, api_client):
+        existing = ArtistFactory.create(name="Artist 0")
+        response = api_client.post(self.url, make_payload(2, 2, 3), format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json() == {"artists": 1, "albums": 4, "tracks": 12, "album_tracks": 12}
+        assert existing.albums.count() == 2
+        orders = AlbumTrack.objects.filter(album__name="Album 1-1").order_by("order")
+        assert [(link.order, link.track.name) for link in orders] == [(t + 1, f"Track 1-1-{t}") for t in range(3)]
+
+    def test_constant_statements(self, api_client):
+        with CaptureQueriesContext(connection) as small:
+            api_client.post(self.url, make_payload(1, 1, 2, "a"), format="json")
+        with CaptureQueriesContext(connection) as large:
+            api_client.post(self.url, make_payload(5, 4, 10, "b"), format="json")
+        assert len(small.captured_queries) == len(large.captured_queries)
+
+    def test_it_returns_errors_per_item(self, api_client):
+        album = AlbumFactory.create(name="Album 0-1")
+        AlbumTrackFactory.create(track__name="Track 1-0-0", order=1)
+        initial = (Artist.objects.count(), Album.objects.count(), Track.objects.count())
+        response = api_client.post(self.url, make_payload(2, 2, 2), format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        errors = response.json()["artists"]
+        assert list(errors[0]["albums"][1]) == ["name"]
+        assert errors[0]["albums"][0] == {}
+        assert list(errors[1]["albums"][0]["tracks"]) == ["0"]
+        assert initial == (Artist.objects.count(), Album.objects.count(), Track.objects.count())
+        assert album.album_tracks.count() == 0
+
+    def test_concurrent_conflict(self, api_client, monkeypatch):
+        """Альбом, созданный параллельным запросом после проверки пакета, дает 400 вместо 500"""
+        monkeypatch.setattr(CatalogBulkSerializer, "validate", lambda self, data: data)
+        AlbumFactory.create(name="Album 1-0")
+        AlbumTrackFactory.create(track__name="Track 0-0-1", order=2)
+        initial = (Artist.objects.count(), Album.objects.count(), Track.objects.count())
+        response = api_client.post(self.url, make_payload(2, 1, 2), format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {
+            "albums": ["Альбомы уже существуют: Album 1-0"],
+            "tracks": ["Номера трэков уже заняты: Track 0-0-1"],
+        }
+        assert initial == (Artist.objects.count(), Album.objects.count(), Track.objects.count())
+
+    def test_it_validates_structure(self, api_client):
+        payload = make_payload(1, 1, 2)
+        payload["artists"][0]["albums"][0]["year"] = 100
+        payload["artists"][0]["albums"][0]["tracks"].append("Track 0-0-0")
+        response = api_client.post(self.url, payload, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert set(response.json()["artists"][0]["albums"][0]) == {"year", "tracks"}
@@ -0,0 +1,103 @@
+import pytest
+from pytest_drf.util import url_for
+
+from api.pagination import CatalogCursorPagination
+from catalog.models import AlbumTrack, Artist
+
+from .factories import AlbumFactory, AlbumWith2TracksFactory, ArtistFactory, TrackFactory
+
+
+def get(api_client, url):
+    response = api_client.get(url)
+    assert response.status_code == 200
+    return response
+
+
+def is_hit(api_client, url) -> bool:
+    return get(api_client, url).get("X-Cache") == "HIT"
+
+
+@pytest.mark.django_db(transaction=True)
+class TestResponseCache:
+    def test_second_get_is_hit(self, api_client):
+        artist = ArtistFactory.create()
+        url = url_for("artists-detail", artist.pk)
+        first = get(api_client, url)
+        second = get(api_client, url)
+        assert not first.has_header("X-Cache")
+        assert second["X-Cache"] == "HIT"
+        assert first.content == second.content
+
+    def test_key_includes_query(self, api_client):
+        get(api_client, url_for("artists-list"))
+        assert not is_hit(api_client, url_for("artists-list") + "?page=1")
+
+    def test_album_update_evicts_only_related(self, api_client):
+        album, other = AlbumWith2TracksFactory.create_batch(size=2)
+        track = album.tracks.first()
+        urls = {
+            "album": url_for("albums-detail", album.pk),
+            "artist": url_for("artists-detail", album.artist_id),
+            "track": url_for("tracks-detail", track.pk),
+            "other_album": url_for("albums-detail", other.pk),
+            "other_artist": url_for("artists-detail", other.artist_id),
+        }
+        for url in urls.values():
+            get(api_client, url)
+
+        api_client.patch(url_for("albums-detail", album.pk), {"name": "Renamed"})
+
+        hits = {name: is_hit(api_client, url) for name, url in urls.items()}
+        assert hits == {
+            "album": False,
+            "artist": False,
+            "track": False,
+            "other_album": True,
+            "other_artist": True,
+        }
+        assert get(api_client, urls["album"]).json()["name"] == "Renamed"
+
+    def test_rename_moves_onto_cached_page(self, api_client, monkeypatch):
+        monkeypatch.setattr(CatalogCursorPagination, "page_size", 2)
+        for name in ("B", "C", "D"):
+            ArtistFactory.create(name=name)
+        url = url_for("artists-list") + "?cursor=&ordering=name"
+        get(api_client, url)
+        assert is_hit(api_client, url)
+        api_client.patch(url_for("artists-detail", Artist.objects.get(name="D").pk), {"name": "A"})
+        response = get(api_client, url)
+        assert not response.has_header("X-Cache")
+        assert [artist["name"] for artist in response.json()["results"]] == ["A", "B"]
+
+    def test_album_filter_after_update(self, api_client):
+        album = AlbumFactory.create(year=2000)
+        url = url_for("albums-list") + "?year_from=2010"
+        assert get(api_client, url).json()["results"] == []
+        api_client.patch(url_for("albums-detail", album.pk), {"year": 2015})
+        assert [item["id"] for item in get(api_client, url).json()["results"]] == [album.pk]
+
+    def test_new_album_track_evicts_artist(self, api_client):
+        album = AlbumFactory.create()
+        url = url_for("artists-detail", album.artist_id)
+        get(api_client, url)
+        AlbumTrack.objects.create(album=album, track=TrackFactory.create(), order=1)
+        assert not is_hit(api_client, url)
+        assert get(api_client, url).json()["albums"][0]["album_tracks"]
+
+    def test_create_evicts_list(self, api_client):
+        get(api_client, url_for("artists-list"))
+        artist = ArtistFactory.create()
+        response = get(api_client, url_for("artists-list"))
+        assert artist.id in [item["id"] for item in response.json()["results"]]
+
+    def test_remove_track_evicts_album_tree(self, api_client):
+        album = AlbumWith2TracksFactory.create()
+        link = album.album_tracks.first()
+        track_url = url_for("tracks-detail", link.track_id)
+        urls = [url_for("albums-detail", album.pk), url_for("artists-detail", album.artist_id), url_for("tracks-list")]
+        for url in urls + [track_url]:
+            get(api_client, url)
+        api_client.delete(url_for("albums-remove-track", album.pk), {"orders": [link.order]}, format="json")
+        assert not any(is_hit(api_client, url) for url in urls)
+        assert api_client.get(track_url).status_code == 404
+        assert get(api_client, urls[0]).json()["tracks_count"] == 1
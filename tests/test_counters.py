@@ -0,0 +1,89 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from pytest_drf.util import url_for
+
+from catalog.counters import recount
+from catalog.models import Album, AlbumTrack, Artist
+
+from .factories import AlbumFactory, AlbumWith2TracksFactory, ArtistFactory, TrackFactory
+from .test_bulk import make_payload
+
+
+def counters(artist: Artist, album: Album = None) -> tuple:
+    artist.refresh_from_db()
+    if album is None:
+        return artist.albums_count, artist.tracks_count
+    album.refresh_from_db()
+    return artist.albums_count, artist.tracks_count, album.tracks_count
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCounters:
+    def test_links_and_cascades(self, api_client):
+        album = AlbumWith2TracksFactory.create()
+        artist = album.artist
+        AlbumFactory.create(artist=artist)
+        assert counters(artist, album) == (2, 2, 2)
+
+        shared = TrackFactory.create()
+        AlbumTrack.objects.create(album=album, track=shared, order=10)
+        AlbumTrack.objects.create(album=AlbumFactory.create(), track=shared, order=11)
+        assert counters(artist, album) == (2, 3, 3)
+
+        shared.delete()
+        assert counters(artist, album) == (2, 2, 2)
+        album.delete()
+        assert counters(artist) == (1, 0)
+        assert recount() == 0
+
+    def test_api_paths(self, api_client):
+        album = AlbumWith2TracksFactory.create()
+        artist = album.artist
+        api_client.post(url_for("tracks-list"), {"name": "Новый", "album": album.pk, "order": 77})
+        assert counters(artist, album) == (1, 3, 3)
+
+        url = url_for("albums-remove-track", album.pk)
+        api_client.delete(url, {"order": 77}, format="json")
+        assert counters(artist, album) == (1, 2, 2)
+
+        other = ArtistFactory.create()
+        response = api_client.patch(url_for("albums-detail", album.pk), {"artist": other.pk})
+        assert response.json()["tracks_count"] == 2
+        assert counters(artist) == (0, 0)
+        assert counters(other) == (1, 2)
+
+        api_client.post(url_for("artists-bulk"), make_payload(1, 2, 3), format="json")
+        bulk_artist = Artist.objects.get(name="Artist 0")
+        assert counters(bulk_artist) == (2, 6)
+        response = api_client.get(url_for("artists-detail", bulk_artist.pk))
+        assert response.json()["albums"][0]["tracks_count"] == 3
+
+        api_client.delete(url_for("artists-detail", other.pk))
+        assert recount() == 0
+
+    def test_stale_instance_does_not_overwrite(self):
+        album = AlbumFactory.create()
+        AlbumTrack.objects.create(album=album, track=TrackFactory.create(), order=1)
+        album.year = 2000
+        album.save()
+        assert counters(album.artist, album) == (1, 1, 1)
+
+    def test_m2m(self):
+        album = AlbumFactory.create()
+        track = TrackFactory.create()
+        track.albums.add(album, through_defaults={"order": 1})
+        assert counters(album.artist, album) == (1, 1, 1)
+        track.albums.clear()
+        assert counters(album.artist, album) == (1, 0, 0)
+
+    def test_repair_command(self):
+        album = AlbumWith2TracksFactory.create()
+        Album.objects.update(tracks_count=100)
+        Artist.objects.update(albums_count=0)
+        out = io.StringIO()
+        call_command("repair_counters", stdout=out)
+        assert "Исправлено строк: " in out.getvalue()
+        assert counters(album.artist, album) == (1, 2, 2)
+        assert recount() == 0
@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pytest
+
+from config.db_pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.healthy = True
+        self.closed = False
+
+
+@pytest.fixture
+def opened():
+    return []
+
+
+@pytest.fixture
+def make_pool(opened):
+    def connect():
+        connection = FakeConnection()
+        opened.append(connection)
+        return connection
+
+    def close(connection):
+        connection.closed = True
+
+    def make(**kwargs):
+        return ConnectionPool(connect=connect, close=close, check=lambda connection: connection.healthy, **kwargs)
+
+    return make
+
+
+def test_it_reuses_connections(make_pool, opened):
+    pool = make_pool(max_size=2)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    assert len(opened) == 1
+    stats = pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["in_use"] == 1
+    assert stats["saturation"] == 0.5
+
+
+def test_it_replaces_unhealthy_and_expired(make_pool, opened):
+    pool = make_pool(max_size=1, max_lifetime=60, check_idle=0)
+    connection = pool.acquire()
+    connection.healthy = False
+    pool.release(connection)
+    fresh = pool.acquire()
+    assert fresh is not connection and connection.closed
+    assert pool.stats()["health_check_failures"] == 1
+
+    pool.max_lifetime = 0
+    time.sleep(0.01)
+    pool.release(fresh)
+    assert fresh.closed
+    assert pool.stats()["size"] == 0
+
+
+def test_it_checks_only_idle_connections(make_pool):
+    checks = []
+    pool = make_pool(max_size=1, check_idle=0.05)
+    pool.check = lambda connection: checks.append(connection) or True
+    pool.release(pool.acquire())
+    pool.release(pool.acquire())
+    assert checks == []
+    time.sleep(0.06)
+    pool.acquire()
+    assert len(checks) == 1
+
+
+def test_it_waits_for_release(make_pool):
+    pool = make_pool(max_size=1, timeout=5)
+    connection = pool.acquire()
+    threading.Timer(0.05, pool.release, [connection]).start()
+    assert pool.acquire() is connection
+    assert pool.stats()["wait_seconds_max"] > 0
+
+
+def test_it_times_out_when_saturated(make_pool):
+    pool = make_pool(max_size=1, timeout=0.01)
+    pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["saturation"] == 1
+
+
+def test_it_is_thread_safe(make_pool, opened):
+    pool = make_pool(max_size=3, timeout=5)
+
+    def work():
+        for _ in range(50):
+            pool.release(pool.acquire())
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = pool.stats()
+    assert len(opened) <= 3
+    assert stats["checkouts"] == 400
+    assert stats["in_use"] == 0
+
+
+def test_close_all(make_pool, opened):
+    pool = make_pool(max_size=2)
+    idle, in_use = pool.acquire(), pool.acquire()
+    pool.release(idle)
+    pool.close_all()
+    assert idle.closed and not in_use.closed
+    pool.release(in_use)
+    assert in_use.closed
+    assert pool.acquire() not in (idle, in_use)
+    assert pool.stats()["size"] == 1
+
+
+@pytest.mark.parametrize(
+    "meta, status",
+    [({}, 200), ({"REMOTE_ADDR": "203.0.113.5"}, 404), ({"HTTP_X_FORWARDED_FOR": "203.0.113.5"}, 404)],
+)
+def test_stats_view_is_internal(client, meta, status):
+    assert client.get("/health/db-pool/", **meta).status_code == status
@@ -0,0 +1,129 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, override_settings
+from pytest_drf.util import url_for
+
+from api.cache import response_cache
+from catalog.models import Album
+from config.db_router import PIN_COOKIE, ReplicaRouter, ReplicaRoutingMiddleware, read_replica, reads_from_replica
+
+REPLICAS = override_settings(DATABASE_REPLICAS=["replica1"], REPLICA_PIN_SECONDS=5)
+
+
+def run(request, status=200):
+    """Запрос через middleware: куда читал view и ответ."""
+    seen = []
+
+    def get_response(request):
+        seen.append(reads_from_replica())
+        return HttpResponse(status=status)
+
+    middleware = ReplicaRoutingMiddleware(get_response)
+    response = middleware(request)
+    assert not reads_from_replica()
+    return seen[0], response
+
+
+@REPLICAS
+def test_router():
+    router = ReplicaRouter()
+    assert router.db_for_read(Album) == "default"
+    token = read_replica.set("replica1")
+    try:
+        assert router.db_for_read(Album) == "replica1"
+        assert router.db_for_write(Album) == "default"
+    finally:
+        read_replica.reset(token)
+    assert not router.allow_migrate("replica1", "catalog")
+    assert router.allow_migrate("default", "catalog")
+
+
+@REPLICAS
+def test_safe_requests_read_from_replica():
+    replica, response = run(RequestFactory().get("/api/v1/albums/"))
+    assert replica
+    assert PIN_COOKIE not in response.cookies
+
+
+@override_settings(DATABASE_REPLICAS=[f"replica{i}" for i in range(10)])
+def test_one_replica_per_request():
+    router = ReplicaRouter()
+    for _ in range(5):
+        seen = []
+
+        def get_response(request):
+            seen.extend(router.db_for_read(Album) for _ in range(10))
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(get_response)(RequestFactory().get("/api/v1/albums/"))
+        assert len(set(seen)) == 1
+        assert seen[0].startswith("replica")
+
+
+@REPLICAS
+def test_write_pins_client_to_primary():
+    replica, response = run(RequestFactory().post("/api/v1/albums/"), status=201)
+    assert not replica
+    assert response.cookies[PIN_COOKIE]["max-age"] == 5
+    request = RequestFactory().get("/api/v1/albums/")
+    request.COOKIES[PIN_COOKIE] = "1"
+    replica, _ = run(request)
+    assert not replica
+
+
+@REPLICAS
+def test_failed_write_does_not_pin():
+    _, response = run(RequestFactory().post("/api/v1/albums/"), status=400)
+    assert PIN_COOKIE not in response.cookies
+
+
+@REPLICAS
+def test_views_without_flag_read_primary():
+    replica, _ = run(RequestFactory().get("/metrics"))
+    assert not replica
+    replica, _ = run(RequestFactory().get("/missing/"))
+    assert not replica
+
+
+def test_without_replicas_not_used():
+    with pytest.raises(MiddlewareNotUsed):
+        ReplicaRoutingMiddleware(lambda request: HttpResponse())
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("replicas", [[], ["default"]])
+def test_asgi_reads(replicas):
+    with override_settings(DATABASE_REPLICAS=replicas):
+        client = AsyncClient()
+        for url_name in ("artists-list", "albums-list", "tracks-list"):
+            response = async_to_sync(client.get)(url_for(url_name))
+            assert response.status_code == 200
+        response = async_to_sync(client.get)(url_for("search-list"), {"q": "abc"})
+        assert response.status_code == 200
+    assert not reads_from_replica()
+
+
+@REPLICAS
+def test_async_middleware_resets():
+    seen = []
+
+    async def get_response(request):
+        seen.append(reads_from_replica())
+        return HttpResponse()
+
+    middleware = ReplicaRoutingMiddleware(get_response)
+    async_to_sync(middleware)(RequestFactory().get("/api/v1/albums/"))
+    assert seen == [True]
+    assert not reads_from_replica()
+
+
+def test_replica_response_is_not_cached_after_invalidation():
+    """Ответ с реплики сразу после записи может быть устаревшим и не попадает в кэш"""
+    response_cache.invalidate(["albums:*"])
+    generation = response_cache.generation()
+    response_cache.set("replica-key", generation, HttpResponse(b"[]"), ["albums:*"], stale_window=5)
+    assert response_cache.get("replica-key") is None
+    response_cache.set("primary-key", generation, HttpResponse(b"[]"), ["albums:*"])
+    assert response_cache.get("primary-key") is not None
@@ -0,0 +1,112 @@
+from unittest import mock
+
+import django
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete
+from pytest_drf.util import url_for
+
+from api.services import raw_delete
+from catalog.counters import recount
+from catalog.models import Album, AlbumTrack, Artist, Track
+
+from .factories import AlbumFactory, AlbumWith2TracksFactory, ArtistFactory, TrackFactory
+
+
+def make_artist(albums: int = 2) -> Artist:
+    artist = ArtistFactory.create()
+    for _ in range(albums):
+        AlbumWith2TracksFactory.create(artist=artist)
+    return artist
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCascadeDelete:
+    def test_artist_with_orphans(self, api_client):
+        artist = make_artist()
+        own_album = artist.albums.first()
+        repeated, shared = TrackFactory.create(), TrackFactory.create()
+        AlbumTrack.objects.create(album=own_album, track=repeated, order=10)
+        AlbumTrack.objects.create(album=artist.albums.last(), track=repeated, order=11)
+        AlbumTrack.objects.create(album=own_album, track=shared, order=12)
+        other = AlbumWith2TracksFactory.create()
+        AlbumTrack.objects.create(album=other, track=shared, order=13)
+
+        with mock.patch("api.services.DELETE_BATCH_SIZE", 2):
+            response = api_client.delete(url_for("artists-detail", artist.pk))
+
+        assert response.status_code == 200
+        assert response.json() == {"artists": 1, "albums": 2, "album_tracks": 7, "tracks": 5}
+        assert not Artist.objects.filter(pk=artist.pk).exists()
+        assert not Album.objects.filter(artist_id=artist.pk).exists()
+        assert not Track.objects.filter(pk=repeated.pk).exists()
+        assert set(Track.objects.values_list("id", flat=True)) == set(other.tracks.values_list("id", flat=True))
+        assert recount() == 0
+
+    def test_album(self, api_client):
+        artist = make_artist()
+        album = artist.albums.first()
+        response = api_client.delete(url_for("albums-detail", album.pk))
+        assert response.json() == {"albums": 1, "album_tracks": 2, "tracks": 2}
+        artist.refresh_from_db()
+        assert (artist.albums_count, artist.tracks_count) == (1, 2)
+        assert recount() == 0
+
+    def test_memory_does_not_depend_on_links(self, api_client, django_assert_max_num_queries):
+        artist = ArtistFactory.create()
+        album = AlbumFactory.create(artist=artist)
+        AlbumTrack.objects.bulk_create(
+            AlbumTrack(album=album, track=track, order=order)
+            for order, track in enumerate(TrackFactory.create_batch(size=9), start=1)
+        )
+        with mock.patch("api.services.DELETE_BATCH_SIZE", 3), mock.patch.object(
+            AlbumTrack, "__init__", side_effect=AssertionError
+        ):
+            # Пачка: выборка id, удаление связей, удаление трэков.
+            with django_assert_max_num_queries(3 * 4 + 6):
+                response = api_client.delete(url_for("artists-detail", artist.pk))
+        assert response.json()["album_tracks"] == 9
+
+    @pytest.mark.parametrize("pk", [999999, "abc"])
+    def test_missing(self, api_client, pk):
+        assert api_client.delete(url_for("artists-detail", pk)).status_code == 404
+        assert api_client.delete(url_for("albums-detail", pk)).status_code == 404
+
+    def test_cache_invalidated(self, api_client):
+        artist = make_artist(albums=1)
+        album = artist.albums.get()
+        shared = TrackFactory.create()
+        AlbumTrack.objects.create(album=album, track=shared, order=10)
+        AlbumTrack.objects.create(album=AlbumFactory.create(), track=shared, order=11)
+        urls = [url_for("tracks-detail", shared.pk), url_for("albums-list"), url_for("tracks-list")]
+        for url in urls:
+            api_client.get(url)
+        api_client.delete(url_for("artists-detail", artist.pk))
+        for url in urls:
+            assert api_client.get(url).get("X-Cache") != "HIT"
+        assert api_client.get(url_for("albums-detail", album.pk)).status_code == 404
+        assert len(api_client.get(url_for("tracks-detail", shared.pk)).json()["track_albums"]) == 1
+
+    def test_cache_cleared_on_overflow(self, api_client):
+        artist = make_artist()
+        backend = caches[settings.RESPONSE_CACHE_ALIAS]
+        backend.set("unrelated", 1)
+        with mock.patch("api.services.MAX_DELETE_TAGS", 3):
+            api_client.delete(url_for("artists-detail", artist.pk))
+        assert backend.get("unrelated") is None
+
+
+@pytest.mark.django_db
+def test_raw_delete_contract():
+    """raw_delete опирается на закрытый QuerySet._raw_delete: проверить при обновлении Django."""
+    assert django.VERSION[:2] == (4, 2)
+    album = AlbumWith2TracksFactory.create()
+    handler = mock.Mock()
+    post_delete.connect(handler, sender=AlbumTrack)
+    try:
+        assert raw_delete(AlbumTrack.objects.filter(album=album)) == 2
+    finally:
+        post_delete.disconnect(handler, sender=AlbumTrack)
+    handler.assert_not_called()
+    assert not AlbumTrack.objects.filter(album=album).exists()
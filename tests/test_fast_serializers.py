@@ -0,0 +1,35 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from api.fast_serializers import FastAlbumSerializer, FastArtistSerializer, FastTrackSerializer
+from api.serializers import AlbumReadSerializer, ArtistReadSerializer, TrackReadSerializer
+from catalog.models import Album, Artist, Track
+
+from .factories import AlbumWith2TracksFactory, ArtistFactory, TrackWith2AlbumFactory
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize(
+    "model, serializer_class, fast_serializer_class",
+    [
+        (Artist, ArtistReadSerializer, FastArtistSerializer),
+        (Album, AlbumReadSerializer, FastAlbumSerializer),
+        (Track, TrackReadSerializer, FastTrackSerializer),
+    ],
+)
+def test_output_is_byte_identical(model, serializer_class, fast_serializer_class):
+    AlbumWith2TracksFactory.create_batch(size=3)
+    TrackWith2AlbumFactory.create_batch(size=3)
+    ArtistFactory.create()
+    queryset = model.objects.all()
+    instances = serializer_class.setup_eager_loading(queryset)
+    with CaptureQueriesContext(connection) as expected_queries:
+        expected = JSONRenderer().render(serializer_class(instances, many=True).data)
+    rows = fast_serializer_class.setup_eager_loading(queryset)
+    with CaptureQueriesContext(connection) as actual_queries:
+        actual = JSONRenderer().render(fast_serializer_class(rows, many=True).data)
+    assert actual == expected
+    assert len(actual_queries) == len(expected_queries)
+    assert JSONRenderer().render(fast_serializer_class([], many=True).data) == b"[]"
@@ -0,0 +1,83 @@
+import pytest
+from pytest_drf.util import url_for
+
+from catalog.models import Album, AlbumTrack, Track
+
+from .factories import AlbumFactory, AlbumTrackFactory, ArtistFactory, TrackFactory
+
+
+def result_ids(response) -> list:
+    assert response.status_code == 200
+    return [item["id"] for item in response.json()["results"]]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAlbumFilters:
+    def test_artist_and_year_range(self, api_client):
+        artist = ArtistFactory.create()
+        albums = [AlbumFactory.create(artist=artist, year=year) for year in (1990, 2000, 2010)]
+        AlbumFactory.create(year=2000)
+        params = {"artist": artist.id, "year_from": 1995, "year_to": 2010}
+        assert result_ids(api_client.get(url_for("albums-list"), params)) == [albums[1].id, albums[2].id]
+
+    def test_name_prefix(self, api_client):
+        album = AlbumFactory.create(name="Abbey Road")
+        AlbumFactory.create(name="Let It Be")
+        assert result_ids(api_client.get(url_for("albums-list"), {"name_prefix": "Abb"})) == [album.id]
+
+    def test_invalid_year_range(self, api_client):
+        response = api_client.get(url_for("albums-list"), {"year_from": 2000, "year_to": 1990})
+        assert response.status_code == 400
+        assert list(response.json()) == ["year_to"]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTrackFilters:
+    def test_album(self, api_client):
+        link = AlbumTrackFactory.create()
+        AlbumTrackFactory.create()
+        assert result_ids(api_client.get(url_for("tracks-list"), {"album": link.album_id})) == [link.track_id]
+
+    def test_artist_without_duplicates(self, api_client):
+        """Трэк в двух альбомах исполнителя попадает в список один раз"""
+        artist = ArtistFactory.create()
+        track = TrackFactory.create()
+        for order, album in enumerate(AlbumFactory.create_batch(size=2, artist=artist), start=1):
+            AlbumTrack.objects.create(track=track, album=album, order=order)
+        TrackFactory.create()
+        assert result_ids(api_client.get(url_for("tracks-list"), {"artist": artist.id})) == [track.id]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestOrdering:
+    @pytest.mark.parametrize("ordering", [("year", "id"), ("-year", "-id")])
+    def test_indexed_ordering(self, api_client, ordering):
+        AlbumFactory.create_batch(size=4)
+        response = api_client.get(url_for("albums-list"), {"ordering": ",".join(ordering)})
+        assert result_ids(response) == list(Album.objects.order_by(*ordering).values_list("id", flat=True))
+
+    @pytest.mark.parametrize(
+        "url_name, ordering",
+        [
+            ("albums-list", "tracks_count"),
+            ("tracks-list", "year"),
+            ("albums-list", "-year,name"),
+            ("albums-list", "year,-id"),
+            ("albums-list", "year"),
+            ("artists-list", "name,id"),
+        ],
+    )
+    def test_rejects_unindexed_keys(self, api_client, url_name, ordering):
+        response = api_client.get(url_for(url_name), {"ordering": ordering})
+        assert response.status_code == 400
+        assert list(response.json()) == ["ordering"]
+
+    def test_cursor_rejects_non_unique_keys(self, api_client):
+        AlbumFactory.create()
+        response = api_client.get(url_for("albums-list"), {"cursor": "", "ordering": "year"})
+        assert response.status_code == 400
+
+    def test_tracks_by_name(self, api_client):
+        TrackFactory.create_batch(size=3)
+        response = api_client.get(url_for("tracks-list"), {"ordering": "-name"})
+        assert result_ids(response) == list(Track.objects.order_by("-name").values_list("id", flat=True))
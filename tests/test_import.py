@@ -0,0 +1,63 @@
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from catalog.loading import CatalogLoader, Checkpoint, iter_json_array
+from catalog.models import Album, AlbumTrack, Artist, Track
+
+
+def write_json(path, data):
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def sources(tmp_path):
+    return [
+        write_json(tmp_path / "artists.json", [{"name": f"Artist {i}"} for i in range(5)]) + ":catalog.Artist",
+        write_json(tmp_path / "albums.json", [{"name": "Album", "artist": "Artist 3", "year": 2000}])
+        + ":catalog.Album",
+        write_json(tmp_path / "tracks.json", [{"name": "Track"}]) + ":catalog.Track",
+        write_json(tmp_path / "links.json", [{"album": "Album", "track": "Track", "order": 1}]) + ":catalog.AlbumTrack",
+    ]
+
+
+def test_iter_json_array_reads_by_chunks():
+    data = [{"name": f"Трек {i}", "nested": {"list": [1, 2]}} for i in range(50)]
+    assert list(iter_json_array(io.StringIO(json.dumps(data, indent=2)), chunk_size=7)) == data
+    assert list(iter_json_array(io.StringIO(" [ ] "))) == []
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImportCatalog:
+    def test_it_loads_by_natural_keys(self, sources, tmp_path):
+        out = io.StringIO()
+        call_command("import_catalog", *sources, batch_size=2, checkpoint=str(tmp_path / "cp.json"), stdout=out)
+        album = Album.objects.get(name="Album")
+        assert album.artist.name == "Artist 3"
+        assert AlbumTrack.objects.get(album=album).track.name == "Track"
+        assert "строк/с" in out.getvalue()
+        assert not (tmp_path / "cp.json").exists()
+
+    def test_it_resumes_after_failure(self, sources, tmp_path):
+        checkpoint = tmp_path / "cp.json"
+        broken = write_json(tmp_path / "broken.json", [{"name": "Album 2", "artist": "Nobody", "year": 2000}])
+        with pytest.raises(CommandError):
+            call_command("import_catalog", sources[0], broken + ":catalog.Album", checkpoint=str(checkpoint))
+        assert json.loads(checkpoint.read_text()) == {sources[0].rpartition(":")[0]: 5}
+
+        initial_artists = Artist.objects.count()
+        call_command("import_catalog", *sources, checkpoint=str(checkpoint), stdout=io.StringIO())
+        assert Artist.objects.count() == initial_artists
+        assert Track.objects.filter(name="Track").exists()
+
+    @pytest.mark.parametrize("use_copy", [pytest.param(True, marks=pytest.mark.postgresql), False])
+    def test_it_skips_loaded_links(self, sources, use_copy):
+        """Отложенные ограничения номеров AlbumTrack не мешают пропуску уже загруженных связей"""
+        call_command("import_catalog", *sources, no_copy=not use_copy, stdout=io.StringIO())
+        loader = CatalogLoader(AlbumTrack, batch_size=10, use_copy=use_copy)
+        result = loader.load(sources[3].rpartition(":")[0], Checkpoint(None))
+        assert result.rows == 1
+        assert AlbumTrack.objects.count() == 1
@@ -0,0 +1,68 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from prometheus_client import REGISTRY
+from pytest_drf.util import url_for
+
+from .factories import AlbumWith2TracksFactory
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.django_db(transaction=True)
+class TestMetrics:
+    @pytest.mark.parametrize(
+        "method, url_name, view",
+        [
+            ("get", "artists-list", "artists-list"),
+            ("post", "tracks-list", "tracks-create"),
+        ],
+    )
+    def test_it_labels_by_action(self, api_client, method, url_name, view):
+        before = sample("catalog_db_queries_count", view=view)
+        getattr(api_client, method)(url_for(url_name), {"name": "Трек"})
+        assert sample("catalog_db_queries_count", view=view) == before + 1
+        assert sample("catalog_response_size_bytes_count", view=view) == before + 1
+
+    def test_it_counts_queries(self, api_client):
+        album = AlbumWith2TracksFactory.create()
+        track = album.tracks.first()
+        view = "albums-remove-track"
+        before = sample("catalog_db_queries_sum", view=view)
+        order = album.album_tracks.get(track=track).order
+        response = api_client.delete(url_for("albums-remove-track", album.pk), {"order": order}, format="json")
+        assert response.status_code == 204
+        assert sample("catalog_db_queries_sum", view=view) > before
+        assert sample("catalog_request_duration_seconds_count", view=view, method="DELETE", status="204") >= 1
+
+    def test_it_counts_queries_under_asgi(self):
+        AlbumWith2TracksFactory.create()
+        view = "albums-list"
+        before = sample("catalog_db_queries_sum", view=view)
+        response = async_to_sync(AsyncClient().get)(url_for("albums-list"), {"ordering": "name"})
+        assert response.status_code == 200
+        assert sample("catalog_db_queries_sum", view=view) > before
+
+    def test_it_counts_streaming_queries(self, api_client):
+        AlbumWith2TracksFactory.create()
+        view = "artists-export"
+        before = sample("catalog_db_queries_sum", view=view)
+        response = api_client.get(url_for("artists-export"))
+        assert sample("catalog_db_queries_sum", view=view) == before
+        b"".join(response.streaming_content)
+        assert sample("catalog_db_queries_sum", view=view) > before
+
+    def test_endpoint(self, api_client):
+        api_client.get(url_for("artists-list"))
+        response = api_client.get("/metrics")
+        assert response.status_code == 200
+        assert b'catalog_request_duration_seconds_bucket{le="0.005",method="GET",status="200",view="artists-list"}' in (
+            response.content
+        )
+
+
+@pytest.mark.parametrize("meta", [{"REMOTE_ADDR": "203.0.113.5"}, {"HTTP_X_FORWARDED_FOR": "203.0.113.5"}])
+def test_endpoint_is_internal(client, meta):
+    assert client.get("/metrics", **meta).status_code == 404
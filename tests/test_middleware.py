@@ -0,0 +1,55 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from pytest_drf.util import url_for
+
+from api.benchmark import middleware_report
+from config.middleware import BrowserMiddleware
+
+
+@pytest.mark.django_db()
+class TestBrowserMiddleware:
+    def test_api_skips_browser_middleware(self, client):
+        client.cookies["sessionid"] = "0" * 32
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url_for("artists-list"))
+        assert response.status_code == 200
+        assert "X-Frame-Options" not in response
+        assert "csrftoken" not in response.cookies
+        assert not any("django_session" in query["sql"] for query in context.captured_queries)
+
+    def test_admin_gets_full_stack(self, client):
+        response = client.get("/admin/login/")
+        assert response["X-Frame-Options"] == "DENY"
+        assert "csrftoken" in response.cookies
+
+    def test_admin_csrf_and_login(self):
+        User.objects.create_superuser("admin", "admin@example.com", "password")
+        client = Client(enforce_csrf_checks=True)
+        credentials = {"username": "admin", "password": "password"}
+        assert client.post("/admin/login/", credentials).status_code == 403
+        token = client.get("/admin/login/").cookies["csrftoken"].value
+        response = client.post("/admin/login/?next=/admin/", credentials | {"csrfmiddlewaretoken": token})
+        assert response.status_code == 302
+        assert client.get("/admin/").status_code == 200
+
+
+def test_async_chain():
+    async def view(request):
+        return HttpResponse()
+
+    middleware = BrowserMiddleware(view)
+    response = async_to_sync(middleware)(RequestFactory().get("/admin/"))
+    assert response["X-Frame-Options"] == "DENY"
+    assert "X-Frame-Options" not in async_to_sync(middleware)(RequestFactory().get("/api/v1/artists/"))
+
+
+@pytest.mark.django_db()
+def test_middleware_report():
+    report = middleware_report(rounds=5)
+    assert set(report) == {"no_cookie", "session_cookie"}
+    assert set(report["session_cookie"]) == {"full_us", "lean_us", "saved_us"}
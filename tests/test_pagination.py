@@ -0,0 +1,42 @@
+import pytest
+from pytest_drf.util import url_for
+
+from api.pagination import CatalogCursorPagination
+from catalog.models import Artist
+
+from .factories import ArtistFactory
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCursorPagination:
+    def test_page_number_by_default(self, api_client):
+        ArtistFactory.create_batch(size=3)
+        response = api_client.get(url_for("artists-list"))
+        assert response.json()["count"] == Artist.objects.count()
+
+    def test_walks_all_pages(self, api_client, monkeypatch):
+        monkeypatch.setattr(CatalogCursorPagination, "page_size", 2)
+        ArtistFactory.create_batch(size=5)
+        url = url_for("artists-list") + "?cursor="
+        ids, pages = [], 0
+        while url:
+            data = api_client.get(url).json()
+            assert "count" not in data
+            ids += [artist["id"] for artist in data["results"]]
+            pages += 1
+            url = data["next"]
+        assert pages == 3
+        assert ids == list(Artist.objects.values_list("id", flat=True))
+
+    def test_ordering_by_name(self, api_client):
+        ArtistFactory.create_batch(size=3)
+        response = api_client.get(url_for("artists-list"), {"cursor": "", "ordering": "-name"})
+        expected = list(Artist.objects.order_by("-name").values_list("name", flat=True))
+        assert [artist["name"] for artist in response.json()["results"]] == expected
+
+    @pytest.mark.parametrize("cursor", [True, False])
+    def test_approximate_count(self, api_client, cursor):
+        ArtistFactory.create_batch(size=3)
+        params = {"count": "approx"} | ({"cursor": ""} if cursor else {})
+        response = api_client.get(url_for("artists-list"), params)
+        assert response.json()["count"] == Artist.objects.count()
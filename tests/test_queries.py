@@ -0,0 +1,39 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from pytest_drf.util import url_for
+
+from .factories import AlbumWith2TracksFactory, TrackWith2AlbumFactory
+
+
+def count_queries(api_client, url) -> int:
+    """Количество SQL запросов на один GET."""
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFixedQueryCount:
+    @pytest.mark.parametrize("url_name", ["artists-list", "albums-list"])
+    def test_album_tree_list(self, api_client, url_name):
+        """Число запросов не зависит от количества исполнителей и альбомов."""
+        AlbumWith2TracksFactory.create_batch(size=2)
+        small = count_queries(api_client, url_for(url_name))
+        AlbumWith2TracksFactory.create_batch(size=8)
+        large = count_queries(api_client, url_for(url_name))
+        assert small == large
+
+    def test_track_list(self, api_client):
+        """Число запросов не зависит от количества трэков."""
+        TrackWith2AlbumFactory.create_batch(size=2)
+        small = count_queries(api_client, url_for("tracks-list"))
+        TrackWith2AlbumFactory.create_batch(size=8)
+        large = count_queries(api_client, url_for("tracks-list"))
+        assert small == large
+
+    def test_artist_detail(self, api_client):
+        album = AlbumWith2TracksFactory.create()
+        AlbumWith2TracksFactory.create_batch(size=3, artist=album.artist)
+        assert count_queries(api_client, url_for("artists-detail", album.artist.pk)) == 3
@@ -0,0 +1,63 @@
+import datetime
+from decimal import Decimal
+
+import msgpack
+import pytest
+from django.utils.translation import gettext_lazy
+from pytest_drf.util import url_for
+from rest_framework.renderers import JSONRenderer
+
+from api.benchmark import CODECS, codec_report
+from api.renderers import MessagePackRenderer, ORJSONRenderer
+from catalog.models import Artist
+
+from .factories import AlbumWith2TracksFactory
+
+MSGPACK = MessagePackRenderer.media_type
+
+
+def test_orjson_matches_drf_json():
+    data = {
+        "name": "Ария\u2028«Герой асфальта»\u2029",
+        "lazy": gettext_lazy("Not found."),
+        "price": Decimal("1.50"),
+        "released": datetime.datetime(2000, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+        "ids": [1, 2.5, None, True],
+    }
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+    context = {"indent": 2}
+    assert ORJSONRenderer().render(data, renderer_context=context) == JSONRenderer().render(data, None, context)
+    assert ORJSONRenderer().render(None) == b""
+
+
+@pytest.mark.django_db(transaction=True)
+class TestNegotiation:
+    @pytest.mark.parametrize("url_name", ["artists-list", "albums-list", "tracks-list"])
+    def test_msgpack_response(self, api_client, url_name):
+        AlbumWith2TracksFactory.create()
+        expected = api_client.get(url_for(url_name)).json()
+        response = api_client.get(url_for(url_name), HTTP_ACCEPT=MSGPACK)
+        assert response["Content-Type"] == MSGPACK
+        assert msgpack.unpackb(response.content) == expected
+
+    def test_msgpack_request(self, api_client):
+        body = msgpack.packb({"name": "Кино"})
+        response = api_client.post(url_for("artists-list"), data=body, content_type=MSGPACK)
+        assert response.status_code == 201
+        assert Artist.objects.filter(name="Кино").exists()
+
+    @pytest.mark.parametrize("content_type", ["application/json", MSGPACK])
+    def test_malformed_body(self, api_client, content_type):
+        response = api_client.post(url_for("artists-list"), data=b"\xc1{", content_type=content_type)
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db(transaction=True)
+def test_codec_report():
+    AlbumWith2TracksFactory.create()
+    report = codec_report(rounds=2)
+    assert set(report) == {"artists-list", "albums-list", "tracks-list", "artists-retrieve"}
+    for codecs in report.values():
+        assert set(codecs) == set(CODECS)
+        assert codecs["orjson"]["bytes"] == codecs["json"]["bytes"]
+        assert codecs["msgpack"]["bytes"] < codecs["json"]["bytes"]
@@ -0,0 +1,64 @@
+import gzip
+from unittest import mock
+
+import pytest
+import yaml
+from django.core.management import CommandError, call_command
+from drf_yasg.generators import OpenAPISchemaGenerator
+
+from config import schema
+from config.docs import generate_schema
+from config.schema import SCHEMA_PATH, prebuilt_schema
+
+
+def test_schema_file_is_up_to_date():
+    assert SCHEMA_PATH.read_bytes() == generate_schema()
+
+
+def test_generate_schema_check(tmp_path):
+    path = tmp_path / "openapi.json"
+    with mock.patch.object(schema, "SCHEMA_PATH", path), mock.patch(
+        "api.management.commands.generate_schema.SCHEMA_PATH", path
+    ):
+        with pytest.raises(CommandError):
+            call_command("generate_schema", "--check")
+        call_command("generate_schema")
+        call_command("generate_schema", "--check")
+    assert path.read_bytes() == SCHEMA_PATH.read_bytes()
+
+
+@pytest.mark.django_db()
+class TestSchemaView:
+    def test_json_without_generation(self, client, django_assert_num_queries):
+        prebuilt_schema()
+        with mock.patch.object(OpenAPISchemaGenerator, "get_paths", side_effect=AssertionError):
+            with django_assert_num_queries(0):
+                response = client.get("/swagger.json")
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/json"
+        assert response.content == SCHEMA_PATH.read_bytes()
+        assert response["Vary"] == "Accept-Encoding"
+
+    def test_yaml(self, client):
+        response = client.get("/swagger.yaml")
+        assert response["Content-Type"] == "application/yaml"
+        assert yaml.safe_load(response.content) == client.get("/swagger.json").json()
+
+    def test_gzip(self, client):
+        response = client.get("/swagger.json", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        assert response["Content-Encoding"] == "gzip"
+        assert gzip.decompress(response.content) == SCHEMA_PATH.read_bytes()
+
+    def test_not_modified(self, client):
+        etag = client.get("/swagger.json")["ETag"]
+        response = client.get("/swagger.json", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response.content == b""
+        assert client.get("/swagger.yaml", HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    @pytest.mark.parametrize("url", ["/swagger/", "/redoc/"])
+    def test_docs_pages_load_prebuilt_schema(self, client, url):
+        with mock.patch.object(OpenAPISchemaGenerator, "get_paths", side_effect=AssertionError):
+            response = client.get(url)
+        assert response.status_code == 200
+        assert "/swagger.json" in response.content.decode()
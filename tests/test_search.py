@@ -0,0 +1,27 @@
+import pytest
+from pytest_drf.util import url_for
+from rest_framework import status
+
+from .factories import AlbumFactory, ArtistFactory, TrackFactory
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSearch:
+    def test_it_finds_across_models(self, api_client):
+        artist = ArtistFactory.create(name="Moonlight Band")
+        album = AlbumFactory.create(name="Moonlight")
+        track = TrackFactory.create(name="Under the moonlight sky")
+        TrackFactory.create(name="Unrelated")
+        response = api_client.get(url_for("search-list"), {"q": "Moonlight"})
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()["results"]
+        assert [(item["type"], item["id"]) for item in results] == [
+            ("album", album.id),
+            ("artist", artist.id),
+            ("track", track.id),
+        ]
+        assert response.json()["count"] == 3
+
+    def test_query_is_required(self, api_client):
+        response = api_client.get(url_for("search-list"))
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
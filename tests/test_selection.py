@@ -0,0 +1,83 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from pytest_drf.util import url_for
+
+from api.selection import FieldSelection, parse_paths
+
+from .factories import AlbumWith2TracksFactory, TrackWith2AlbumFactory
+
+
+def get(api_client, url, query):
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.get(f"{url}?{query}")
+    return response, [query["sql"] for query in context.captured_queries]
+
+
+def test_parse_paths():
+    assert parse_paths("name, albums.name,albums.year,,") == {"name": {}, "albums": {"name": {}, "year": {}}}
+
+
+def test_nested_selection():
+    selection = FieldSelection(fields=parse_paths("name,albums.name"), expand=None)
+    assert selection.includes("id")
+    assert not selection.includes("tracks_count")
+    assert selection.includes("albums", expandable=True)
+    assert not selection.nested("albums").includes("album_tracks", expandable=True)
+    assert FieldSelection(expand={}).includes("tracks_count")
+    assert not FieldSelection(expand={}).includes("albums", expandable=True)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFieldSelection:
+    def test_names_only_artist_list(self, api_client):
+        """Только названия: один узкий SELECT без prefetch альбомов"""
+        album = AlbumWith2TracksFactory.create()
+        response, statements = get(api_client, url_for("artists-list"), "fields=name")
+        assert response.status_code == 200
+        assert response.json()["results"] == [{"id": album.artist.id, "name": album.artist.name}]
+        selects = [sql for sql in statements if "COUNT(*)" not in sql]
+        assert len(selects) == 1
+        assert "albums_count" not in selects[0]
+
+    def test_nested_fields(self, api_client):
+        album = AlbumWith2TracksFactory.create()
+        response, statements = get(api_client, url_for("artists-detail", album.artist.id), "fields=name,albums.year")
+        assert response.json() == {
+            "id": album.artist.id,
+            "name": album.artist.name,
+            "albums": [{"id": album.id, "year": album.year}],
+        }
+        assert len(statements) == 2
+
+    def test_expand_is_opt_in(self, api_client):
+        album = AlbumWith2TracksFactory.create()
+        response, statements = get(api_client, url_for("albums-detail", album.id), "expand=")
+        assert "album_tracks" not in response.json()
+        assert response.json()["tracks_count"] == 2
+        assert len(statements) == 1
+        response, statements = get(api_client, url_for("albums-detail", album.id), "expand=album_tracks")
+        assert len(response.json()["album_tracks"]) == 2
+        assert len(statements) == 2
+
+    def test_track_list(self, api_client):
+        track = TrackWith2AlbumFactory.create()
+        response, _ = get(api_client, url_for("tracks-list"), "fields=track_albums")
+        assert response.json()["results"][0] == {
+            "id": track.id,
+            "track_albums": [{"order": link.order, "album": link.album.name} for link in track.track_albums.all()],
+        }
+
+    @pytest.mark.parametrize(
+        "query, errors",
+        [
+            ("fields=foo", {"fields": ["Неизвестные поля: foo"]}),
+            ("expand=name", {"expand": ["Неизвестные поля: name"]}),
+            ("fields=albums.album_tracks.order", {"fields": ["Неизвестные поля: albums.album_tracks.order"]}),
+        ],
+    )
+    def test_unknown_fields(self, api_client, query, errors):
+        response, statements = get(api_client, url_for("artists-list"), query)
+        assert response.status_code == 400
+        assert response.json() == errors
+        assert statements == []
@@ -0,0 +1,155 @@
+import json
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from pytest_drf.util import url_for
+
+import api.snapshot
+from api.serializers import AlbumReadSerializer, ArtistReadSerializer, TrackReadSerializer
+from api.snapshot import CHANGE_KEY, CatalogSnapshot, current_version, publish_changes, version_backend
+from catalog.models import Album, AlbumTrack, Artist, Track
+
+from .factories import AlbumWith2TracksFactory, ArtistFactory, TrackWith2AlbumFactory
+
+pytestmark = [pytest.mark.django_db(transaction=True), pytest.mark.usefixtures("snapshot_enabled")]
+
+SERIALIZERS = {
+    "artists": (Artist, ArtistReadSerializer),
+    "albums": (Album, AlbumReadSerializer),
+    "tracks": (Track, TrackReadSerializer),
+}
+
+
+@pytest.fixture
+def snapshot_enabled():
+    with override_settings(CATALOG_SNAPSHOT=True):
+        yield
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Полные загрузки снимка."""
+    calls = []
+    load = CatalogSnapshot.load
+    monkeypatch.setattr(CatalogSnapshot, "load", lambda self, version: calls.append(version) or load(self, version))
+    return calls
+
+
+def assert_matches_database(snapshot):
+    with snapshot.read() as data:
+        for basename, (model, serializer_class) in SERIALIZERS.items():
+            expected = serializer_class(serializer_class.setup_eager_loading(model.objects.all()), many=True).data
+            assert json.dumps(data.render(basename, data.ordered[basename])) == json.dumps(expected)
+
+
+def create_catalog():
+    AlbumWith2TracksFactory.create_batch(size=2)
+    TrackWith2AlbumFactory.create_batch(size=2)
+    ArtistFactory.create()
+
+
+def test_load_matches_serializers():
+    create_catalog()
+    assert_matches_database(CatalogSnapshot())
+
+
+def test_changes_are_applied_incrementally(api_client, loads):
+    create_catalog()
+    snapshot = CatalogSnapshot()
+    assert_matches_database(snapshot)
+    album = Album.objects.first()
+    link = AlbumTrack.objects.filter(album=album).first()
+    other_artist = Artist.objects.exclude(pk=album.artist_id).first()
+    api_client.post(url_for("albums-list"), data={"name": "New", "artist": other_artist.id, "year": 2000})
+    api_client.post(url_for("tracks-list"), data={"name": "New track", "order": 9, "album": album.id})
+    api_client.patch(url_for("albums-detail", album.id), data={"artist": other_artist.id})
+    api_client.delete(url_for("albums-remove-track", album.id), data={"order": link.order})
+    api_client.post(url_for("albums-reorder", album.id), data={"compact": True})
+    api_client.delete(url_for("artists-detail", Artist.objects.last().id))
+    assert_matches_database(snapshot)
+    assert len(loads) == 1
+
+
+def test_other_worker_catches_up_from_change_log(loads):
+    """Изменение в другом процессе: версия и теги из общего кэша, перечитывается только альбом"""
+    create_catalog()
+    worker = CatalogSnapshot()
+    assert_matches_database(worker)
+    album = Album.objects.first()
+    Album.objects.filter(pk=album.pk).update(name="Renamed")
+    version = current_version()
+    publish_changes([f"albums:{album.pk}"])
+    assert current_version() == version + 1
+    with CaptureQueriesContext(connection) as context:
+        with worker.read() as data:
+            assert data.get("albums", album.pk)["name"] == "Renamed"
+    assert len(context.captured_queries) == 2
+    assert_matches_database(worker)
+    assert len(loads) == 1
+
+
+def test_refresh_does_not_change_published_version():
+    create_catalog()
+    worker = CatalogSnapshot()
+    with worker.read() as published:
+        album = published.get("albums", Album.objects.first().pk)
+    Album.objects.filter(pk=album["id"]).update(name="Renamed")
+    Artist.objects.filter(pk=album["artist"]).update(name="Renamed artist")
+    publish_changes([f"albums:{album['id']}", f"artists:{album['artist']}"])
+    with worker.read() as data:
+        assert data.get("albums", album["id"])["name"] == "Renamed"
+        assert data.get("artists", album["artist"])["name"] == "Renamed artist"
+    assert published.get("albums", album["id"]) == album
+    assert published.get("artists", album["artist"])["albums"][0]["name"] == album["name"]
+
+
+def test_reads_do_not_wait_for_refresh(loads):
+    """Пока другой поток обновляет снимок, чтение отдает прежнюю версию без ожидания"""
+    create_catalog()
+    worker = CatalogSnapshot()
+    with worker.read() as published:
+        pass
+    publish_changes(["artists:*"])
+    with worker.lock:
+        with worker.read() as data:
+            assert data is published
+    with worker.read() as data:
+        assert data is not published
+    assert len(loads) == 1
+
+
+def test_current_version_reads_once(monkeypatch):
+    current_version()
+    backend = mock.Mock(wraps=version_backend())
+    monkeypatch.setattr(api.snapshot, "version_backend", lambda: backend)
+    current_version()
+    backend.add.assert_not_called()
+    backend.get.assert_called_once()
+
+
+def test_missing_change_log_reloads(loads):
+    create_catalog()
+    worker = CatalogSnapshot()
+    assert_matches_database(worker)
+    Artist.objects.first().delete()
+    version_backend().delete(CHANGE_KEY.format(current_version()))
+    assert_matches_database(worker)
+    assert len(loads) == 2
+
+
+def test_api_reads_without_queries(api_client):
+    album = AlbumWith2TracksFactory.create()
+    for url in (url_for("albums-list"), url_for("artists-detail", album.artist_id), url_for("tracks-list")):
+        with override_settings(CATALOG_SNAPSHOT=False):
+            expected = api_client.get(url).json()
+        version_backend().clear()
+        api_client.get(f"{url}?page=1")
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url)
+        assert response.json() == expected
+        assert not response.has_header("X-Cache")
+        assert len(context.captured_queries) == 0
+    assert api_client.get(url_for("albums-detail", 100500)).status_code == 404
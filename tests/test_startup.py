@@ -0,0 +1,103 @@
+import importlib
+import runpy
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.test import override_settings
+from django.urls import clear_url_caches
+
+import config.urls
+from config.db_pool.base import POOLS
+from config.schema import lazy_view
+from config.startup import ImportTime, parse_importtime, profile_startup, startup_report, warmup
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     rest_framework.settings
+import time:      2500 |       2620 |   rest_framework
+import time:     30000 |      90000 |   pkg_resources
+import time:      4000 |      96620 | config.wsgi
+"""
+
+factory_calls = []
+
+
+def view_factory(name):
+    factory_calls.append(name)
+    return lambda request, **kwargs: (name, kwargs)
+
+
+def test_parse_importtime():
+    assert parse_importtime(IMPORTTIME) == [
+        ImportTime("rest_framework.settings", 120, 120),
+        ImportTime("rest_framework", 2500, 2620),
+        ImportTime("pkg_resources", 30000, 90000),
+        ImportTime("config.wsgi", 4000, 96620),
+    ]
+
+
+def test_startup_report():
+    report = startup_report(0.2, parse_importtime(IMPORTTIME), {"catalog": 0.004, "drf_yasg": 0.08}, top=2)
+    assert report["startup_ms"] == 200
+    assert report["imports_ms"] == 36.6
+    assert report["apps"] == [{"name": "drf_yasg", "ms": 80}, {"name": "catalog", "ms": 4}]
+    assert report["packages"] == [{"name": "pkg_resources", "ms": 30}, {"name": "config", "ms": 4}]
+    assert [item["module"] for item in report["modules"]] == ["pkg_resources", "config.wsgi"]
+
+
+def test_profile_startup():
+    seconds, entries, apps = profile_startup()
+    assert seconds > 0
+    assert "config.wsgi" in {entry.module for entry in entries}
+    assert {"catalog", "api", "rest_framework"} <= apps.keys()
+
+
+def test_warmup_freezes_gc():
+    with mock.patch("gc.freeze") as freeze:
+        warmup()
+    freeze.assert_called_once()
+
+
+def test_warmup_closes_pools(monkeypatch):
+    pool = mock.Mock()
+    monkeypatch.setitem(POOLS, ("default", "master"), pool)
+    with mock.patch("gc.freeze"):
+        warmup()
+    pool.close_all.assert_called_once()
+
+
+@pytest.mark.parametrize("preload", [True, False])
+def test_warmup_runs_only_with_preload(monkeypatch, preload):
+    monkeypatch.setenv("GUNICORN_PRELOAD", "False")
+    when_ready = runpy.run_path(str(settings.BASE_DIR / "config" / "gunicorn.conf.py"))["when_ready"]
+    with mock.patch("config.startup.warmup") as warmup_mock:
+        when_ready(mock.Mock(cfg=mock.Mock(preload_app=preload)))
+    assert warmup_mock.called is preload
+
+
+def test_lazy_view():
+    factory_calls.clear()
+    view = lazy_view("tests.test_startup.view_factory", "swagger")
+    assert factory_calls == []
+    assert view(None, format=".json") == ("swagger", {"format": ".json"})
+    view(None)
+    assert factory_calls == ["swagger"]
+
+
+@pytest.fixture()
+def reload_urls():
+    def reload():
+        clear_url_caches()
+        return {str(pattern.pattern) for pattern in importlib.reload(config.urls).urlpatterns}
+
+    yield reload
+    reload()
+
+
+def test_admin_and_docs_disabled(reload_urls):
+    docs = {"admin/", "^swagger/$", "^redoc/$"}
+    assert docs <= reload_urls()
+    with override_settings(ADMIN_ENABLED=False, API_DOCS_ENABLED=False):
+        patterns = reload_urls()
+    assert not docs & patterns
+    assert {"api/", r"^swagger(?P<format>\.json|\.yaml)$"} <= patterns
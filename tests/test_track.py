@@ -1,6 +1,8 @@
 from typing import Any, Dict
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from pytest_assert_utils import assert_model_attrs
 from pytest_common_subject import precondition_fixture
@@ -22,7 +24,7 @@ from rest_framework import status
 
 from catalog.models import AlbumTrack, Track
 
-from .factories import AlbumFactory, TrackWith2AlbumFactory
+from .factories import AlbumFactory, TrackFactory, TrackWith2AlbumFactory
 
 
 def express_track(track: Track) -> Dict[str, Any]:
@@ -180,3 +182,60 @@ def test_it_not_creates_repeat_track_order_other_album(api_client, track_with_2_
     expected = set(AlbumTrack.objects.values_list("id", flat=True))
     assert response.status_code == status.HTTP_400_BAD_REQUEST
     assert expected == actual
+
+
+@pytest.mark.django_db(transaction=True)
+def test_it_returns_constraint_messages(api_client, track_with_2_albums):
+    """Нарушенные ограничения возвращают прежние сообщения, новый трэк не остается в базе"""
+    url = reverse("tracks-list")
+    link = AlbumTrack.objects.filter(track=track_with_2_albums).first()
+    new_album = AlbumFactory.create()
+    cases = [
+        ({"name": "NewName", "order": link.order, "album": link.album_id}, "Номер уже занят в этом альбоме"),
+        ({"name": track_with_2_albums.name, "order": 999, "album": link.album_id}, "Трек уже есть в альбоме"),
+        (
+            {"name": track_with_2_albums.name, "order": link.order, "album": new_album.id},
+            "Номер уже существует в другом альбоме",
+        ),
+    ]
+    for data, message in cases:
+        response = api_client.post(url, data=data)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {"non_field_errors": [message]}
+    assert not Track.objects.filter(name="NewName").exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_it_not_creates_track_for_missing_album(api_client):
+    """Несуществующий альбом — ошибка поля album, трэк не создается"""
+    response = api_client.post(reverse("tracks-list"), data={"name": "NewName", "order": 1, "album": 100500})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert list(response.json()) == ["album"]
+    assert "100500" in response.json()["album"][0]
+    assert not Track.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_create_without_check_queries(api_client, track_with_2_albums):
+    """Создание: upsert трэка и вставка связи, без проверочных SELECT"""
+    album = AlbumFactory.create()
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.post(reverse("tracks-list"), data={"name": "NewName", "order": 1, "album": album.id})
+    assert response.status_code == status.HTTP_201_CREATED
+    statements = [query["sql"] for query in context.captured_queries]
+    assert not [sql for sql in statements if sql.startswith("SELECT")]
+    assert len([sql for sql in statements if sql.startswith("INSERT")]) == 2
+    assert AlbumTrack.objects.filter(track__name="NewName", album=album, order=1).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_create_reuses_track_without_update(api_client):
+    """Существующее название: трэк не обновляется, id читается отдельным SELECT"""
+    track = TrackFactory.create(name="Existing")
+    album = AlbumFactory.create()
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.post(reverse("tracks-list"), data={"name": "Existing", "order": 1, "album": album.id})
+    assert response.status_code == status.HTTP_201_CREATED
+    assert not [query for query in context.captured_queries if "DO UPDATE" in query["sql"]]
+    assert AlbumTrack.objects.filter(track=track, album=album, order=1).exists()
+    assert Track.objects.count() == 1